@@ -0,0 +1,74 @@
+from typing import Optional
+
+from fastapi import Request
+
+from app.services.ollama_service import OllamaService
+from app.services.rundeck_service import RundeckService
+from app.services.alert_pipeline import AlertPipeline
+from app.services.alert_queue import AlertQueue
+from app.services.incident_store import IncidentStore
+
+
+def get_ollama_service(request: Request) -> OllamaService:
+    """
+    Fornece a instância única do serviço Ollama criada na inicialização.
+
+    Args:
+        request: Requisição atual (usada para acessar o estado da aplicação)
+
+    Returns:
+        Serviço Ollama compartilhado pela aplicação
+    """
+    return request.app.state.ollama_service
+
+
+def get_rundeck_service(request: Request) -> RundeckService:
+    """
+    Fornece a instância única do serviço Rundeck criada na inicialização.
+
+    Args:
+        request: Requisição atual (usada para acessar o estado da aplicação)
+
+    Returns:
+        Serviço Rundeck compartilhado pela aplicação
+    """
+    return request.app.state.rundeck_service
+
+
+def get_alert_pipeline(request: Request) -> AlertPipeline:
+    """
+    Fornece o pipeline de processamento de alertas da aplicação.
+
+    Args:
+        request: Requisição atual (usada para acessar o estado da aplicação)
+
+    Returns:
+        Pipeline compartilhado pela aplicação
+    """
+    return request.app.state.alert_pipeline
+
+
+def get_alert_queue(request: Request) -> AlertQueue:
+    """
+    Fornece a fila de processamento assíncrono de alertas.
+
+    Args:
+        request: Requisição atual (usada para acessar o estado da aplicação)
+
+    Returns:
+        Fila compartilhada pela aplicação
+    """
+    return request.app.state.alert_queue
+
+
+def get_incident_store(request: Request) -> Optional[IncidentStore]:
+    """
+    Fornece o histórico de incidentes da aplicação.
+
+    Args:
+        request: Requisição atual (usada para acessar o estado da aplicação)
+
+    Returns:
+        Histórico compartilhado pela aplicação, ou None se desabilitado
+    """
+    return request.app.state.incident_store
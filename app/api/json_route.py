@@ -0,0 +1,33 @@
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.core import json_codec
+
+
+class FastJSONRequest(Request):
+    """
+    Requisição cujo corpo JSON é decodificado pelo json_codec, direto dos
+    bytes recebidos.
+    """
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = json_codec.loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Rota que valida os modelos do corpo a partir do JSON decodificado pelo
+    backend rápido (o FastAPI usa request.json(), com o json padrão).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def fast_json_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return fast_json_handler
@@ -5,7 +5,16 @@ import platform
 
 from app.services.ollama_service import OllamaService
 from app.services.rundeck_service import RundeckService
-from app.core.logging import logger
+from app.services.alert_pipeline import AlertPipeline
+from app.services.alert_queue import AlertQueue
+from app.api.dependencies import (
+    get_ollama_service,
+    get_rundeck_service,
+    get_alert_pipeline,
+    get_alert_queue,
+)
+from app.core.logging import logger, estatisticas_logging
+from app.core.tracing import exporter_stats
 from app.core.config import settings
 
 router = APIRouter()
@@ -34,18 +43,22 @@ async def health_check() -> Dict[str, Any]:
     summary="Verifica o status detalhado da API e suas dependências"
 )
 async def detailed_health(
-    ollama_service: OllamaService = Depends(lambda: OllamaService()),
-    rundeck_service: RundeckService = Depends(lambda: RundeckService())
+    ollama_service: OllamaService = Depends(get_ollama_service),
+    rundeck_service: RundeckService = Depends(get_rundeck_service),
+    alert_pipeline: AlertPipeline = Depends(get_alert_pipeline),
+    alert_queue: AlertQueue = Depends(get_alert_queue)
 ) -> Dict[str, Any]:
     """
     Realiza uma verificação completa do sistema e seus componentes.
     
     Verifica a conexão com serviços externos (Ollama e Rundeck)
-    e fornece informações de sistema.
+    e fornece informações de sistema e do pipeline de alertas.
     
     Args:
         ollama_service: Serviço para verificar conexão com Ollama
         rundeck_service: Serviço para verificar conexão com Rundeck
+        alert_pipeline: Pipeline de alertas (estatísticas de processamento)
+        alert_queue: Fila de alertas (estatísticas de ocupação)
         
     Returns:
         Relatório detalhado do status de todos os componentes
@@ -56,7 +69,9 @@ async def detailed_health(
     system_info = {
         "python_version": platform.python_version(),
         "system": platform.system(),
-        "platform": platform.platform()
+        "platform": platform.platform(),
+        "logging": estatisticas_logging(),
+        "tracing": exporter_stats()
     }
     
     # Verificar serviços externos
@@ -79,6 +94,10 @@ async def detailed_health(
         "status": "operational",
         "version": settings.API_VERSION,
         "components": components,
+        "pipeline": {
+            **alert_pipeline.stats(),
+            "queue": alert_queue.stats()
+        },
         "system_info": system_info,
         "response_time_ms": round(response_time * 1000, 2),
         "timestamp": int(time.time())
@@ -104,6 +123,8 @@ async def _check_services(
     # Verificar Ollama
     try:
         ollama_status = await ollama_service.check_connection()
+        if ollama_service.model_manager is not None:
+            ollama_status["warmup"] = ollama_service.model_manager.stats()
     except Exception as e:
         logger.error(f"Falha na verificação do Ollama: {str(e)}")
         ollama_status = {
@@ -112,6 +133,14 @@ async def _check_services(
             "message": f"Falha na conexão: {str(e)}"
         }
     
+    # Estado do disjuntor: aberto, as análises vão direto para o fallback
+    if ollama_service.breaker is not None:
+        breaker = ollama_service.breaker.stats()
+        ollama_status["circuit_breaker"] = breaker
+        if breaker["state"] != "closed" and ollama_status["status"] == "operational":
+            ollama_status["status"] = "degraded"
+            ollama_status["message"] = f"Circuito {breaker['state']}: análises usando fallback"
+    
     services_status.append(ollama_status)
     
     # Verificar Rundeck
@@ -124,6 +153,7 @@ async def _check_services(
             "status": "error",
             "message": f"Falha na conexão: {str(e)}"
         }
+    rundeck_status["dispatch"] = rundeck_service.dispatch_stats()
     
     services_status.append(rundeck_status)
     
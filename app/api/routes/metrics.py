@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.services.alert_pipeline import AlertPipeline
+from app.services.alert_queue import AlertQueue
+from app.api.dependencies import get_alert_pipeline, get_alert_queue
+from app.core.metrics import (
+    REGISTRY,
+    INFLIGHT_ALERTS,
+    QUEUE_DEPTH,
+    CORRELATION_BUFFERED,
+    HOST_LEASES,
+)
+
+router = APIRouter()
+
+
+@router.get("/metrics", summary="Métricas no formato do Prometheus", response_class=PlainTextResponse)
+async def metrics(
+    pipeline: AlertPipeline = Depends(get_alert_pipeline),
+    alert_queue: AlertQueue = Depends(get_alert_queue)
+) -> PlainTextResponse:
+    """
+    Expõe as métricas da aplicação para coleta pelo Prometheus.
+    
+    Latências e contadores são acumulados durante o processamento; os
+    valores instantâneos (alertas em andamento, fila e correlação) são
+    lidos no momento da coleta.
+    
+    Args:
+        pipeline: Pipeline de processamento de alertas (injetado)
+        alert_queue: Fila de processamento assíncrono (injetada)
+    
+    Returns:
+        Métricas no formato de exposição em texto (0.0.4)
+    """
+    stats = pipeline.stats()
+    INFLIGHT_ALERTS.set(stats["deduplication"].get("inflight", 0))
+    QUEUE_DEPTH.set(alert_queue.stats().get("queue_depth", 0))
+    if stats.get("correlation"):
+        CORRELATION_BUFFERED.set(stats["correlation"]["buffered_alerts"])
+    if stats.get("host_leases"):
+        HOST_LEASES.set(stats["host_leases"]["active"])
+    
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,74 +1,174 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from typing import Dict, Any, List, Optional, Union
 import time
-import json
 
-from app.models.zabbix import ZabbixAlert
+from app.models.zabbix import ZabbixAlert, normalize_alert
 from app.services.ollama_service import OllamaService
-from app.services.rundeck_service import RundeckService
+from app.services.alert_pipeline import AlertPipeline
+from app.services.alert_queue import AlertQueue, AlertQueueFullError
+from app.services.incident_store import IncidentStore
+from app.api.dependencies import (
+    get_ollama_service,
+    get_alert_pipeline,
+    get_alert_queue,
+    get_incident_store,
+)
+from app.api.json_route import FastJSONRoute
+from app.core import json_codec
+from app.core.config import settings
 from app.core.logging import logger  
+from app.core.metrics import ALERT_LATENCY
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+async def _process_or_enqueue(
+    request: Request,
+    alert_data: Dict[str, Any],
+    pipeline: AlertPipeline,
+    alert_queue: AlertQueue
+) -> Union[Dict[str, Any], JSONResponse]:
+    """
+    Processa o alerta na requisição ou o enfileira, conforme o modo de ingestão.
+    
+    No modo assíncrono responde 202 com o ticket para consulta posterior,
+    liberando a conexão do webhook antes da inferência. Alertas RESOLVED
+    são respondidos imediatamente, em qualquer modo.
+    
+    Args:
+        request: Requisição atual (usada para montar a URL do ticket)
+        alert_data: Dados normalizados do alerta
+        pipeline: Pipeline de processamento (modo síncrono)
+        alert_queue: Fila de processamento (modo assíncrono)
+        
+    Returns:
+        Resultado do processamento ou resposta 202 com o ticket
+    """
+    # Resoluções não passam pelo LLM: fecham o incidente e cancelam o pendente
+    if pipeline.is_resolved(alert_data):
+        result = pipeline.resolve(alert_data)
+        return {
+            **result,
+            "resolution": {
+                **result["resolution"],
+                "cancelled_queued": alert_queue.cancel(alert_data)
+            }
+        }
+    
+    if settings.ALERT_INGESTION_MODE != "async":
+        start_time = time.perf_counter()
+        try:
+            return await pipeline.process(alert_data)
+        finally:
+            ALERT_LATENCY.observe(time.perf_counter() - start_time, "sync")
+    
+    try:
+        record = alert_queue.submit(alert_data)
+    except AlertQueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "ticket": record["ticket"],
+            "status": record["status"],
+            "event_id": record["event_id"],
+            "host": record["host"],
+            "status_url": str(request.url_for("get_alert_ticket", ticket=record["ticket"]))
+        }
+    )
 
-router = APIRouter()
 
 @router.post("/alert", summary="Recebe alertas do Zabbix")
 async def receive_alert(
     alert: ZabbixAlert,
-    ollama_service: OllamaService = Depends(lambda: OllamaService()),
-    rundeck_service: RundeckService = Depends(lambda: RundeckService())
+    request: Request,
+    pipeline: AlertPipeline = Depends(get_alert_pipeline),
+    alert_queue: AlertQueue = Depends(get_alert_queue)
 ) -> Dict[str, Any]:
     """
     Endpoint para receber alertas do Zabbix.
     
     Processa o alerta usando o serviço Ollama e determina a ação apropriada.
+    No modo de ingestão assíncrono, apenas enfileira e responde 202.
     
     Args:
         alert: Dados do alerta do Zabbix
-        ollama_service: Serviço de conexão com o Ollama (injetado)
-        rundeck_service: Serviço de conexão com o Rundeck (injetado)
+        request: Requisição HTTP
+        pipeline: Pipeline de processamento de alertas (injetado)
+        alert_queue: Fila de processamento assíncrono (injetada)
     
     Returns:
-        Detalhes da análise e da ação recomendada
+        Detalhes da análise e da ação recomendada, ou o ticket do alerta
     """
     try:
         # Converte o modelo Pydantic para dicionário
         alert_dict = alert.model_dump()
         
-        # Envia para análise do Ollama
-        analysis_result = await ollama_service.analyze_alert(alert_dict)
+        return await _process_or_enqueue(request, alert_dict, pipeline, alert_queue)
         
-        # Se a análise indicar necessidade de ação no Rundeck
-        action_response = {}
-        if analysis_result.get("requires_action", False):
-            job_id = analysis_result.get("recommended_job_id")
-            if job_id:
-                action_response = await rundeck_service.execute_job(
-                    job_id=job_id, 
-                    parameters=analysis_result.get("job_parameters", {})
-                )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao processar alerta: {str(e)}"
+        )
+
+@router.post("/alerts/batch", summary="Recebe um lote de alertas do Zabbix")
+async def receive_alert_batch(
+    alerts: List[ZabbixAlert],
+    pipeline: AlertPipeline = Depends(get_alert_pipeline)
+) -> Dict[str, Any]:
+    """
+    Endpoint para receber vários alertas em uma única requisição.
+    
+    Os alertas que não forem decididos pelas regras ou pelo cache são
+    enviados ao Ollama em grupos, com o prompt de sistema e as ferramentas
+    enviados uma única vez por grupo. Útil para tempestades de alertas e
+    para reprocessar alertas acumulados.
+    
+    Args:
+        alerts: Lista de alertas do Zabbix
+        pipeline: Pipeline de processamento de alertas (injetado)
+    
+    Returns:
+        Resultado de cada alerta, na ordem recebida
+    """
+    if len(alerts) > settings.ALERT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {settings.ALERT_BATCH_MAX_SIZE} alertas"
+        )
+    
+    try:
+        start_time = time.perf_counter()
+        results = await pipeline.process_batch([alert.model_dump() for alert in alerts])
+        elapsed = time.perf_counter() - start_time
+        for _ in results:
+            ALERT_LATENCY.observe(elapsed, "batch")
         
-        # Adiciona informações adicionais na resposta
-        response = {
-            "event_id": alert.event_id,
-            "host": alert.host,
-            "problem": alert.problem,
-            "severity": alert.severity,
-            "analysis": analysis_result,
-            "action_taken": action_response
+        return {
+            "count": len(results),
+            "results": results
         }
         
-        return response
-        
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Erro ao processar alerta: {str(e)}"
+            detail=f"Erro ao processar lote de alertas: {str(e)}"
         )
 
 @router.post("/alert/debug", summary="Versão de depuração do endpoint de alertas")
 async def debug_alert(
     alert: ZabbixAlert,
-    ollama_service: OllamaService = Depends(lambda: OllamaService()),
-    rundeck_service: RundeckService = Depends(lambda: RundeckService())
+    ollama_service: OllamaService = Depends(get_ollama_service),
+    pipeline: AlertPipeline = Depends(get_alert_pipeline)
 ) -> Dict[str, Any]:
     """
     Versão de depuração do endpoint de alertas que retorna informações detalhadas.
@@ -78,7 +178,7 @@ async def debug_alert(
     Args:
         alert: Dados do alerta do Zabbix
         ollama_service: Serviço para processar com o LLM
-        rundeck_service: Serviço para executar jobs
+        pipeline: Pipeline que decide a ação (cache ou LLM)
         
     Returns:
         Informações detalhadas sobre o processamento
@@ -94,9 +194,16 @@ async def debug_alert(
         
         # Envia para análise do Ollama e mede o tempo
         ollama_start = time.time()
-        analysis_result = await ollama_service.analyze_alert(alert_dict)
+        # Com store=False a decisão não é guardada no cache de decisões nem
+        # contada em DECISIONS; a consulta ao cache, as métricas e o
+        # disjuntor do Ollama continuam contabilizando a chamada
+        analysis_result = await pipeline.analyze(alert_dict, store=False)
         ollama_time = time.time() - ollama_start
         
+        # O prompt enviado ao LLM (ausente em decisões das regras ou do
+        # cache) sai em um campo próprio, fora da análise
+        prompt = analysis_result.pop("prompt", None)
+        
         # Simula a execução no Rundeck mas não executa realmente
         rundeck_result = None
         if analysis_result.get("requires_action", False):
@@ -124,6 +231,7 @@ async def debug_alert(
                 "total_time_seconds": round(total_time, 2)
             },
             "analysis": analysis_result,
+            "prompt": prompt,
             "rundeck_simulation": rundeck_result,
             "timestamp": int(time.time()),
             "note": "Este é um endpoint de debug que não executa ações reais no Rundeck"
@@ -136,6 +244,74 @@ async def debug_alert(
             detail=f"Erro ao processar alerta (DEBUG): {str(e)}"
         )
 
+@router.get(
+    "/alert/{ticket}",
+    name="get_alert_ticket",
+    summary="Consulta o resultado de um alerta enfileirado"
+)
+async def get_alert_ticket(
+    ticket: str,
+    alert_queue: AlertQueue = Depends(get_alert_queue)
+) -> Dict[str, Any]:
+    """
+    Retorna o estado e, quando pronto, o resultado de um alerta enfileirado.
+    
+    Args:
+        ticket: Identificador retornado na ingestão assíncrona
+        alert_queue: Fila de processamento assíncrono (injetada)
+        
+    Returns:
+        Registro do ticket com status, análise e ação executada
+    """
+    record = alert_queue.get_ticket(ticket)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ticket {ticket} não encontrado ou expirado"
+        )
+    
+    return record
+
+
+@router.get("/hosts/{host}/incidents", summary="Consulta o histórico de incidentes de um host")
+async def get_host_incidents(
+    host: str,
+    limit: int = Query(
+        settings.INCIDENT_HISTORY_LIMIT, ge=1, le=settings.INCIDENT_HISTORY_MAX_LIMIT
+    ),
+    since: Optional[float] = Query(None, description="Timestamp mínimo dos incidentes"),
+    trigger_id: Optional[str] = Query(None, description="Restringe a um gatilho"),
+    incident_store: Optional[IncidentStore] = Depends(get_incident_store)
+) -> Dict[str, Any]:
+    """
+    Retorna os incidentes mais recentes de um host, do mais novo ao mais antigo.
+    
+    Args:
+        host: Nome do host
+        limit: Quantidade máxima de incidentes
+        since: Timestamp mínimo dos incidentes
+        trigger_id: Identificador do gatilho (opcional)
+        incident_store: Histórico de incidentes (injetado)
+        
+    Returns:
+        Host consultado e lista de incidentes
+    """
+    if incident_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Histórico de incidentes desabilitado"
+        )
+    
+    incidents = await incident_store.recent(
+        host, limit=limit, since=since, trigger_id=trigger_id
+    )
+    return {
+        "host": host,
+        "count": len(incidents),
+        "incidents": incidents
+    }
+
+
 @router.post("/alert/raw", summary="Captura o payload bruto do webhook do Zabbix")
 async def capture_raw_payload(request: Request) -> Dict[str, Any]:
     """
@@ -159,7 +335,7 @@ async def capture_raw_payload(request: Request) -> Dict[str, Any]:
         
         # Tenta parsear como JSON
         try:
-            json_payload = json.loads(payload_str)
+            json_payload = json_codec.loads(payload)
             is_valid_json = True
             
             # Se for um formulário Zabbix, tenta extrair valor de Message
@@ -167,11 +343,11 @@ async def capture_raw_payload(request: Request) -> Dict[str, Any]:
             if isinstance(json_payload, dict):
                 if "Message" in json_payload:
                     try:
-                        message_value = json.loads(json_payload["Message"])
+                        message_value = json_codec.loads(json_payload["Message"])
                         logger.info(f"Mensagem extraída: {message_value}")
                     except:
                         message_value = json_payload["Message"]
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             json_payload = {"raw_text": payload_str}
             is_valid_json = False
             message_value = None
@@ -197,102 +373,50 @@ async def capture_raw_payload(request: Request) -> Dict[str, Any]:
 @router.post("/alert/direct", summary="Recebe alertas do Zabbix em formato bruto")
 async def receive_raw_alert(
     request: Request,
-    ollama_service: OllamaService = Depends(lambda: OllamaService()),
-    rundeck_service: RundeckService = Depends(lambda: RundeckService())
+    pipeline: AlertPipeline = Depends(get_alert_pipeline),
+    alert_queue: AlertQueue = Depends(get_alert_queue)
 ) -> Dict[str, Any]:
     """
     Endpoint para receber alertas do Zabbix em formato bruto.
     
     Este endpoint é projetado para lidar com o formato enviado diretamente
-    pelo webhook do Zabbix, sem a validação do modelo Pydantic.
+    pelo webhook do Zabbix: aplica a normalização do ZabbixAlert, sem a
+    validação do modelo Pydantic.
+    No modo de ingestão assíncrono, apenas enfileira e responde 202.
     
     Args:
         request: Requisição HTTP contendo o payload bruto
-        ollama_service: Serviço de conexão com o Ollama (injetado)
-        rundeck_service: Serviço de conexão com o Rundeck (injetado)
+        pipeline: Pipeline de processamento de alertas (injetado)
+        alert_queue: Fila de processamento assíncrono (injetada)
     
     Returns:
-        Detalhes da análise e da ação recomendada
+        Detalhes da análise e da ação recomendada, ou o ticket do alerta
     """
     try:
         # Captura o corpo bruto da requisição
         body = await request.body()
-        body_str = body.decode("utf-8")
         
-        # Tenta parsear o JSON
+        # Tenta parsear o JSON direto dos bytes (só o trecho logado vira texto)
         try:
-            data = json.loads(body_str)
-            logger.info(f"Payload recebido: {body_str[:200]}...")
-        except json.JSONDecodeError:
-            logger.error(f"Payload inválido (não é JSON): {body_str[:200]}")
+            data = json_codec.loads(body)
+            logger.info(f"Payload recebido: {body[:200].decode('utf-8', 'replace')}...")
+        except json_codec.JSONDecodeError:
+            logger.error(f"Payload inválido (não é JSON): {body[:200].decode('utf-8', 'replace')}")
             raise HTTPException(
                 status_code=400,
                 detail="Payload inválido: não é um JSON válido"
             )
         
-        # Extrai dados do campo Message se presente
-        if "Message" in data:
-            try:
-                message_content = data["Message"]
-                # Tenta parsear o campo Message como JSON
-                if isinstance(message_content, str):
-                    try:
-                        message_data = json.loads(message_content)
-                        if isinstance(message_data, dict):
-                            logger.info("Dados extraídos do campo Message")
-                            data = message_data
-                    except json.JSONDecodeError:
-                        # Se não for um JSON válido, usa o texto como problem
-                        logger.warning("Campo Message não é um JSON válido")
-                        data["problem"] = message_content
-            except Exception as e:
-                logger.error(f"Erro ao processar campo Message: {str(e)}")
-        
-        # Normaliza os dados para garantir campos obrigatórios
-        alert_data = {
-            "event_id": data.get("event_id") or data.get("eventid") or str(int(time.time())),
-            "host": data.get("host") or data.get("hostname") or "unknown-host",
-            "problem": data.get("problem") or data.get("subject") or data.get("description") or "Unknown problem",
-            "severity": data.get("severity") or "not classified",
-            "status": data.get("status") or "PROBLEM",
-            "timestamp": data.get("timestamp") or int(time.time())
-        }
-        
-        # Adiciona campos opcionais se presentes
-        if "details" in data and isinstance(data["details"], dict):
-            alert_data["details"] = data["details"]
-        else:
-            alert_data["details"] = {}
-            
-        if "tags" in data and isinstance(data["tags"], list):
-            alert_data["tags"] = data["tags"]
-        else:
-            alert_data["tags"] = []
-            
-        # Envia para análise do Ollama
-        analysis_result = await ollama_service.analyze_alert(alert_data)
+        if not isinstance(data, dict):
+            raise HTTPException(
+                status_code=400,
+                detail="Payload inválido: o JSON deve ser um objeto"
+            )
         
-        # Se a análise indicar necessidade de ação no Rundeck
-        action_response = {}
-        if analysis_result.get("requires_action", False):
-            job_id = analysis_result.get("recommended_job_id")
-            if job_id:
-                action_response = await rundeck_service.execute_job(
-                    job_id=job_id, 
-                    parameters=analysis_result.get("job_parameters", {})
-                )
-                
-        # Monta a resposta
-        response = {
-            "event_id": alert_data["event_id"],
-            "host": alert_data["host"],
-            "problem": alert_data["problem"],
-            "severity": alert_data["severity"],
-            "analysis": analysis_result,
-            "action_taken": action_response
-        }
+        # Mesmas regras do ZabbixAlert (Message, Subject, details e aliases)
+        alert_data = normalize_alert(data)
         
-        return response
+        return await _process_or_enqueue(request, alert_data, pipeline, alert_queue)
         
     except HTTPException:
         raise
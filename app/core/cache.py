@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Cache em memória com tamanho máximo (LRU) e expiração por tempo.
+
+    Usado para guardar resultados de curta duração (tickets, respostas já
+    processadas, decisões) sem crescer indefinidamente durante tempestades
+    de alertas. Não é thread-safe: deve ser usado apenas no event loop.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_size: Número máximo de entradas antes de descartar as mais antigas
+            ttl: Tempo de vida de cada entrada em segundos
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Obtém um valor do cache, marcando-o como usado recentemente.
+
+        Args:
+            key: Chave da entrada
+            default: Valor retornado se a chave não existir ou tiver expirado
+
+        Returns:
+            Valor armazenado ou o valor padrão
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor no cache, descartando as entradas mais antigas
+        se o tamanho máximo for ultrapassado.
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            ttl: Tempo de vida específico desta entrada (opcional)
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove e retorna uma entrada do cache.
+
+        Args:
+            key: Chave da entrada
+            default: Valor retornado se a chave não existir
+
+        Returns:
+            Valor removido ou o valor padrão
+        """
+        entry = self._data.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def purge_expired(self) -> int:
+        """
+        Remove todas as entradas expiradas.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna informações sobre a ocupação do cache.
+
+        Returns:
+            Tamanho atual, tamanho máximo e TTL configurado
+        """
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
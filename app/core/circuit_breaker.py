@@ -0,0 +1,196 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from app.core.logging import logger
+
+
+class CircuitOpenError(Exception):
+    """
+    Chamada recusada porque o circuito do serviço está aberto.
+    """
+
+
+class CallOutcome:
+    """
+    Resultado de uma chamada protegida pelo circuito.
+
+    Respostas HTTP de erro não são exceções; quem faz a chamada as marca
+    como falha com fail().
+    """
+
+    __slots__ = ("failure",)
+
+    def __init__(self):
+        self.failure: Optional[str] = None
+
+    def fail(self, reason: str) -> None:
+        self.failure = reason
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para um serviço externo.
+
+    Fechado, deixa passar todas as chamadas. Abre após failure_threshold
+    falhas consecutivas (erros, timeouts ou chamadas acima do SLO de
+    latência); aberto, recusa as chamadas imediatamente com
+    CircuitOpenError. Depois de reset_timeout segundos passa a meio-aberto
+    e libera uma chamada de teste: se ela for bem sucedida o circuito
+    fecha, senão volta a abrir.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        slow_call_seconds: Optional[float] = None,
+        history: int = 20
+    ):
+        """
+        Inicializa o disjuntor fechado.
+
+        Args:
+            name: Nome do serviço protegido
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            reset_timeout: Segundos aberto antes da chamada de teste
+            slow_call_seconds: SLO de latência; chamadas mais lentas contam
+                como falha (None desativa)
+            history: Quantidade de transições mantidas para consulta
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.transitions: "deque[Dict[str, Any]]" = deque(maxlen=history)
+
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+
+    @contextmanager
+    def call(self) -> Iterator[CallOutcome]:
+        """
+        Protege uma chamada ao serviço.
+
+        Uso:
+            with breaker.call() as outcome:
+                response = await client.post(...)
+                if response.status_code >= 500:
+                    outcome.fail(f"HTTP {response.status_code}")
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+        """
+        probe = self._acquire()
+        outcome = CallOutcome()
+        start_time = time.perf_counter()
+        try:
+            yield outcome
+        except Exception as e:
+            self._on_failure(f"{type(e).__name__}: {e}", probe)
+            raise
+        except BaseException:
+            # Chamada cancelada: não conta como sucesso nem como falha
+            if probe:
+                self._probe_in_flight = False
+            raise
+
+        duration = time.perf_counter() - start_time
+        if outcome.failure is not None:
+            self._on_failure(outcome.failure, probe)
+        elif self.slow_call_seconds is not None and duration > self.slow_call_seconds:
+            self.slow_calls += 1
+            self._on_failure(f"chamada lenta ({duration:.1f}s > SLO de {self.slow_call_seconds}s)", probe)
+        else:
+            self._on_success(probe)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do circuito e as últimas transições.
+
+        Returns:
+            Estado, contadores e histórico de transições
+        """
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "slow_call_seconds": self.slow_call_seconds,
+            "retry_in_seconds": retry_in,
+            "successes": self.successes,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "transitions": list(self.transitions)
+        }
+
+    def _acquire(self) -> bool:
+        """
+        Reserva a chamada; retorna True se for a chamada de teste do meio-aberto.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuito do {self.name} aberto")
+            self._transition(self.HALF_OPEN, "tempo de espera encerrado")
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuito do {self.name} meio-aberto, chamada de teste em andamento")
+            self._probe_in_flight = True
+            return True
+
+        return False
+
+    def _on_success(self, probe: bool) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        if probe:
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            self._transition(self.CLOSED, "chamada de teste bem sucedida")
+
+    def _on_failure(self, reason: str, probe: bool) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if probe:
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            self._open(f"chamada de teste falhou: {reason}")
+        elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open(f"{self.consecutive_failures} falhas consecutivas, última: {reason}")
+
+    def _open(self, reason: str) -> None:
+        self.opened_at = time.monotonic()
+        self._transition(self.OPEN, reason)
+
+    def _transition(self, state: str, reason: str) -> None:
+        previous, self.state = self.state, state
+        self.transitions.append({
+            "at": time.time(),
+            "from": previous,
+            "to": state,
+            "reason": reason
+        })
+        log = logger.warning if state == self.OPEN else logger.info
+        log(f"Circuito do {self.name}: {previous} -> {state} ({reason})")
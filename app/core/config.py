@@ -1,5 +1,5 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from pydantic_settings import BaseSettings
 
@@ -19,12 +19,48 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
     
+    # Tracing: spans de cada alerta exportados no formato Chrome Trace Event
+    TRACE_EXPORT_ENABLED: bool = os.getenv("TRACE_EXPORT_ENABLED", "false").lower() == "true"
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "logs/trace.json")
+    TRACE_EXPORT_MAX_BYTES: int = int(os.getenv("TRACE_EXPORT_MAX_BYTES", "52428800"))
+    
+    # Decodificação dos payloads recebidos: "auto" usa o backend mais
+    # rápido instalado (orjson, msgspec) ou o json da biblioteca padrão
+    JSON_BACKEND: str = os.getenv("JSON_BACKEND", "auto")
+    
     # Ollama configurações
     OLLAMA_BASE_URL: str = os.getenv(
         "OLLAMA_BASE_URL", 
         "http://localhost:11434"
     )
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2")
+    OLLAMA_TEMPERATURE: float = float(os.getenv("OLLAMA_TEMPERATURE", "0.1"))
+    OLLAMA_STREAMING: bool = os.getenv("OLLAMA_STREAMING", "false").lower() == "true"
+    OLLAMA_BATCH_SIZE: int = int(os.getenv("OLLAMA_BATCH_SIZE", "10"))
+    OLLAMA_BATCH_TIMEOUT: float = float(os.getenv("OLLAMA_BATCH_TIMEOUT", "180"))
+    OLLAMA_TIMEOUT: float = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+    OLLAMA_CONNECT_TIMEOUT: float = float(
+        os.getenv("OLLAMA_CONNECT_TIMEOUT", "5")
+    )
+    
+    # Disjuntor do Ollama: com o serviço fora ou lento, os alertas vão
+    # direto para o fallback em vez de esperar o timeout
+    OLLAMA_BREAKER_ENABLED: bool = os.getenv("OLLAMA_BREAKER_ENABLED", "true").lower() == "true"
+    OLLAMA_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("OLLAMA_BREAKER_FAILURE_THRESHOLD", "5"))
+    OLLAMA_BREAKER_RESET_TIMEOUT: float = float(os.getenv("OLLAMA_BREAKER_RESET_TIMEOUT", "30"))
+    # SLO de latência de uma chamada ao /api/chat (0 desativa)
+    OLLAMA_BREAKER_SLOW_CALL_SECONDS: float = float(
+        os.getenv("OLLAMA_BREAKER_SLOW_CALL_SECONDS", "45")
+    )
+    
+    # Aquecimento e permanência do modelo em memória no Ollama
+    OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_WARMUP_ENABLED: bool = os.getenv("OLLAMA_WARMUP_ENABLED", "true").lower() == "true"
+    OLLAMA_WARMUP_TIMEOUT: float = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "300"))
+    OLLAMA_REWARM_INTERVAL: float = float(os.getenv("OLLAMA_REWARM_INTERVAL", "600"))
+    OLLAMA_COLD_LOAD_THRESHOLD_MS: float = float(
+        os.getenv("OLLAMA_COLD_LOAD_THRESHOLD_MS", "1000")
+    )
     
     # Rundeck configurações
     RUNDECK_API_URL: str = os.getenv(
@@ -32,7 +68,120 @@ class Settings(BaseSettings):
         "http://localhost:4440/api/41"
     )
     RUNDECK_TOKEN: str = os.getenv("RUNDECK_TOKEN", "")
+    # Endereço usado nos webhooks dos jobs (contêiner do Rundeck por padrão)
+    RUNDECK_WEBHOOK_BASE_URL: str = os.getenv(
+        "RUNDECK_WEBHOOK_BASE_URL",
+        "http://rundeck:4440"
+    )
     RUNDECK_PROJECT: str = os.getenv("RUNDECK_PROJECT", "dorothy")
+    RUNDECK_TIMEOUT: float = float(os.getenv("RUNDECK_TIMEOUT", "30"))
+    RUNDECK_CONNECT_TIMEOUT: float = float(
+        os.getenv("RUNDECK_CONNECT_TIMEOUT", "5")
+    )
+    # Disparo dos webhooks: tempo de cada tentativa, quantidade de tentativas
+    # e backoff exponencial (com jitter) entre elas
+    RUNDECK_ATTEMPT_TIMEOUT: float = float(os.getenv("RUNDECK_ATTEMPT_TIMEOUT", "10"))
+    RUNDECK_RETRY_ATTEMPTS: int = int(os.getenv("RUNDECK_RETRY_ATTEMPTS", "4"))
+    RUNDECK_RETRY_BASE_DELAY: float = float(os.getenv("RUNDECK_RETRY_BASE_DELAY", "0.5"))
+    RUNDECK_RETRY_MAX_DELAY: float = float(os.getenv("RUNDECK_RETRY_MAX_DELAY", "8"))
+    # Orçamento de novas tentativas: fração dos disparos da janela recente,
+    # mais um mínimo por segundo, para não multiplicar a carga numa queda
+    RUNDECK_RETRY_BUDGET_RATIO: float = float(os.getenv("RUNDECK_RETRY_BUDGET_RATIO", "0.2"))
+    RUNDECK_RETRY_BUDGET_MIN_PER_SECOND: float = float(
+        os.getenv("RUNDECK_RETRY_BUDGET_MIN_PER_SECOND", "1")
+    )
+    # Disparos concluídos lembrados pela chave de idempotência (evento + ação)
+    RUNDECK_IDEMPOTENCY_TTL: float = float(os.getenv("RUNDECK_IDEMPOTENCY_TTL", "3600"))
+    RUNDECK_IDEMPOTENCY_MAX_SIZE: int = int(os.getenv("RUNDECK_IDEMPOTENCY_MAX_SIZE", "10000"))
+    # Agrupamento da mesma ação para vários hosts em uma única execução
+    # (lista de nós no parâmetro "nodes"); cada disparo aguarda a janela
+    RUNDECK_FANIN_ENABLED: bool = os.getenv("RUNDECK_FANIN_ENABLED", "false").lower() == "true"
+    RUNDECK_FANIN_WINDOW: float = float(os.getenv("RUNDECK_FANIN_WINDOW", "2"))
+    RUNDECK_FANIN_MAX_NODES: int = int(os.getenv("RUNDECK_FANIN_MAX_NODES", "100"))
+    RUNDECK_FANIN_JOBS: str = os.getenv(
+        "RUNDECK_FANIN_JOBS",
+        "cleanup-disk,restart-service,analyze-processes,restart-app"
+    )
+    
+    # Pool de conexões HTTP (um cliente por backend, durante toda a vida da app)
+    HTTP_POOL_MAX_CONNECTIONS: int = int(
+        os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100")
+    )
+    HTTP_POOL_MAX_KEEPALIVE: int = int(
+        os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20")
+    )
+    HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")
+    )
+    
+    # Ingestão de alertas: "sync" processa na requisição, "async" enfileira
+    # e responde 202 com um ticket para consulta posterior
+    ALERT_INGESTION_MODE: str = os.getenv("ALERT_INGESTION_MODE", "sync")
+    ALERT_QUEUE_WORKERS: int = int(os.getenv("ALERT_QUEUE_WORKERS", "4"))
+    ALERT_QUEUE_MAX_SIZE: int = int(os.getenv("ALERT_QUEUE_MAX_SIZE", "1000"))
+    ALERT_TICKET_TTL: float = float(os.getenv("ALERT_TICKET_TTL", "3600"))
+    ALERT_TICKET_MAX: int = int(os.getenv("ALERT_TICKET_MAX", "10000"))
+    ALERT_BATCH_MAX_SIZE: int = int(os.getenv("ALERT_BATCH_MAX_SIZE", "500"))
+    
+    # Correlação de alertas do mesmo host em um único incidente.
+    # No modo assíncrono cada alerta em correlação ocupa um worker da fila.
+    CORRELATION_ENABLED: bool = os.getenv("CORRELATION_ENABLED", "false").lower() == "true"
+    CORRELATION_WINDOW: float = float(os.getenv("CORRELATION_WINDOW", "5"))
+    CORRELATION_MAX_ALERTS: int = int(os.getenv("CORRELATION_MAX_ALERTS", "20"))
+    
+    # Histórico persistente de incidentes (SQLite em modo WAL)
+    INCIDENT_STORE_ENABLED: bool = os.getenv("INCIDENT_STORE_ENABLED", "true").lower() == "true"
+    INCIDENT_STORE_PATH: str = os.getenv("INCIDENT_STORE_PATH", "data/incidents.db")
+    INCIDENT_STORE_BATCH_SIZE: int = int(os.getenv("INCIDENT_STORE_BATCH_SIZE", "200"))
+    INCIDENT_STORE_FLUSH_INTERVAL: float = float(os.getenv("INCIDENT_STORE_FLUSH_INTERVAL", "1"))
+    INCIDENT_STORE_MAX_PENDING: int = int(os.getenv("INCIDENT_STORE_MAX_PENDING", "10000"))
+    INCIDENT_HISTORY_LIMIT: int = int(os.getenv("INCIDENT_HISTORY_LIMIT", "20"))
+    INCIDENT_HISTORY_MAX_LIMIT: int = int(os.getenv("INCIDENT_HISTORY_MAX_LIMIT", "500"))
+    
+    # Resumo do histórico de cada host incluído no prompt do modelo
+    HOST_CONTEXT_ENABLED: bool = os.getenv("HOST_CONTEXT_ENABLED", "true").lower() == "true"
+    HOST_CONTEXT_MAX_HOSTS: int = int(os.getenv("HOST_CONTEXT_MAX_HOSTS", "5000"))
+    HOST_CONTEXT_TTL: float = float(os.getenv("HOST_CONTEXT_TTL", "86400"))
+    HOST_CONTEXT_RECENT_ACTIONS: int = int(os.getenv("HOST_CONTEXT_RECENT_ACTIONS", "5"))
+    HOST_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("HOST_CONTEXT_TOKEN_BUDGET", "120"))
+    
+    # Deduplicação de eventos reenviados pelo Zabbix
+    DEDUP_TTL: float = float(os.getenv("DEDUP_TTL", "600"))
+    DEDUP_MAX_SIZE: int = int(os.getenv("DEDUP_MAX_SIZE", "10000"))
+    
+    # Classificação determinística por palavras-chave, antes do LLM
+    RULES_ENABLED: bool = os.getenv("RULES_ENABLED", "true").lower() == "true"
+    RULE_KEYWORDS: Dict[str, List[str]] = {
+        # Só termos de falta de espaço: "disk" ou "filesystem" sozinhos
+        # (latência, quota, somente leitura) ficam com o LLM
+        "cleanup_disk": [
+            "disk space", "free space", "free disk space", "disk full",
+            "no space left", "espaço em disco", "disco cheio"
+        ],
+        "restart_service": [
+            "service", "serviço", "stopped", "not running", "parado"
+        ],
+        "analyze_processes": ["cpu", "memory", "load", "utilization"],
+        "restart_application": ["application", "app", "memory leak"]
+    }
+    
+    # Cache de decisões do LLM por impressão digital do alerta
+    DECISION_CACHE_ENABLED: bool = os.getenv("DECISION_CACHE_ENABLED", "true").lower() == "true"
+    DECISION_CACHE_TTL: float = float(os.getenv("DECISION_CACHE_TTL", "1800"))
+    DECISION_CACHE_MAX_SIZE: int = int(os.getenv("DECISION_CACHE_MAX_SIZE", "5000"))
+    DECISION_CACHE_TAGS: List[str] = os.getenv(
+        "DECISION_CACHE_TAGS",
+        "component,service,application,team"
+    ).split(",")
+    
+    # Funções cujas decisões podem ser reaproveitadas do cache
+    DECISION_CACHE_POLICY: Dict[str, bool] = {
+        "cleanup_disk": True,
+        "restart_service": True,
+        "analyze_processes": True,
+        "restart_application": False,
+        "notify": False
+    }
     
     # Mapeamento de ações para jobs do Rundeck
     ACTION_MAPPING: Dict[str, Dict[str, Any]] = {
@@ -57,6 +206,46 @@ class Settings(BaseSettings):
             "description": "Envia notificação para equipe"
         }
     }
+    
+    # Limites de execução das ações (token bucket), no formato
+    # "disparos/segundos": até N disparos seguidos, repostos ao longo do
+    # período. "host" limita cada host e "action" a ação em toda a frota;
+    # vazio desativa o limite. Ações sem entrada não são limitadas.
+    ACTION_RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "cleanup-disk": {
+            "host": os.getenv("RATE_LIMIT_CLEANUP_DISK_HOST", "3/3600"),
+            "action": os.getenv("RATE_LIMIT_CLEANUP_DISK", "60/60")
+        },
+        "restart-service": {
+            "host": os.getenv("RATE_LIMIT_RESTART_SERVICE_HOST", "2/600"),
+            "action": os.getenv("RATE_LIMIT_RESTART_SERVICE", "30/60")
+        },
+        "analyze-processes": {
+            "host": os.getenv("RATE_LIMIT_ANALYZE_PROCESSES_HOST", "6/600"),
+            "action": os.getenv("RATE_LIMIT_ANALYZE_PROCESSES", "120/60")
+        },
+        "restart-application": {
+            "host": os.getenv("RATE_LIMIT_RESTART_APPLICATION_HOST", "2/1800"),
+            "action": os.getenv("RATE_LIMIT_RESTART_APPLICATION", "20/60")
+        }
+    }
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    # Ao exceder o limite: "notify" rebaixa o alerta para notificação;
+    # "defer" aguarda o próximo disparo liberado (até RATE_LIMIT_MAX_DEFER
+    # segundos, senão rebaixa), ocupando a requisição ou o worker da fila
+    RATE_LIMIT_MODE: str = os.getenv("RATE_LIMIT_MODE", "notify")
+    RATE_LIMIT_MAX_DEFER: float = float(os.getenv("RATE_LIMIT_MAX_DEFER", "30"))
+    RATE_LIMIT_MAX_HOSTS: int = int(os.getenv("RATE_LIMIT_MAX_HOSTS", "50000"))
+    
+    # Concessão por host: uma remediação por vez em cada host. A concessão
+    # dura até HOST_LEASE_TIMEOUT durante o disparo e HOST_LEASE_SETTLE
+    # depois dele; ações conflitantes aguardam até HOST_LEASE_MAX_WAIT
+    # (senão são rebaixadas para notificação)
+    HOST_LEASE_ENABLED: bool = os.getenv("HOST_LEASE_ENABLED", "true").lower() == "true"
+    HOST_LEASE_TIMEOUT: float = float(os.getenv("HOST_LEASE_TIMEOUT", "120"))
+    HOST_LEASE_SETTLE: float = float(os.getenv("HOST_LEASE_SETTLE", "30"))
+    HOST_LEASE_MAX_WAIT: float = float(os.getenv("HOST_LEASE_MAX_WAIT", "60"))
+    HOST_LEASE_MAX_HOSTS: int = int(os.getenv("HOST_LEASE_MAX_HOSTS", "10000"))
 
 
 # Instância global de configurações
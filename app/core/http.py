@@ -0,0 +1,33 @@
+import httpx
+
+from app.core.config import settings
+
+
+def criar_cliente_http(
+    timeout: float,
+    connect_timeout: float,
+) -> httpx.AsyncClient:
+    """
+    Cria um cliente HTTP assíncrono com pool de conexões persistentes.
+
+    O cliente deve ser criado uma única vez na inicialização da aplicação
+    e compartilhado entre as requisições, evitando o custo de abrir uma
+    nova conexão TCP a cada alerta.
+
+    Args:
+        timeout: Timeout padrão (leitura, escrita e pool) em segundos
+        connect_timeout: Timeout para estabelecer a conexão em segundos
+
+    Returns:
+        Cliente HTTP configurado com os limites do pool
+    """
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
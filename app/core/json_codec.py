@@ -0,0 +1,117 @@
+import json
+from typing import Any, Callable, Dict, Union
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Erro de decodificação comum a todos os backends (orjson já o usa; os
+# erros do msgspec são convertidos), o mesmo tratado pelo FastAPI
+JSONDecodeError = json.JSONDecodeError
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+def _stdlib_loads(data: JsonInput) -> Any:
+    # json.loads aceita bytes (detecta a codificação), mas não memoryview
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _orjson_loader() -> Callable[[JsonInput], Any]:
+    import orjson
+    return orjson.loads
+
+
+def _msgspec_loader() -> Callable[[JsonInput], Any]:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+
+    def loads(data: JsonInput) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), "", 0) from None
+
+    return loads
+
+
+_LOADERS: Dict[str, Callable[[], Callable[[JsonInput], Any]]] = {
+    "orjson": _orjson_loader,
+    "msgspec": _msgspec_loader,
+    "json": lambda: _stdlib_loads,
+}
+
+
+def loader(backend: str) -> Callable[[JsonInput], Any]:
+    """
+    Retorna a função de decodificação de um backend.
+
+    Args:
+        backend: orjson, msgspec ou json
+
+    Returns:
+        Função que decodifica bytes ou str
+
+    Raises:
+        ImportError: Se o pacote do backend não estiver instalado
+        ValueError: Se o backend for desconhecido
+    """
+    if backend not in _LOADERS:
+        raise ValueError(f"Backend JSON desconhecido: {backend}")
+    return _LOADERS[backend]()
+
+
+def available_backends() -> list:
+    """
+    Retorna os backends instalados, do mais rápido para o mais lento.
+    """
+    backends = []
+    for backend in _LOADERS:
+        try:
+            loader(backend)
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def _select(preferred: str) -> str:
+    # Backend inválido ou ausente não impede a inicialização: é só uma otimização
+    preferred = (preferred or "auto").strip().lower()
+    if preferred == "auto":
+        return available_backends()[0]
+    try:
+        loader(preferred)
+        return preferred
+    except ImportError:
+        logger.warning(f"Backend JSON {preferred} não instalado, usando o json da biblioteca padrão")
+    except ValueError:
+        logger.warning(f"Backend JSON desconhecido: {preferred}, usando o json da biblioteca padrão")
+    return "json"
+
+
+# Backend escolhido na importação: JSON_BACKEND ou o mais rápido instalado
+BACKEND = _select(settings.JSON_BACKEND)
+_loads = loader(BACKEND)
+
+
+def loads(data: JsonInput) -> Any:
+    """
+    Decodifica JSON com o backend mais rápido disponível.
+
+    Aceita os bytes do corpo da requisição diretamente, sem a cópia
+    intermediária para str.
+
+    Args:
+        data: Documento JSON (bytes ou str)
+
+    Returns:
+        Valor decodificado
+
+    Raises:
+        JSONDecodeError: Se o documento não for JSON válido
+    """
+    return _loads(data)
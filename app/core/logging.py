@@ -1,9 +1,20 @@
+import atexit
+import gzip
+import json
 import logging
 import os
+import queue
+import random
+import shutil
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.core.tracing import current_trace_id
 
 
 class LogConfig:
@@ -18,12 +29,25 @@ class LogConfig:
     LOG_DIR = Path("logs")
     
     # Formato dos logs
-    FORMATO_SIMPLES = "%(asctime)s | %(levelname)8s | %(message)s"
+    FORMATO_SIMPLES = "%(asctime)s | %(levelname)8s | %(trace_id)s | %(message)s"
     FORMATO_DETALHADO = (
-        "%(asctime)s | %(levelname)8s | %(name)s | "
+        "%(asctime)s | %(levelname)8s | %(trace_id)s | %(name)s | "
         "%(filename)s:%(lineno)d | %(message)s"
     )
     
+    # Registro assíncrono: os handlers rodam em uma thread, fora do event loop
+    ASSINCRONO = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    TAMANHO_FILA = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Política quando a fila enche: "drop_new" descarta o registro novo,
+    # "drop_old" descarta o mais antigo da fila para abrir espaço
+    POLITICA_FILA_CHEIA = os.getenv("LOG_OVERFLOW_POLICY", "drop_new").lower()
+    COMPRIMIR_ROTACIONADOS = os.getenv("LOG_COMPRESS_ROTATED", "true").lower() == "true"
+    
+    # Payloads detalhados (log_payload): fração amostrada e limite por host
+    PAYLOAD_TAXA_AMOSTRAGEM = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
+    PAYLOAD_MAX_POR_MINUTO = int(os.getenv("LOG_PAYLOAD_MAX_PER_MINUTE", "60"))
+    PAYLOAD_LIMITE_CARACTERES = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+    
     # Níveis de log disponíveis
     NIVEIS = {
         "debug": logging.DEBUG,
@@ -73,11 +97,12 @@ def configurar_logger(
     
     # Formatter para os logs
     formatter = logging.Formatter(formato)
+    handlers: List[logging.Handler] = []
     
     # Handler para console com cores (para melhor visibilidade)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # Handler para arquivo (se especificado)
     if arquivo:
@@ -91,8 +116,27 @@ def configurar_logger(
             backupCount=5,
             encoding="utf-8",
         )
+        if LogConfig.COMPRIMIR_ROTACIONADOS:
+            file_handler.namer = _nome_comprimido
+            file_handler.rotator = _rotacionar_comprimindo
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if LogConfig.ASSINCRONO:
+        # O logger apenas enfileira; a escrita acontece na thread do listener
+        fila: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LogConfig.TAMANHO_FILA)
+        queue_handler = BoundedQueueHandler(fila, LogConfig.POLITICA_FILA_CHEIA)
+        listener = _FilaListener(fila, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        _queue_handlers.append(queue_handler)
+        # O trace id é lido na thread de quem registra, antes da fila
+        queue_handler.addFilter(FiltroTrace())
+        logger.addHandler(queue_handler)
+    else:
+        for handler in handlers:
+            handler.addFilter(FiltroTrace())
+            logger.addHandler(handler)
     
     # Configurar para registrar chamadas de exceções detalhadas
     logging.captureWarnings(True)
@@ -100,6 +144,225 @@ def configurar_logger(
     return logger
 
 
+class FiltroTrace(logging.Filter):
+    """
+    Adiciona aos registros o trace id do alerta em processamento ("-" fora de um alerta).
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id() or "-"
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Handler que enfileira os registros sem nunca bloquear quem registra.
+    
+    Quando a fila está cheia (tempestade de alertas com o disco lento), o
+    registro novo ou o mais antigo da fila é descartado, conforme a
+    política, e o descarte é contabilizado.
+    """
+    
+    def __init__(self, fila: "queue.Queue[logging.LogRecord]", politica: str = "drop_new"):
+        super().__init__(fila)
+        self.politica = politica
+        self.enfileirados = 0
+        self.descartados = 0
+        self._lock_contadores = threading.Lock()
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.politica == "drop_old":
+                try:
+                    self.queue.get_nowait()
+                    self.queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            with self._lock_contadores:
+                self.descartados += 1
+            return
+        
+        with self._lock_contadores:
+            self.enfileirados += 1
+    
+    def estatisticas(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores da fila de logs.
+        
+        Returns:
+            Registros enfileirados, descartados e ocupação da fila
+        """
+        return {
+            "enfileirados": self.enfileirados,
+            "descartados": self.descartados,
+            "pendentes": self.queue.qsize(),
+            "capacidade": self.queue.maxsize,
+            "politica": self.politica
+        }
+
+
+class _FilaListener(QueueListener):
+    """
+    Listener que garante a entrega do sinal de parada mesmo com a fila cheia.
+    """
+    
+    def enqueue_sentinel(self) -> None:
+        # Aguarda a thread do listener liberar espaço em vez de falhar
+        self.queue.put(self._sentinel)
+
+
+# Listeners e handlers de fila ativos (modo assíncrono)
+_listeners: List[QueueListener] = []
+_queue_handlers: List[BoundedQueueHandler] = []
+
+
+def _nome_comprimido(nome: str) -> str:
+    """
+    Nome dos arquivos rotacionados (comprimidos com gzip).
+    """
+    return nome + ".gz"
+
+
+def _rotacionar_comprimindo(origem: str, destino: str) -> None:
+    """
+    Rotaciona o arquivo de log e o comprime em uma thread separada.
+    
+    O arquivo é apenas renomeado durante a rotação; a compressão, mais
+    lenta, não atrasa a escrita dos próximos registros.
+    
+    Args:
+        origem: Arquivo de log atual
+        destino: Nome final do arquivo rotacionado (terminado em .gz)
+    """
+    temporario = destino[:-len(".gz")]
+    os.replace(origem, temporario)
+    threading.Thread(
+        target=_comprimir,
+        args=(temporario, destino),
+        name="log-compress",
+        daemon=True
+    ).start()
+
+
+def _comprimir(origem: str, destino: str) -> None:
+    try:
+        with open(origem, "rb") as entrada, gzip.open(destino, "wb") as saida:
+            shutil.copyfileobj(entrada, saida)
+        os.remove(origem)
+    except OSError as e:
+        sys.stderr.write(f"Falha ao comprimir log rotacionado {origem}: {e}\n")
+
+
+class LazyJson:
+    """
+    Adia a serialização de um payload até o registro ser de fato emitido.
+    
+    Passado como argumento do logger (logger.debug("... %s", LazyJson(x))),
+    o json.dumps só acontece se o nível estiver habilitado.
+    """
+    
+    __slots__ = ("valor", "indent", "limite")
+    
+    def __init__(self, valor: Any, indent: Optional[int] = None, limite: Optional[int] = None):
+        self.valor = valor
+        self.indent = indent
+        self.limite = limite
+    
+    def __str__(self) -> str:
+        try:
+            texto = json.dumps(self.valor, indent=self.indent, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            texto = repr(self.valor)
+        if self.limite is not None and len(texto) > self.limite:
+            return texto[:self.limite] + "..."
+        return texto
+
+
+class _LimitadorPayload:
+    """
+    Amostragem e limite de taxa por host para logs de payload.
+    
+    Cada host tem um balde de fichas que se renova continuamente até
+    PAYLOAD_MAX_POR_MINUTO por minuto; a quantidade de hosts acompanhados
+    é limitada, descartando os menos recentes.
+    """
+    
+    def __init__(self, taxa_amostragem: float, max_por_minuto: int, max_hosts: int = 1000):
+        self.taxa_amostragem = taxa_amostragem
+        self.capacidade = float(max(1, max_por_minuto))
+        self.max_hosts = max_hosts
+        self._baldes: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.emitidos = 0
+        self.descartados_amostragem = 0
+        self.descartados_limite = 0
+    
+    def permitir(self, host: str) -> bool:
+        if self.taxa_amostragem < 1.0 and random.random() >= self.taxa_amostragem:
+            self.descartados_amostragem += 1
+            return False
+        
+        agora = time.monotonic()
+        with self._lock:
+            fichas, atualizado_em = self._baldes.pop(host, (self.capacidade, agora))
+            fichas = min(self.capacidade, fichas + (agora - atualizado_em) * self.capacidade / 60)
+            permitido = fichas >= 1
+            if permitido:
+                fichas -= 1
+            
+            self._baldes[host] = (fichas, agora)
+            if len(self._baldes) > self.max_hosts:
+                self._baldes.popitem(last=False)
+        
+        if permitido:
+            self.emitidos += 1
+        else:
+            self.descartados_limite += 1
+        return permitido
+    
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "emitidos": self.emitidos,
+            "descartados_amostragem": self.descartados_amostragem,
+            "descartados_limite": self.descartados_limite,
+            "hosts": len(self._baldes)
+        }
+
+
+_limitador_payload = _LimitadorPayload(
+    LogConfig.PAYLOAD_TAXA_AMOSTRAGEM,
+    LogConfig.PAYLOAD_MAX_POR_MINUTO
+)
+
+
+def estatisticas_logging() -> Dict[str, Any]:
+    """
+    Retorna o modo de registro e os contadores da fila de logs.
+    
+    Returns:
+        Modo (síncrono/assíncrono), contadores de cada fila e dos payloads
+    """
+    return {
+        "assincrono": bool(_queue_handlers),
+        "filas": [handler.estatisticas() for handler in _queue_handlers],
+        "payloads": _limitador_payload.estatisticas()
+    }
+
+
+def finalizar_logging() -> None:
+    """
+    Grava os registros pendentes e encerra as threads de log.
+    """
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(finalizar_logging)
+
+
 # Inicializar o logger padrão que será importado por outros módulos
 # Usamos a variável de ambiente diretamente para evitar importação circular
 log_level = os.getenv("LOG_LEVEL", "info")
@@ -132,6 +395,43 @@ def log_requisicao(
     )
 
 
+def log_payload(
+    descricao: str,
+    payload: Any,
+    host: Optional[str] = None,
+    nivel: int = logging.DEBUG,
+    indent: Optional[int] = None,
+    limite: Optional[int] = None
+) -> None:
+    """
+    Registra um payload detalhado (alerta, resposta de serviço) sob demanda.
+    
+    Nada é serializado se o nível estiver desabilitado. Com o nível
+    habilitado, os payloads passam pela amostragem e pelo limite por host
+    (LOG_PAYLOAD_SAMPLE_RATE, LOG_PAYLOAD_MAX_PER_MINUTE), o que permite
+    manter DEBUG ligado em produção durante tempestades de alertas.
+    
+    Args:
+        descricao: Texto que antecede o payload
+        payload: Objeto a serializar em JSON
+        host: Host a que o payload se refere (chave da amostragem)
+        nivel: Nível do registro
+        indent: Indentação do JSON (opcional)
+        limite: Tamanho máximo do JSON (padrão: LOG_PAYLOAD_MAX_CHARS)
+    """
+    if not logger.isEnabledFor(nivel):
+        return
+    if not _limitador_payload.permitir(str(host or "-")):
+        return
+    
+    if limite is None:
+        limite = LogConfig.PAYLOAD_LIMITE_CARACTERES
+    logger.log(
+        nivel, "%s: %s", descricao, LazyJson(payload, indent=indent, limite=limite),
+        stacklevel=2
+    )
+
+
 def log_erro_integracao(
     servico: str,
     operacao: str,
@@ -0,0 +1,296 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+
+# Limites dos histogramas de latência (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Limites para operações rápidas em memória (validação de payloads)
+FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+
+
+class _Metric:
+    """
+    Base das métricas: cada thread grava no seu próprio shard.
+
+    Gravar uma amostra não usa locks: o shard da thread atual é obtido de
+    um threading.local e só essa thread escreve nele. Na coleta, os shards
+    de todas as threads são somados. O lock existe apenas para registrar o
+    shard de uma thread nova, uma única vez.
+    """
+
+    TYPE = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], Any]] = []
+        self._shards_lock = threading.Lock()
+
+        REGISTRY.register(self)
+
+    def _shard(self) -> Dict[Tuple[str, ...], Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[Tuple[str, ...], Any] = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshot(self) -> List[List[Tuple[Tuple[str, ...], Any]]]:
+        # list(dict.items()) é atômico no CPython, mesmo com a thread dona gravando
+        return [list(shard.items()) for shard in self._shards]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Contador monotônico.
+    """
+
+    TYPE = "counter"
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        """
+        Incrementa o contador.
+
+        Args:
+            *labels: Valores dos rótulos, na ordem de labelnames
+            value: Valor a somar
+        """
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for items in self._snapshot():
+            for labels, value in items:
+                totals[labels] = totals.get(labels, 0.0) + value
+
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(totals.items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Histograma com limites fixos.
+
+    Cada shard guarda as contagens por faixa (não cumulativas), a soma e a
+    quantidade de amostras; a forma cumulativa do Prometheus é montada
+    apenas na coleta.
+    """
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Registra uma amostra.
+
+        Args:
+            value: Valor observado (segundos, para latências)
+            *labels: Valores dos rótulos, na ordem de labelnames
+        """
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # Faixas + faixa +Inf + soma + quantidade
+            counts = shard[labels] = [0.0] * (len(self.buckets) + 3)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def render(self) -> List[str]:
+        totals: Dict[Tuple[str, ...], List[float]] = {}
+        for items in self._snapshot():
+            for labels, counts in items:
+                total = totals.setdefault(labels, [0.0] * len(counts))
+                for index, value in enumerate(list(counts)):
+                    total[index] += value
+
+        lines = []
+        for labels, counts in sorted(totals.items()):
+            cumulative = 0.0
+            bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_labels(self.labelnames + ('le',), labels + (bound,))} "
+                    f"{_number(cumulative)}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(counts[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_number(counts[-1])}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Valor instantâneo, atualizado no momento da coleta.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Define o valor atual.
+
+        Args:
+            value: Valor
+            *labels: Valores dos rótulos, na ordem de labelnames
+        """
+        self._values[labels] = float(value)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas expostas em /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """
+        Gera o texto no formato de exposição do Prometheus (0.0.4).
+
+        Returns:
+            Todas as métricas registradas
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: Optional[str]) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == int(value):
+        return f"{int(value)}"
+    return repr(value)
+
+
+REGISTRY = MetricsRegistry()
+
+# Latências
+ALERT_LATENCY = Histogram(
+    "dorothy_alert_latency_seconds",
+    "Tempo de ponta a ponta do processamento de um alerta",
+    ("ingestion",)
+)
+OLLAMA_LATENCY = Histogram(
+    "dorothy_ollama_request_seconds",
+    "Duração das requisições ao Ollama",
+    ("endpoint",)
+)
+RUNDECK_LATENCY = Histogram(
+    "dorothy_rundeck_webhook_seconds",
+    "Duração das chamadas aos webhooks do Rundeck",
+    ("job_id",)
+)
+HOST_LOCK_WAIT = Histogram(
+    "dorothy_host_lease_wait_seconds",
+    "Espera pela concessão do host antes da remediação, por resultado",
+    ("outcome",)
+)
+VALIDATION_LATENCY = Histogram(
+    "dorothy_alert_validation_seconds",
+    "Tempo de validação e normalização do payload do alerta",
+    buckets=FAST_BUCKETS
+)
+
+# Decisões
+DECISIONS = Counter(
+    "dorothy_decisions_total",
+    "Alertas decididos, por função escolhida e origem da decisão",
+    ("function", "decided_by")
+)
+FALLBACKS = Counter(
+    "dorothy_fallbacks_total",
+    "Ações de fallback, por motivo",
+    ("reason",)
+)
+RUNDECK_DISPATCHES = Counter(
+    "dorothy_rundeck_dispatches_total",
+    "Disparos de jobs no Rundeck, por job e resultado",
+    ("job_id", "status")
+)
+HOST_LOCK_CONTENTION = Counter(
+    "dorothy_host_lease_contention_total",
+    "Remediações que encontraram o host ocupado, por resultado (acquired, merged, timeout)",
+    ("outcome",)
+)
+THROTTLES = Counter(
+    "dorothy_action_throttle_total",
+    "Decisões do limite de execução das ações, por ação, decisão e limite atingido",
+    ("action", "decision", "limit")
+)
+RUNDECK_RETRIES = Counter(
+    "dorothy_rundeck_retries_total",
+    "Novas tentativas de disparo no Rundeck, por job e resultado (retried, budget_exhausted)",
+    ("job_id", "result")
+)
+
+# Estado atual (atualizado na coleta)
+INFLIGHT_ALERTS = Gauge(
+    "dorothy_inflight_alerts",
+    "Alertas com análise ou disparo em andamento"
+)
+QUEUE_DEPTH = Gauge(
+    "dorothy_queue_depth",
+    "Alertas aguardando na fila de processamento assíncrono"
+)
+HOST_LEASES = Gauge(
+    "dorothy_host_leases_active",
+    "Hosts com remediação em andamento ou em acomodação"
+)
+CORRELATION_BUFFERED = Gauge(
+    "dorothy_correlation_buffered_alerts",
+    "Alertas aguardando o fechamento da janela de correlação"
+)
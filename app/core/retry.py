@@ -0,0 +1,115 @@
+import random
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Calcula a espera antes da próxima tentativa (backoff exponencial com
+    jitter completo).
+
+    O jitter espalha as novas tentativas de vários alertas que falharam ao
+    mesmo tempo, em vez de reenviá-los todos juntos ao serviço.
+
+    Args:
+        attempt: Número da tentativa que falhou (a partir de 1)
+        base: Espera base em segundos
+        cap: Espera máxima em segundos
+
+    Returns:
+        Espera em segundos, sorteada entre 0 e min(cap, base * 2^(attempt-1))
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    Orçamento de novas tentativas de um serviço.
+
+    Limita as novas tentativas a uma fração das requisições feitas na
+    janela recente, mais um mínimo por segundo. Quando o serviço está fora
+    do ar, todas as chamadas falham; sem o orçamento, cada uma seria
+    repetida várias vezes, multiplicando a carga justamente sobre quem já
+    não está respondendo. Não é thread-safe: deve ser usado apenas no
+    event loop.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, window: float = 10.0):
+        """
+        Inicializa o orçamento.
+
+        Args:
+            ratio: Novas tentativas permitidas por requisição na janela
+            min_per_second: Novas tentativas sempre permitidas por segundo
+            window: Tamanho da janela em segundos
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+
+        # Contadores por segundo: [segundo, requisições, novas tentativas]
+        self._buckets: "deque[List[int]]" = deque()
+
+        self.granted = 0
+        self.denied = 0
+
+    def record_request(self) -> None:
+        """
+        Registra uma requisição nova (não conta as novas tentativas).
+        """
+        self._bucket()[1] += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Reserva uma nova tentativa, se o orçamento permitir.
+
+        Returns:
+            True se a nova tentativa pode ser feita
+        """
+        bucket = self._bucket()
+        requests, retries = self._totals()
+        if retries >= self.min_per_second * self.window + self.ratio * requests:
+            self.denied += 1
+            return False
+
+        bucket[2] += 1
+        self.granted += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o uso do orçamento na janela atual.
+
+        Returns:
+            Requisições e novas tentativas na janela, limite e contadores
+        """
+        self._prune()
+        requests, retries = self._totals()
+        return {
+            "window_seconds": self.window,
+            "requests": requests,
+            "retries": retries,
+            "allowed": round(self.min_per_second * self.window + self.ratio * requests, 1),
+            "granted": self.granted,
+            "denied": self.denied
+        }
+
+    def _bucket(self) -> List[int]:
+        second = int(time.monotonic())
+        self._prune(second)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        return self._buckets[-1]
+
+    def _prune(self, second: Optional[int] = None) -> None:
+        if second is None:
+            second = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= second - self.window:
+            self._buckets.popleft()
+
+    def _totals(self):
+        return (
+            sum(bucket[1] for bucket in self._buckets),
+            sum(bucket[2] for bucket in self._buckets)
+        )
@@ -0,0 +1,287 @@
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+
+# Namespace dos trace ids derivados do event_id do Zabbix
+_TRACE_NAMESPACE = uuid.UUID("5b0f6c1e-8a3d-4f6e-9c2b-7d4e1a9f3c60")
+_TRACE_PREFIX = _TRACE_NAMESPACE.bytes + b"zabbix:"
+
+# Trace do alerta em processamento no contexto atual (task ou thread)
+_current_trace: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "dorothy_trace_id", default=None
+)
+
+
+def trace_id_for(event_id: Any) -> str:
+    """
+    Gera o trace id de um evento do Zabbix.
+
+    O id é determinístico: o mesmo event_id sempre gera o mesmo trace id,
+    o que permite relacionar logs, execuções no Rundeck e reenvios do
+    mesmo evento.
+
+    Args:
+        event_id: ID do evento no Zabbix
+
+    Returns:
+        Trace id no formato UUID
+    """
+    # Mesmo resultado de uuid.uuid5(_TRACE_NAMESPACE, f"zabbix:{event_id}"),
+    # sem montar o objeto UUID (calculado para todo alerta recebido)
+    digest = bytearray(hashlib.sha1(_TRACE_PREFIX + str(event_id).encode()).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def trace_id_of(alert_data: Dict[str, Any]) -> str:
+    """
+    Retorna o trace id de um alerta normalizado.
+
+    Usa o trace_id já presente no alerta (propagado pelo ZabbixAlert ou
+    pelo remetente) ou o deriva do event_id.
+    """
+    return alert_data.get("trace_id") or trace_id_for(alert_data.get("event_id"))
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Retorna o trace id do alerta em processamento no contexto atual.
+    """
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(alert_data: Dict[str, Any], name: str = "alert") -> Iterator[str]:
+    """
+    Define o alerta em processamento no contexto atual e mede o trecho.
+
+    Logs, spans e chamadas ao Rundeck feitos dentro do bloco (inclusive em
+    tasks criadas nele) recebem o trace id do alerta.
+
+    Args:
+        alert_data: Dados normalizados do alerta
+        name: Nome do span raiz
+
+    Yields:
+        Trace id do alerta
+    """
+    trace_id = trace_id_of(alert_data)
+    token = _current_trace.set(trace_id)
+    try:
+        with span(name, event_id=alert_data.get("event_id"), host=alert_data.get("host")):
+            yield trace_id
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """
+    Mede um estágio do processamento do alerta atual.
+
+    Sem trace ativo ou com a exportação desativada, não faz nada.
+
+    Args:
+        name: Nome do estágio (ex: enrich, ollama.chat, rundeck.execute_job)
+        **args: Atributos anexados ao span
+    """
+    trace_id = _current_trace.get()
+    if trace_id is None or _exporter is None:
+        yield
+        return
+
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, trace_id, started_at, time.perf_counter() - start, **args)
+
+
+def record_span(name: str, trace_id: str, started_at: float, duration: float, **args: Any) -> None:
+    """
+    Registra um span já medido (ex: tempo na fila, validação do payload).
+
+    Args:
+        name: Nome do estágio
+        trace_id: Trace id do alerta
+        started_at: Início do estágio (timestamp Unix, em segundos)
+        duration: Duração em segundos
+        **args: Atributos anexados ao span
+    """
+    if _exporter is None:
+        return
+
+    _exporter.export({
+        "name": name,
+        "cat": "alert",
+        "ph": "X",
+        "ts": round(started_at * 1_000_000),
+        "dur": round(duration * 1_000_000),
+        "pid": _PID,
+        "tid": _lane(trace_id),
+        "args": {"trace_id": trace_id, **{k: v for k, v in args.items() if v is not None}}
+    })
+
+
+class ChromeTraceExporter:
+    """
+    Grava os spans em arquivo no formato Chrome Trace Event.
+
+    O arquivo pode ser aberto no Perfetto (ui.perfetto.dev) ou em
+    chrome://tracing; cada alerta aparece em uma linha própria. Os spans
+    são enfileirados sem bloquear quem registra e gravados por uma thread
+    dedicada; com a fila cheia, são descartados e contabilizados. Ao
+    atingir max_bytes, o arquivo é rotacionado (uma cópia .1 é mantida).
+    """
+
+    def __init__(self, path: str, max_bytes: int, queue_size: int = 10000):
+        """
+        Inicializa o exportador e inicia a thread de gravação.
+
+        Args:
+            path: Arquivo de saída
+            max_bytes: Tamanho a partir do qual o arquivo é rotacionado
+            queue_size: Spans aguardando gravação antes de descartar novos
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._lanes: set = set()
+
+        self.exported = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self) -> None:
+        """
+        Grava os spans pendentes e encerra a thread.
+        """
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize()
+        }
+
+    def _run(self) -> None:
+        output = self._open()
+        try:
+            while True:
+                event = self._queue.get()
+                if event is None:
+                    break
+
+                events = [event]
+                # Grava o que já estiver na fila de uma vez
+                while not self._queue.empty():
+                    pending = self._queue.get_nowait()
+                    if pending is None:
+                        self._queue.put(None)
+                        break
+                    events.append(pending)
+
+                try:
+                    output.write("".join(line for item in events for line in self._lines(item)))
+                    output.flush()
+                    self.exported += len(events)
+                    if output.tell() >= self.max_bytes:
+                        output = self._rotate(output)
+                except OSError as e:
+                    sys.stderr.write(f"Falha ao gravar spans em {self.path}: {e}\n")
+        finally:
+            output.close()
+
+    def _lines(self, event: Dict[str, Any]) -> list:
+        lines = []
+        lane = event["tid"]
+        if lane not in self._lanes:
+            # Nomeia a linha do alerta no visualizador
+            self._lanes.add(lane)
+            lines.append(_json_line({
+                "name": "thread_name",
+                "ph": "M",
+                "pid": event["pid"],
+                "tid": lane,
+                "args": {"name": f"trace {event['args']['trace_id']}"}
+            }))
+        lines.append(_json_line(event))
+        return lines
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        output = open(self.path, "a", encoding="utf-8")
+        if output.tell() == 0:
+            # O formato aceita o array sem o "]" final
+            output.write("[\n")
+        return output
+
+    def _rotate(self, output):
+        output.close()
+        os.replace(self.path, f"{self.path}.1")
+        self._lanes.clear()
+        return self._open()
+
+
+def _json_line(event: Dict[str, Any]) -> str:
+    return json.dumps(event, ensure_ascii=False, default=str) + ",\n"
+
+
+def _lane(trace_id: str) -> int:
+    # Identificador numérico estável da linha do alerta no visualizador
+    return int(trace_id.replace("-", "")[:8], 16)
+
+
+_PID = os.getpid()
+_exporter: Optional[ChromeTraceExporter] = None
+
+
+def start_exporter(path: str, max_bytes: int) -> None:
+    """
+    Ativa a exportação dos spans para o arquivo informado.
+    """
+    global _exporter
+    if _exporter is None:
+        _exporter = ChromeTraceExporter(path, max_bytes)
+
+
+def stop_exporter() -> None:
+    """
+    Grava os spans pendentes e desativa a exportação.
+    """
+    global _exporter
+    if _exporter is not None:
+        exporter, _exporter = _exporter, None
+        exporter.stop()
+
+
+def exporter_stats() -> Optional[Dict[str, Any]]:
+    """
+    Retorna os contadores do exportador, ou None se estiver desativado.
+    """
+    return _exporter.stats() if _exporter is not None else None
@@ -1,6 +1,12 @@
-from pydantic import BaseModel, Field, root_validator
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List, Union
 import time
+import uuid
+
+from app.core import json_codec
+from app.core.logging import log_payload
+from app.core.metrics import VALIDATION_LATENCY
+from app.core.tracing import trace_id_for, record_span
 
 class ZabbixTrigger(BaseModel):
     """
@@ -29,6 +35,7 @@ class ZabbixAlert(BaseModel):
     item_id: Optional[str] = Field(None, description="ID do item no Zabbix")
     trigger_id: Optional[str] = Field(None, description="ID do trigger no Zabbix")
     status: Optional[str] = Field(None, description="Status do problema (PROBLEM/RESOLVED)")
+    trace_id: Optional[str] = Field(None, description="ID de rastreamento (derivado do event_id)")
     
     # Campos opcionais para informações adicionais
     details: Optional[Dict[str, Any]] = Field(
@@ -40,73 +47,120 @@ class ZabbixAlert(BaseModel):
         description="Tags associadas ao evento"
     )
     
-    @root_validator(pre=True)
-    def extract_nested_fields(cls, values):
+    @model_validator(mode="wrap")
+    @classmethod
+    def normalize(cls, values, handler):
         """
-        Validador para manipular diferentes formatos de webhook do Zabbix.
-        
-        Este validador trata:
-        1. Dados enviados diretamente no formato esperado
-        2. Dados encapsulados em uma chave Message
-        3. Dados enviados em outros formatos comuns do Zabbix
+        Normaliza o payload do webhook e mede o tempo total de validação.
         
-        Args:
-            values: Valores recebidos na requisição
-            
-        Returns:
-            Dicionário com valores normalizados
+        O payload passa por normalize_alert (as mesmas regras do
+        /alert/direct) e o resultado, já com os campos do modelo, segue para
+        a validação do pydantic-core. Medido com utils/bench/normalize.py:
+        nesta versão do pydantic, model_construct sobre os campos
+        normalizados é mais lento que a validação compilada.
         """
-        # Captura o payload raw para debug
-        import json
-        from app.core.logging import logger
-        logger.debug(f"Valores recebidos no ZabbixAlert: {json.dumps(values)[:200]}...")
-        
-        # Caso 1: Se os dados vierem em um campo 'Message'
-        if 'Message' in values and values['Message']:
-            try:
-                # Tenta parsear o campo Message como JSON
-                message_data = json.loads(values['Message'])
-                if isinstance(message_data, dict):
-                    # Usa os dados do campo Message
-                    values.update(message_data)
-            except (json.JSONDecodeError, TypeError):
-                # Se Message não for JSON válido, tenta usar como problem
-                if 'problem' not in values:
-                    values['problem'] = values['Message']
+        if not isinstance(values, dict):
+            return handler(values)
         
-        # Caso 2: Se os dados vierem em um campo 'Subject' e faltar o 'problem'
-        if 'problem' not in values and 'Subject' in values and values['Subject']:
-            values['problem'] = values['Subject']
+        started_at = time.time()
+        start_time = time.perf_counter()
+        alert = handler(normalize_alert(values))
+        duration = time.perf_counter() - start_time
         
-        # Caso 3: Extrai os campos do objeto details, se presente
-        if 'details' in values and isinstance(values['details'], dict):
-            details = values['details']
-            
-            # Extrai campos do details para o nível principal se necessário
-            for field in ['item_id', 'trigger_id']:
-                if field in details and field not in values:
-                    values[field] = details[field]
-            
-            # Se não houver problem/severity, tenta extrair do details
-            if 'problem' not in values and 'description' in details:
-                values['problem'] = details['description']
-            if 'severity' not in values and 'priority' in details:
-                values['severity'] = details['priority']
-        
-        # Garante campos obrigatórios com valores padrão
-        if 'event_id' not in values:
-            values['event_id'] = values.get('eventid') or values.get('id') or str(int(time.time()))
-        if 'host' not in values:
-            values['host'] = values.get('hostname') or values.get('host_name') or 'unknown-host'
-        if 'problem' not in values:
-            values['problem'] = values.get('name') or values.get('description') or 'Unknown problem'
-        if 'severity' not in values:
-            values['severity'] = values.get('priority') or 'not classified'
-        
-        # Remove campos não utilizados
-        if 'endpoint' in values:
-            values.pop('endpoint')
-        if 'URL' in values:
-            values.pop('URL')
+        VALIDATION_LATENCY.observe(duration)
+        record_span("validate", alert.trace_id, started_at, duration)
+        return alert
+
+
+# Nomes alternativos de cada campo, na ordem de preferência
+_EVENT_ID_ALIASES = ("event_id", "eventid", "id")
+_HOST_ALIASES = ("host", "hostname", "host_name")
+_SUBJECT_ALIASES = ("Subject", "subject")
+_PROBLEM_FALLBACKS = ("name", "description")
+
+
+def _first(values: Dict[str, Any], names) -> Any:
+    for name in names:
+        value = values.get(name)
+        if value:
+            return value
+    return None
+
+
+def _text(value: Any) -> Any:
+    # IDs e prioridades numéricos viram texto; o resto fica para a validação
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def normalize_alert(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normaliza os diferentes formatos de webhook do Zabbix em uma passada.
+    
+    Regras únicas para o /alert (via ZabbixAlert) e o /alert/direct:
+    1. Dados enviados diretamente no formato esperado
+    2. Dados encapsulados em uma chave Message (JSON mesclado ao payload,
+       ou texto usado como problem)
+    3. Nomes alternativos (eventid, hostname, Subject, priority) e campos
+       extraídos do objeto details
+    
+    Campos vazios contam como ausentes. O payload recebido não é alterado.
+    
+    Args:
+        values: Payload decodificado
         
-        return values
\ No newline at end of file
+    Returns:
+        Dicionário só com os campos do ZabbixAlert, com os obrigatórios
+        preenchidos e o trace_id derivado do evento
+    """
+    # Captura o payload raw para debug (serializado só se DEBUG estiver ativo)
+    log_payload(
+        "Valores recebidos no ZabbixAlert",
+        values,
+        host=values.get("host") or values.get("hostname"),
+        limite=200
+    )
+    
+    message_text = None
+    message = values.get("Message")
+    if message:
+        if isinstance(message, str):
+            try:
+                message = json_codec.loads(message)
+            except json_codec.JSONDecodeError:
+                message_text, message = message, None
+        if isinstance(message, dict):
+            # Os dados do campo Message prevalecem sobre os do envelope
+            values = {**values, **message}
+    
+    details = values.get("details")
+    if not isinstance(details, dict):
+        details = {}
+    
+    # Sem ID no payload, o evento recebe um ID único: um ID só com o
+    # timestamp juntaria, na deduplicação e nos disparos, alertas
+    # diferentes recebidos no mesmo segundo
+    event_id = _first(values, _EVENT_ID_ALIASES) or f"{int(time.time())}-{uuid.uuid4().hex[:12]}"
+    tags = values.get("tags")
+    return {
+        "event_id": _text(event_id),
+        "host": _first(values, _HOST_ALIASES) or "unknown-host",
+        "problem": (
+            values.get("problem") or message_text or _first(values, _SUBJECT_ALIASES)
+            or details.get("description")
+            or _first(values, _PROBLEM_FALLBACKS) or "Unknown problem"
+        ),
+        "severity": _text(
+            values.get("severity") or details.get("priority") or values.get("priority") or "not classified"
+        ),
+        "timestamp": values.get("timestamp") or None,
+        "item_id": _text(values.get("item_id") or details.get("item_id")),
+        "trigger_id": _text(values.get("trigger_id") or details.get("trigger_id")),
+        "status": values.get("status") or None,
+        # Trace id do alerta: mantém o recebido ou deriva do evento
+        "trace_id": values.get("trace_id") or trace_id_for(event_id),
+        "details": details,
+        "tags": tags if isinstance(tags, list) else [],
+    }
+
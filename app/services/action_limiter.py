@@ -0,0 +1,217 @@
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import THROTTLES
+
+
+class TokenBucket:
+    """
+    Balde de fichas: até capacity disparos seguidos, repostos à taxa rate.
+
+    O saldo pode ficar negativo: cada ficha retirada sem saldo é uma
+    reserva para o futuro, e quem reservou aguarda wait() antes de disparar.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def wait(self) -> float:
+        """
+        Retorna os segundos até a próxima ficha (0 se houver saldo).
+        """
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    def refill_time(self) -> float:
+        """
+        Retorna os segundos até o balde voltar à capacidade total.
+        """
+        self._refill()
+        return (self.capacity - self.tokens) / self.rate
+
+    def available(self) -> float:
+        """
+        Retorna o saldo atual (negativo se houver disparos reservados).
+        """
+        self._refill()
+        return self.tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+def parse_rate(spec: str) -> Optional[Tuple[float, float]]:
+    """
+    Interpreta um limite no formato "disparos/segundos".
+
+    Args:
+        spec: Limite (ex: "2/600" = 2 disparos seguidos, repostos em 10 minutos)
+
+    Returns:
+        Capacidade e taxa de reposição (fichas por segundo), ou None se vazio
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    count, _, period = spec.partition("/")
+    capacity, seconds = float(count), float(period or 1)
+    if capacity <= 0 or seconds <= 0:
+        raise ValueError(f"Limite de execução inválido: {spec}")
+    return capacity, capacity / seconds
+
+
+class ActionRateLimiter:
+    """
+    Limita a frequência das ações de remediação por host e por ação.
+
+    Um gatilho que oscila faria o mesmo serviço ser reiniciado várias vezes
+    por minuto, deixando o host mais lento e ocupando o Rundeck. Cada ação
+    tem um balde por host e um balde global (ver ACTION_RATE_LIMITS); o
+    disparo só é liberado se houver ficha nos dois. Sem ficha, o alerta é
+    rebaixado para notificação ou, no modo "defer", aguarda a próxima ficha.
+    Não é thread-safe: deve ser usado apenas no event loop.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, str]]] = None,
+        mode: str = settings.RATE_LIMIT_MODE,
+        max_defer: float = settings.RATE_LIMIT_MAX_DEFER,
+        max_hosts: int = settings.RATE_LIMIT_MAX_HOSTS
+    ):
+        """
+        Inicializa o limitador.
+
+        Args:
+            limits: Limites por ação (padrão: settings.ACTION_RATE_LIMITS)
+            mode: "notify" (rebaixa) ou "defer" (aguarda a próxima ficha)
+            max_defer: Espera máxima em segundos no modo "defer"
+            max_hosts: Baldes por host × ação mantidos em memória
+        """
+        if mode not in ("notify", "defer"):
+            raise ValueError(f"Modo de limite de execução inválido: {mode}")
+
+        self.mode = mode
+        self.max_defer = max_defer
+
+        self._host_rates: Dict[str, Tuple[float, float]] = {}
+        self._actions: Dict[str, TokenBucket] = {}
+        for action, limit in (settings.ACTION_RATE_LIMITS if limits is None else limits).items():
+            action = action.replace("_", "-")
+            host_rate = parse_rate(limit.get("host", ""))
+            if host_rate is not None:
+                self._host_rates[action] = host_rate
+            action_rate = parse_rate(limit.get("action", ""))
+            if action_rate is not None:
+                self._actions[action] = TokenBucket(*action_rate)
+
+        # Baldes por host × ação; cada um expira quando já teria sido
+        # reposto por completo, incluindo as fichas reservadas
+        self._hosts = TTLCache(max_size=max_hosts, ttl=3600)
+
+        self.counters: Dict[str, int] = {"allowed": 0, "deferred": 0, "downgraded": 0}
+
+    def limited(self, action: str) -> bool:
+        """
+        Verifica se a ação tem algum limite configurado.
+        """
+        action = action.replace("_", "-")
+        return action in self._host_rates or action in self._actions
+
+    def acquire(self, action: str, host: str) -> Dict[str, Any]:
+        """
+        Reserva um disparo da ação para o host.
+
+        Args:
+            action: Ação recomendada (com _ ou -)
+            host: Host do alerta
+
+        Returns:
+            Decisão: "allowed", "deferred" (com wait_seconds a aguardar antes
+            do disparo) ou "downgraded" (sem disparo), com o limite atingido
+        """
+        action = action.replace("_", "-")
+        buckets = []
+
+        host_bucket = None
+        host_rate = self._host_rates.get(action)
+        if host_rate is not None:
+            host_bucket = self._hosts.get((action, host))
+            if host_bucket is None:
+                host_bucket = TokenBucket(*host_rate)
+            buckets.append(("host", host_bucket))
+
+        action_bucket = self._actions.get(action)
+        if action_bucket is not None:
+            buckets.append(("action", action_bucket))
+
+        limit, wait = None, 0.0
+        for scope, bucket in buckets:
+            bucket_wait = bucket.wait()
+            if bucket_wait > wait:
+                limit, wait = scope, bucket_wait
+
+        if wait == 0:
+            decision = "allowed"
+        elif self.mode == "defer" and wait <= self.max_defer:
+            decision = "deferred"
+        else:
+            decision = "downgraded"
+
+        if decision != "downgraded":
+            for _, bucket in buckets:
+                bucket.take()
+
+        if host_bucket is not None:
+            # O balde só expira quando já estaria cheio de novo: com fichas
+            # reservadas (saldo negativo), a dívida não pode ser esquecida
+            self._hosts.set((action, host), host_bucket, ttl=host_bucket.refill_time())
+
+        self.counters[decision] += 1
+        THROTTLES.inc(action, decision, limit or "none")
+        if decision == "deferred":
+            logger.warning(f"Limite de execução ({limit}) de {action} atingido para o host {host}: disparo adiado em {wait:.1f}s")
+        elif decision == "downgraded":
+            logger.warning(
+                f"Limite de execução ({limit}) de {action} atingido para o host {host}: "
+                f"rebaixado para notificação, próximo disparo em {wait:.1f}s"
+            )
+
+        return {
+            "decision": decision,
+            "limit": limit,
+            "wait_seconds": round(wait, 3),
+            "mode": self.mode
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as decisões tomadas e a ocupação dos baldes.
+
+        Returns:
+            Contadores por decisão, baldes por host e fichas globais restantes
+        """
+        return {
+            **self.counters,
+            "mode": self.mode,
+            "host_buckets": len(self._hosts),
+            "action_tokens": {
+                action: round(bucket.available(), 1) for action, bucket in self._actions.items()
+            }
+        }
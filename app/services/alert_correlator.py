@@ -0,0 +1,230 @@
+import asyncio
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Ordem das severidades do Zabbix (nomes e prioridades numéricas)
+_SEVERITY_RANK = {
+    "not classified": 0, "0": 0,
+    "information": 1, "info": 1, "1": 1,
+    "warning": 2, "2": 2,
+    "average": 3, "medium": 3, "3": 3,
+    "high": 4, "4": 4,
+    "disaster": 5, "critical": 5, "5": 5,
+}
+
+
+class _Window:
+    """
+    Janela de correlação aberta para um host.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.opened_at = time.time()
+        self.alerts: List[Dict[str, Any]] = []
+        self.futures: List["asyncio.Future[Dict[str, Any]]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AlertCorrelator:
+    """
+    Agrupa alertas do mesmo host que chegam em sequência.
+
+    Quando um host degrada, o Zabbix dispara gatilhos de disco, CPU,
+    serviço e memória em poucos segundos. O primeiro alerta do host abre
+    uma janela de correlação; os alertas que chegam enquanto ela está
+    aberta são acumulados e, ao fechar (por tempo ou por tamanho), são
+    entregues juntos ao processador do incidente. Cada chamador recebe o
+    resultado correspondente ao seu alerta.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+        window: float = settings.CORRELATION_WINDOW,
+        max_alerts: int = settings.CORRELATION_MAX_ALERTS
+    ):
+        """
+        Inicializa o correlacionador.
+
+        Args:
+            handler: Processa os alertas de uma janela e retorna um resultado
+                por alerta, na mesma ordem
+            window: Tempo em segundos que a janela fica aberta
+            max_alerts: Quantidade de alertas que fecha a janela antes do tempo
+        """
+        self.handler = handler
+        self.window = window
+        self.max_alerts = max(1, max_alerts)
+
+        self._windows: Dict[str, _Window] = {}
+        self._running: set = set()
+
+        self.incidents = 0
+        self.correlated = 0
+
+    async def submit(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adiciona o alerta à janela do host e aguarda o resultado do incidente.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Resultado do processamento para este alerta
+        """
+        host = str(alert_data.get("host") or "")
+        window = self._windows.get(host)
+        if window is None:
+            window = _Window(host)
+            self._windows[host] = window
+            window.timer = asyncio.get_running_loop().call_later(
+                self.window, self._close, window
+            )
+
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        window.alerts.append(alert_data)
+        window.futures.append(future)
+
+        if len(window.alerts) >= self.max_alerts:
+            self._close(window)
+
+        return await future
+
+    async def stop(self) -> None:
+        """
+        Fecha as janelas abertas e aguarda o processamento pendente.
+        """
+        for window in list(self._windows.values()):
+            self._close(window)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de correlação.
+
+        Returns:
+            Janelas abertas, alertas aguardando, incidentes processados e
+            alertas que foram agrupados com outros
+        """
+        return {
+            "open_windows": len(self._windows),
+            "buffered_alerts": sum(len(w.alerts) for w in self._windows.values()),
+            "incidents": self.incidents,
+            "correlated_alerts": self.correlated,
+            "window_seconds": self.window,
+            "max_alerts": self.max_alerts
+        }
+
+    def _close(self, window: _Window) -> None:
+        """
+        Fecha a janela e inicia o processamento dos alertas acumulados.
+
+        Args:
+            window: Janela a ser fechada
+        """
+        if self._windows.get(window.host) is not window:
+            return
+
+        del self._windows[window.host]
+        if window.timer is not None:
+            window.timer.cancel()
+
+        task = asyncio.ensure_future(self._run(window))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, window: _Window) -> None:
+        """
+        Processa os alertas de uma janela e entrega o resultado a cada chamador.
+
+        Args:
+            window: Janela fechada
+        """
+        # Alertas cujo chamador desistiu (ex: problema resolvido) são descartados
+        pending = [
+            (alert_data, future)
+            for alert_data, future in zip(window.alerts, window.futures)
+            if not future.done()
+        ]
+        if not pending:
+            return
+        window.alerts = [alert_data for alert_data, _ in pending]
+        window.futures = [future for _, future in pending]
+
+        self.incidents += 1
+        if len(window.alerts) > 1:
+            self.correlated += len(window.alerts)
+            logger.info(
+                f"{len(window.alerts)} alertas do host {window.host} correlacionados "
+                f"em {time.time() - window.opened_at:.2f} segundos"
+            )
+
+        try:
+            results = await self.handler(window.alerts)
+        except Exception as e:
+            for future in window.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in zip(window.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def merge_alerts(alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combina os alertas de um host em um único incidente.
+
+    O incidente mantém o evento e o gatilho do primeiro alerta, a maior
+    severidade, todos os problemas distintos, a união das tags e dos
+    detalhes e a lista de sintomas para o prompt do modelo.
+
+    Args:
+        alerts: Alertas do mesmo host, na ordem de chegada
+
+    Returns:
+        Dados normalizados do incidente
+    """
+    first = alerts[0]
+
+    problems: List[str] = []
+    tags: List[Dict[str, Any]] = []
+    details: Dict[str, Any] = {}
+    for alert_data in alerts:
+        problem = alert_data.get("problem")
+        if problem and problem not in problems:
+            problems.append(problem)
+        for tag in alert_data.get("tags") or []:
+            if tag not in tags:
+                tags.append(tag)
+        for key, value in (alert_data.get("details") or {}).items():
+            details.setdefault(key, value)
+
+    severity = max(
+        (alert_data.get("severity") for alert_data in alerts),
+        key=lambda value: _SEVERITY_RANK.get(str(value or "").lower(), 0)
+    )
+
+    return {
+        **first,
+        "problem": " | ".join(problems),
+        "severity": severity,
+        "details": details,
+        "tags": tags,
+        "symptoms": [
+            {
+                "event_id": alert_data.get("event_id"),
+                "trigger_id": alert_data.get("trigger_id"),
+                "problem": alert_data.get("problem"),
+                "severity": alert_data.get("severity")
+            }
+            for alert_data in alerts
+        ]
+    }
@@ -0,0 +1,752 @@
+import asyncio
+from typing import Dict, Any, Awaitable, List, Optional, Tuple
+
+from app.services.ollama_service import OllamaService
+from app.services.rundeck_service import RundeckService
+from app.services.event_deduplicator import EventDeduplicator
+from app.services.decision_cache import DecisionCache
+from app.services.rule_matcher import RuleMatcher
+from app.services.alert_correlator import AlertCorrelator, merge_alerts
+from app.services.dispatch_aggregator import DispatchAggregator
+from app.services.action_limiter import ActionRateLimiter
+from app.services.host_leases import HostLeaseManager
+from app.services.incident_store import IncidentStore
+from app.services.host_context import HostContextTracker
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import DECISIONS
+from app.core.tracing import trace, span
+
+
+# Status do Zabbix que indicam que o problema foi resolvido
+_RESOLVED_STATUSES = {"RESOLVED", "OK"}
+
+
+class AlertPipeline:
+    """
+    Orquestra o processamento completo de um alerta normalizado.
+
+    Envia o alerta para análise no Ollama e, se a análise indicar
+    necessidade de ação, dispara o job correspondente no Rundeck.
+    É compartilhado pelas rotas síncronas e pela fila de processamento.
+    """
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        rundeck_service: RundeckService,
+        deduplicator: Optional[EventDeduplicator] = None,
+        decision_cache: Optional[DecisionCache] = None,
+        rule_matcher: Optional[RuleMatcher] = None,
+        correlator: Optional[AlertCorrelator] = None,
+        incident_store: Optional[IncidentStore] = None,
+        host_context: Optional[HostContextTracker] = None,
+        dispatch_aggregator: Optional[DispatchAggregator] = None,
+        action_limiter: Optional[ActionRateLimiter] = None,
+        host_leases: Optional[HostLeaseManager] = None
+    ):
+        """
+        Inicializa o pipeline com os serviços de análise e execução.
+
+        Args:
+            ollama_service: Serviço de análise com o LLM
+            rundeck_service: Serviço de execução de jobs
+            deduplicator: Deduplicador de eventos repetidos (opcional)
+            decision_cache: Cache de decisões do LLM (opcional)
+            rule_matcher: Classificador por regras (opcional)
+            correlator: Correlacionador de alertas por host (opcional)
+            incident_store: Histórico persistente de incidentes (opcional)
+            host_context: Resumos do histórico por host para o prompt (opcional)
+            dispatch_aggregator: Agrupador de disparos entre hosts (opcional)
+            action_limiter: Limite de execução das ações por host e ação (opcional)
+            host_leases: Concessões que serializam as remediações de cada host (opcional)
+        """
+        self.ollama_service = ollama_service
+        self.rundeck_service = rundeck_service
+        self.deduplicator = deduplicator or EventDeduplicator()
+        self.decision_cache = decision_cache
+        if self.decision_cache is None and settings.DECISION_CACHE_ENABLED:
+            self.decision_cache = DecisionCache()
+        self.rule_matcher = rule_matcher
+        if self.rule_matcher is None and settings.RULES_ENABLED:
+            self.rule_matcher = RuleMatcher()
+        self.correlator = correlator
+        if self.correlator is None and settings.CORRELATION_ENABLED:
+            self.correlator = AlertCorrelator(self._process_incident)
+        self.incident_store = incident_store
+        self.host_context = host_context
+        if self.host_context is None and settings.HOST_CONTEXT_ENABLED:
+            self.host_context = HostContextTracker()
+        self.dispatch_aggregator = dispatch_aggregator
+        if self.dispatch_aggregator is None and settings.RUNDECK_FANIN_ENABLED:
+            self.dispatch_aggregator = DispatchAggregator(self.rundeck_service)
+        self.action_limiter = action_limiter
+        if self.action_limiter is None and settings.RATE_LIMIT_ENABLED:
+            self.action_limiter = ActionRateLimiter()
+        self.host_leases = host_leases
+        if self.host_leases is None and settings.HOST_LEASE_ENABLED:
+            self.host_leases = HostLeaseManager()
+        
+        # Quantidade de alertas decididos por cada caminho (rules, cache, llm, fallback)
+        self.decisions: Dict[str, int] = {}
+        
+        # Análises em andamento que podem ser canceladas por um RESOLVED
+        self._pending: Dict[str, Tuple[Dict[str, Any], asyncio.Task]] = {}
+        self.cancelled = 0
+
+    @staticmethod
+    def is_resolved(alert_data: Dict[str, Any]) -> bool:
+        """
+        Verifica se o alerta é uma notificação de resolução do problema.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            True se o status do alerta for RESOLVED (ou OK)
+        """
+        return str(alert_data.get("status") or "").upper() in _RESOLVED_STATUSES
+
+    async def process(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Processa o alerta, reaproveitando o resultado de eventos repetidos.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Detalhes da análise e da ação executada
+        """
+        with trace(alert_data):
+            if self.is_resolved(alert_data):
+                return self.resolve(alert_data)
+
+            key = self.deduplicator.event_key(alert_data)
+            result, source = await self.deduplicator.run(
+                key,
+                lambda: self._analyze_and_dispatch(alert_data)
+            )
+
+        if source == "miss":
+            return result
+        return {**result, "deduplicated": source}
+
+    def resolve(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fecha o incidente de um problema resolvido, sem consultar o LLM.
+
+        Cancela as análises em andamento do mesmo evento ou gatilho (ações
+        já em disparo no Rundeck não são interrompidas) e guarda o
+        fechamento no deduplicador, para que reenvios atrasados do PROBLEM
+        não disparem uma remediação para um problema que já passou.
+
+        Args:
+            alert_data: Dados normalizados do alerta RESOLVED
+
+        Returns:
+            Detalhes do fechamento do incidente
+        """
+        cancelled = 0
+        for key, (pending_alert, task) in list(self._pending.items()):
+            if _same_problem(pending_alert, alert_data):
+                del self._pending[key]
+                task.cancel()
+                cancelled += 1
+
+        self.cancelled += cancelled
+        self._count_decision({"decided_by": "resolved"})
+        if cancelled:
+            logger.info(
+                f"Problema {alert_data.get('event_id')} resolvido, "
+                f"{cancelled} análise(s) pendente(s) cancelada(s)"
+            )
+
+        result = {
+            "event_id": alert_data.get("event_id"),
+            "host": alert_data.get("host"),
+            "problem": alert_data.get("problem"),
+            "severity": alert_data.get("severity"),
+            "analysis": {
+                "action": "none",
+                "requires_action": False,
+                "reason": "Problema resolvido, nenhuma ação necessária",
+                "decided_by": "resolved"
+            },
+            "action_taken": {},
+            "resolution": {
+                "incident": "closed",
+                "cancelled_analyses": cancelled
+            }
+        }
+
+        problem_key = self.deduplicator.event_key({**alert_data, "status": "PROBLEM"})
+        self.deduplicator.remember(problem_key, result)
+        self._record(alert_data, result)
+        return result
+
+    async def analyze(self, alert_data: Dict[str, Any], store: bool = True) -> Dict[str, Any]:
+        """
+        Determina a ação para o alerta.
+
+        Tenta primeiro as regras determinísticas, depois o cache de decisões
+        e, apenas se ambos não decidirem, o LLM.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            store: Se False (depuração), a decisão não é guardada no cache
+                nem contabilizada nas métricas de decisão
+
+        Returns:
+            Análise com a ação recomendada e a origem da decisão
+        """
+        # Decisões que dependem do histórico de um host não entram no cache
+        # compartilhado pela frota, nem são atendidas por ele
+        context_alert = self._with_host_context(alert_data)
+        use_cache = context_alert is alert_data
+
+        with span("decide_without_llm"):
+            analysis_result = self._decide_without_llm(alert_data, use_cache=use_cache)
+
+        if analysis_result is None:
+            analysis_result = await self.ollama_service.analyze_alert(context_alert)
+
+            if store and use_cache and self.decision_cache is not None:
+                self.decision_cache.store(alert_data, analysis_result)
+
+        if store:
+            self._count_decision(analysis_result)
+        return analysis_result
+
+    async def process_batch(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Processa um lote de alertas com o mínimo de chamadas ao LLM.
+
+        Alertas decididos pelas regras ou pelo cache não vão ao modelo. Os
+        demais são analisados em grupos de OLLAMA_BATCH_SIZE alertas por
+        chamada. Eventos já processados ou em processamento, e as cópias de
+        um mesmo evento dentro do lote, não são analisados: recebem a
+        resposta do deduplicador, como no processamento individual. Os
+        disparos no Rundeck são feitos em paralelo.
+
+        Args:
+            alerts: Dados normalizados dos alertas
+
+        Returns:
+            Detalhes da análise e da ação de cada alerta, na ordem recebida
+        """
+        resolved = {
+            index: self.resolve(alert_data)
+            for index, alert_data in enumerate(alerts)
+            if self.is_resolved(alert_data)
+        }
+
+        # Só a primeira cópia de um evento ainda não visto é analisada; as
+        # demais aguardam ou reaproveitam a resposta pelo deduplicador
+        deduplicated = set()
+        first_seen = set()
+        for index, alert_data in enumerate(alerts):
+            if index in resolved:
+                continue
+            key = self.deduplicator.event_key(alert_data)
+            if key in first_seen or self.deduplicator.seen(key):
+                deduplicated.add(index)
+            first_seen.add(key)
+
+        skipped = resolved.keys() | deduplicated
+        context_alerts = [
+            alert_data if index in skipped else self._with_host_context(alert_data)
+            for index, alert_data in enumerate(alerts)
+        ]
+        analyses: List[Optional[Dict[str, Any]]] = [
+            None if index in skipped else self._decide_without_llm(
+                alert_data, use_cache=context_alerts[index] is alert_data
+            )
+            for index, alert_data in enumerate(alerts)
+        ]
+
+        pending = [
+            index for index, analysis in enumerate(analyses)
+            if analysis is None and index not in skipped
+        ]
+        batch_size = max(1, settings.OLLAMA_BATCH_SIZE)
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+        chunk_results = await asyncio.gather(*(
+            self.ollama_service.analyze_batch([context_alerts[index] for index in chunk])
+            for chunk in chunks
+        ))
+
+        for chunk, results in zip(chunks, chunk_results):
+            for index, analysis_result in zip(chunk, results):
+                if self.decision_cache is not None and context_alerts[index] is alerts[index]:
+                    self.decision_cache.store(alerts[index], analysis_result)
+                analyses[index] = analysis_result
+
+        for index, analysis_result in enumerate(analyses):
+            if index not in skipped:
+                self._count_decision(analysis_result)
+
+        # As cópias vêm depois da primeira ocorrência no gather, que já terá
+        # registrado o evento em andamento quando elas consultarem o deduplicador
+        results = await asyncio.gather(*(
+            self.process(alert_data) if index in deduplicated
+            else self._process_analyzed(alert_data, analysis_result)
+            for index, (alert_data, analysis_result) in enumerate(zip(alerts, analyses))
+            if index not in resolved
+        ))
+        dispatched = iter(results)
+        return [
+            resolved[index] if index in resolved else next(dispatched)
+            for index in range(len(alerts))
+        ]
+
+    def _count_decision(self, analysis_result: Dict[str, Any]) -> None:
+        """
+        Contabiliza a origem da decisão de uma análise.
+
+        Args:
+            analysis_result: Análise com a ação recomendada
+        """
+        source = analysis_result.get("decided_by", "llm")
+        self.decisions[source] = self.decisions.get(source, 0) + 1
+
+        function_name = (
+            (analysis_result.get("function_called") or {}).get("name")
+            or analysis_result.get("action")
+            or "none"
+        )
+        DECISIONS.inc(function_name, source)
+
+    def _decide_without_llm(
+        self,
+        alert_data: Dict[str, Any],
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Tenta decidir a ação pelas regras ou pelo cache de decisões.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            use_cache: Se False (host com histórico), consulta só as regras
+
+        Returns:
+            Análise com a ação recomendada, ou None se for preciso consultar o LLM
+        """
+        if self.rule_matcher is not None:
+            match = self.rule_matcher.classify(alert_data)
+            if match is not None:
+                analysis_result = self.ollama_service.build_action(
+                    match["function"], match["arguments"], alert_data, decided_by="rules"
+                )
+                analysis_result["rule_keywords"] = match["keywords"]
+                return analysis_result
+
+        if use_cache and self.decision_cache is not None:
+            cached = self.decision_cache.lookup(alert_data)
+            if cached is not None:
+                function_name, arguments = cached
+                return self.ollama_service.build_action(
+                    function_name, arguments, alert_data, decided_by="cache"
+                )
+
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas dos componentes do pipeline.
+
+        Returns:
+            Estatísticas agrupadas por componente
+        """
+        stats = {
+            "decisions": dict(self.decisions),
+            "deduplication": self.deduplicator.stats(),
+            "cancelled_by_resolution": self.cancelled
+        }
+        if self.rule_matcher is not None:
+            stats["rules"] = self.rule_matcher.stats()
+        if self.decision_cache is not None:
+            stats["decision_cache"] = self.decision_cache.stats()
+        if self.correlator is not None:
+            stats["correlation"] = self.correlator.stats()
+        if self.incident_store is not None:
+            stats["incident_store"] = self.incident_store.stats()
+        if self.host_context is not None:
+            stats["host_context"] = self.host_context.stats()
+        if self.dispatch_aggregator is not None:
+            stats["fan_in"] = self.dispatch_aggregator.stats()
+        if self.action_limiter is not None:
+            stats["rate_limit"] = self.action_limiter.stats()
+        if self.host_leases is not None:
+            stats["host_leases"] = self.host_leases.stats()
+        return stats
+
+    async def stop(self) -> None:
+        """
+        Finaliza os incidentes ainda em correlação e os disparos agrupados.
+        """
+        if self.correlator is not None:
+            await self.correlator.stop()
+        if self.dispatch_aggregator is not None:
+            await self.dispatch_aggregator.stop()
+
+    async def _analyze_and_dispatch(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analisa o alerta e executa a ação recomendada.
+
+        Com a correlação ativa, o alerta aguarda a janela do host e é
+        processado junto com os demais alertas do mesmo incidente.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Detalhes da análise e da ação executada
+        """
+        key = self.deduplicator.event_key(alert_data)
+
+        if self.correlator is not None:
+            result = await self._cancellable(key, alert_data, self.correlator.submit(alert_data))
+            return result if result is not None else self._cancelled(alert_data)
+
+        analysis_result = await self._cancellable(key, alert_data, self.analyze(alert_data))
+        if analysis_result is None:
+            return self._cancelled(alert_data)
+        return await self._dispatch(alert_data, analysis_result)
+
+    async def _cancellable(
+        self,
+        key: str,
+        alert_data: Dict[str, Any],
+        work: Awaitable[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Executa uma etapa que pode ser cancelada pela resolução do problema.
+
+        Args:
+            key: Chave do evento
+            alert_data: Dados normalizados do alerta
+            work: Etapa a executar
+
+        Returns:
+            Resultado da etapa, ou None se ela foi cancelada por um RESOLVED
+        """
+        task = asyncio.ensure_future(work)
+        self._pending[key] = (alert_data, task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # resolve() remove a análise de _pending antes de cancelá-la
+            if task.cancelled() and key not in self._pending:
+                return None
+            raise
+        finally:
+            if self._pending.get(key, (None, None))[1] is task:
+                del self._pending[key]
+
+    def _cancelled(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Monta e registra o resultado de um alerta cuja análise foi cancelada.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Detalhes do alerta sem ação executada
+        """
+        result = {
+            "event_id": alert_data.get("event_id"),
+            "host": alert_data.get("host"),
+            "problem": alert_data.get("problem"),
+            "severity": alert_data.get("severity"),
+            "analysis": {
+                "action": "none",
+                "requires_action": False,
+                "reason": "Análise cancelada: o problema foi resolvido antes da conclusão",
+                "decided_by": "resolved"
+            },
+            "action_taken": {}
+        }
+        self._record(alert_data, result)
+        return result
+
+    def _with_host_context(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Acrescenta ao alerta o resumo do histórico do host, se houver.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Alerta com o campo host_context (ou o próprio alerta)
+        """
+        if self.host_context is None:
+            return alert_data
+
+        context = self.host_context.render(alert_data.get("host"))
+        if not context:
+            return alert_data
+        return {**alert_data, "host_context": context}
+
+    def _record(
+        self,
+        alert_data: Dict[str, Any],
+        result: Dict[str, Any],
+        prompt: Optional[str] = None
+    ) -> None:
+        """
+        Envia o incidente concluído para o histórico e o resumo do host.
+
+        Args:
+            alert_data: Dados normalizados do alerta (ou do incidente correlacionado)
+            result: Resultado do processamento
+            prompt: Prompt enviado ao LLM, se a decisão foi dele
+        """
+        if self.incident_store is not None:
+            self.incident_store.record(alert_data, result, prompt)
+        if self.host_context is not None:
+            self.host_context.observe(alert_data, result)
+
+    async def _process_incident(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analisa e executa uma única ação para os alertas correlacionados de um host.
+
+        Args:
+            alerts: Alertas do mesmo host acumulados na janela de correlação
+
+        Returns:
+            Resultado de cada alerta, na ordem recebida
+        """
+        if len(alerts) == 1:
+            analysis_result = await self.analyze(alerts[0])
+            return [await self._dispatch(alerts[0], analysis_result)]
+
+        incident = merge_alerts(alerts)
+        analysis_result = await self.analyze(incident)
+        result = await self._dispatch(incident, analysis_result)
+
+        incident_info = {
+            "event_id": incident.get("event_id"),
+            "alerts": len(alerts),
+            "event_ids": [alert_data.get("event_id") for alert_data in alerts]
+        }
+        return [
+            {
+                **result,
+                "event_id": alert_data.get("event_id"),
+                "problem": alert_data.get("problem"),
+                "severity": alert_data.get("severity"),
+                "incident": incident_info
+            }
+            for alert_data in alerts
+        ]
+
+    async def _process_analyzed(
+        self,
+        alert_data: Dict[str, Any],
+        analysis_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Dispara a ação de um alerta já analisado, passando pelo deduplicador.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            analysis_result: Análise com a ação recomendada
+
+        Returns:
+            Detalhes da análise e da ação executada
+        """
+        with trace(alert_data):
+            key = self.deduplicator.event_key(alert_data)
+            result, source = await self.deduplicator.run(
+                key,
+                lambda: self._dispatch(alert_data, analysis_result)
+            )
+
+        if source == "miss":
+            return result
+        return {**result, "deduplicated": source}
+
+    async def _dispatch(
+        self,
+        alert_data: Dict[str, Any],
+        analysis_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Executa no Rundeck a ação recomendada pela análise.
+
+        Com a concessão por host ativa, a remediação aguarda as remediações
+        conflitantes do mesmo host e reaproveita o disparo de uma igual.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            analysis_result: Análise com a ação recomendada
+
+        Returns:
+            Detalhes da análise e da ação executada
+        """
+        lease = None
+        merged = False
+        action_response = {}
+        if analysis_result.get("requires_action", False) and self.host_leases is not None:
+            with span("host_lease.acquire"):
+                outcome, lease = await self.host_leases.acquire(
+                    str(alert_data.get("host") or ""),
+                    str(analysis_result.get("action") or ""),
+                    analysis_result.get("job_parameters", {}),
+                    holder=alert_data.get("event_id")
+                )
+            lease_info = {"outcome": outcome, "holder": lease.holder if lease is not None else None}
+
+            if outcome == "merged":
+                # A mesma remediação já foi disparada para o host
+                analysis_result = {**analysis_result, "host_lease": lease_info}
+                action_response = {**lease.result.result(), "merged": True}
+                merged = True
+                lease = None
+            elif outcome == "timeout":
+                analysis_result = self._downgrade_to_notify(
+                    alert_data, analysis_result,
+                    f"host ocupado com {lease.action}",
+                    "host_lease", lease_info
+                )
+                lease = None
+            else:
+                analysis_result = {**analysis_result, "host_lease": lease_info}
+                if outcome != "acquired":
+                    lease = None
+
+        try:
+            if analysis_result.get("requires_action", False) and self.action_limiter is not None and not merged:
+                analysis_result = await self._apply_rate_limit(alert_data, analysis_result)
+
+            # Se a análise indicar necessidade de ação no Rundeck
+            if analysis_result.get("requires_action", False) and not merged:
+                job_id = analysis_result.get("recommended_job_id")
+                if job_id:
+                    parameters = analysis_result.get("job_parameters", {})
+                    if self.dispatch_aggregator is not None and self.dispatch_aggregator.accepts(job_id):
+                        action_response = await self.dispatch_aggregator.submit(alert_data, job_id, parameters)
+                    else:
+                        # Nó alvo do job (nodefilter)
+                        parameters["nodes"] = alert_data.get("host")
+                        action_response = await self.rundeck_service.execute_job(
+                            job_id=job_id,
+                            parameters=parameters,
+                            idempotency_key=self.rundeck_service.idempotency_key(
+                                alert_data.get("event_id"), job_id, alert_data.get("host")
+                            )
+                        )
+        finally:
+            if lease is not None:
+                self.host_leases.release(lease, action_response or None)
+
+        # O prompt enviado ao LLM vai só para o histórico, não para a resposta
+        prompt = analysis_result.pop("prompt", None)
+        result = {
+            "event_id": alert_data.get("event_id"),
+            "host": alert_data.get("host"),
+            "problem": alert_data.get("problem"),
+            "severity": alert_data.get("severity"),
+            "analysis": analysis_result,
+            "action_taken": action_response
+        }
+        self._record(alert_data, result, prompt)
+        return result
+
+    async def _apply_rate_limit(
+        self,
+        alert_data: Dict[str, Any],
+        analysis_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Aplica o limite de execução à ação recomendada.
+
+        Dentro do limite, a análise segue com a decisão em "rate_limit". No
+        modo "defer", aguarda a ficha reservada antes de seguir. Acima do
+        limite, a ação é rebaixada para notificação.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            analysis_result: Análise com a ação recomendada
+
+        Returns:
+            Análise a ser executada
+        """
+        action = str(analysis_result.get("action") or "")
+        if not self.action_limiter.limited(action):
+            return analysis_result
+
+        throttle = self.action_limiter.acquire(action, str(alert_data.get("host") or ""))
+        if throttle["decision"] == "deferred":
+            with span("rate_limit.defer", action=action):
+                await asyncio.sleep(throttle["wait_seconds"])
+
+        if throttle["decision"] != "downgraded":
+            return {**analysis_result, "rate_limit": throttle}
+
+        return self._downgrade_to_notify(
+            alert_data, analysis_result,
+            f"limite de execução ({throttle['limit']}) atingido, próximo disparo em {throttle['wait_seconds']:.0f}s",
+            "rate_limit", throttle
+        )
+
+    @staticmethod
+    def _downgrade_to_notify(
+        alert_data: Dict[str, Any],
+        analysis_result: Dict[str, Any],
+        motivo: str,
+        info_key: str,
+        info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Troca a remediação recomendada por uma notificação à equipe.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            analysis_result: Análise com a ação recomendada
+            motivo: Por que a ação não foi executada
+            info_key: Chave da análise que recebe os detalhes (ex: rate_limit)
+            info: Detalhes da decisão
+
+        Returns:
+            Análise com a notificação no lugar da ação original
+        """
+        host = alert_data.get("host")
+        action = analysis_result.get("action")
+        severity = str(alert_data.get("severity") or "").lower()
+        return {
+            **analysis_result,
+            "action": "notify",
+            "requires_action": False,
+            "recommended_job_id": "notify",
+            "job_parameters": {
+                "message": f"Alerta em {host}: {alert_data.get('problem')}. Ação {action} não executada: {motivo}",
+                "team": "operations",
+                "priority": "high" if severity in ("critical", "high", "disaster") else "medium"
+            },
+            "reason": f"Ação {action} não executada no host {host}: {motivo}. {analysis_result.get('reason', '')}".strip(),
+            info_key: {
+                **info,
+                "original_action": action,
+                "original_job_id": analysis_result.get("recommended_job_id")
+            }
+        }
+
+
+def _same_problem(alert_data: Dict[str, Any], resolved: Dict[str, Any]) -> bool:
+    """
+    Verifica se o alerta se refere ao mesmo evento ou gatilho resolvido.
+
+    Args:
+        alert_data: Alerta em processamento
+        resolved: Alerta RESOLVED recebido
+
+    Returns:
+        True se event_id ou trigger_id coincidirem
+    """
+    for field in ("event_id", "trigger_id"):
+        value = resolved.get(field)
+        if value and alert_data.get(field) == value:
+            return True
+    return False
@@ -0,0 +1,218 @@
+import asyncio
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import ALERT_LATENCY
+from app.core.tracing import record_span, trace_id_of
+from app.services.alert_pipeline import AlertPipeline
+
+
+class AlertQueueFullError(Exception):
+    """
+    Indica que a fila de alertas atingiu a capacidade máxima.
+    """
+
+
+class AlertQueue:
+    """
+    Fila de processamento assíncrono de alertas.
+
+    Os alertas são enfileirados pelas rotas, que respondem imediatamente
+    com um ticket, e processados em segundo plano por um conjunto de
+    workers. O resultado fica disponível para consulta pelo ticket até
+    expirar.
+    """
+
+    def __init__(
+        self,
+        pipeline: AlertPipeline,
+        workers: int = settings.ALERT_QUEUE_WORKERS,
+        max_size: int = settings.ALERT_QUEUE_MAX_SIZE,
+        ticket_ttl: float = settings.ALERT_TICKET_TTL,
+        max_tickets: int = settings.ALERT_TICKET_MAX
+    ):
+        """
+        Inicializa a fila.
+
+        Args:
+            pipeline: Pipeline que processa cada alerta
+            workers: Quantidade de workers concorrentes
+            max_size: Capacidade máxima da fila
+            ticket_ttl: Tempo em segundos que um ticket fica disponível
+            max_tickets: Quantidade máxima de tickets mantidos em memória
+        """
+        self.pipeline = pipeline
+        self.workers = workers
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_size)
+        self._tickets = TTLCache(max_size=max_tickets, ttl=ticket_ttl)
+        self._tasks: List[asyncio.Task] = []
+        # Itens ainda na fila, por ticket (permite cancelar antes do processamento)
+        self._queued: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        """
+        Inicia os workers da fila. Deve ser chamado com o event loop ativo.
+        """
+        if self._tasks:
+            return
+
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"alert-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Fila de alertas iniciada com {self.workers} workers")
+
+    async def stop(self) -> None:
+        """
+        Interrompe os workers. Alertas ainda na fila são descartados.
+        """
+        pending = self._queue.qsize()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if pending:
+            logger.warning(f"Fila de alertas finalizada com {pending} alertas pendentes")
+
+    def submit(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enfileira um alerta normalizado para processamento.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Registro do ticket criado
+
+        Raises:
+            AlertQueueFullError: Se a fila estiver cheia
+        """
+        ticket = uuid.uuid4().hex
+        record = {
+            "ticket": ticket,
+            "status": "queued",
+            "event_id": alert_data.get("event_id"),
+            "host": alert_data.get("host"),
+            "submitted_at": time.time(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None
+        }
+
+        try:
+            self._queue.put_nowait({"record": record, "alert": alert_data})
+        except asyncio.QueueFull:
+            raise AlertQueueFullError(
+                f"Fila de alertas cheia ({self._queue.maxsize} alertas pendentes)"
+            )
+
+        self._queued[ticket] = {"record": record, "alert": alert_data}
+        self._tickets.set(ticket, record)
+        logger.info(f"Alerta {record['event_id']} enfileirado com ticket {ticket}")
+        return record
+
+    def cancel(self, resolved: Dict[str, Any]) -> int:
+        """
+        Cancela os alertas ainda na fila que foram resolvidos.
+
+        Args:
+            resolved: Alerta RESOLVED recebido
+
+        Returns:
+            Quantidade de tickets cancelados
+        """
+        cancelled = 0
+        for ticket, item in list(self._queued.items()):
+            alert_data = item["alert"]
+            if AlertPipeline.is_resolved(alert_data):
+                continue
+            if any(
+                resolved.get(field) and alert_data.get(field) == resolved.get(field)
+                for field in ("event_id", "trigger_id")
+            ):
+                record = item["record"]
+                record["status"] = "cancelled"
+                record["completed_at"] = time.time()
+                record["error"] = "Problema resolvido antes do processamento"
+                del self._queued[ticket]
+                cancelled += 1
+
+        if cancelled:
+            logger.info(f"{cancelled} alerta(s) resolvido(s) removido(s) da fila")
+        return cancelled
+
+    def get_ticket(self, ticket: str) -> Optional[Dict[str, Any]]:
+        """
+        Consulta o estado de um ticket.
+
+        Args:
+            ticket: Identificador do ticket
+
+        Returns:
+            Registro do ticket ou None se não existir ou tiver expirado
+        """
+        return self._tickets.get(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna informações sobre a ocupação da fila.
+
+        Returns:
+            Profundidade da fila, capacidade, workers e tickets em memória
+        """
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "workers": len(self._tasks),
+            "tickets": len(self._tickets)
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        """
+        Consome a fila processando um alerta por vez.
+
+        Args:
+            worker_id: Identificador do worker (para logs)
+        """
+        while True:
+            item = await self._queue.get()
+            record = item["record"]
+            self._queued.pop(record["ticket"], None)
+
+            # Cancelado por um RESOLVED enquanto aguardava na fila
+            if record["status"] == "cancelled":
+                self._queue.task_done()
+                continue
+
+            try:
+                record["status"] = "processing"
+                record["started_at"] = time.time()
+                record_span(
+                    "queue.wait",
+                    trace_id_of(item["alert"]),
+                    record["submitted_at"],
+                    record["started_at"] - record["submitted_at"],
+                    worker=worker_id
+                )
+
+                record["result"] = await self.pipeline.process(item["alert"])
+                record["status"] = "completed"
+                ALERT_LATENCY.observe(time.time() - record["submitted_at"], "async")
+            except asyncio.CancelledError:
+                record["status"] = "cancelled"
+                raise
+            except Exception as e:
+                logger.exception(
+                    f"Worker {worker_id} falhou ao processar ticket {record['ticket']}: {str(e)}"
+                )
+                record["status"] = "failed"
+                record["error"] = str(e)
+            finally:
+                record["completed_at"] = time.time()
+                self._queue.task_done()
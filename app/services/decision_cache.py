@@ -0,0 +1,301 @@
+import copy
+import hashlib
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Padrões mascarados ao normalizar o texto do problema
+_IP_PATTERN = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b")
+_PATH_PATTERN = re.compile(r"(?<![\w.:/])/[\w.\-/]*")
+_HOSTNAME_PATTERN = re.compile(r"\b(?:[a-z0-9-]+\.)+[a-z]{2,}\b")
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+_SPACES_PATTERN = re.compile(r"\s+")
+
+# Marcadores usados nos templates de argumentos
+_HOST_PLACEHOLDER = "<host>"
+_PATH_PLACEHOLDER = "<path:{}>"
+_PATH_PLACEHOLDER_PATTERN = re.compile(r"^<path:(\d+)>(.*)$", re.DOTALL)
+
+
+class DecisionCache:
+    """
+    Cache de decisões do LLM indexado por uma impressão digital do alerta.
+
+    A maioria dos alertas é o mesmo template de trigger disparando em
+    vários hosts. A impressão digital mascara números, hostnames, IPs e
+    caminhos do texto do problema e combina com a severidade e as tags
+    relevantes. O cache guarda a função escolhida e um template dos
+    argumentos, que é preenchido com os dados do novo alerta no acerto.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.DECISION_CACHE_MAX_SIZE,
+        ttl: float = settings.DECISION_CACHE_TTL,
+        policy: Optional[Dict[str, bool]] = None,
+        relevant_tags: Optional[List[str]] = None
+    ):
+        """
+        Inicializa o cache de decisões.
+
+        Args:
+            max_size: Quantidade máxima de decisões guardadas (LRU)
+            ttl: Tempo de vida de uma decisão em segundos
+            policy: Funções que podem ser cacheadas (padrão da configuração)
+            relevant_tags: Tags consideradas na impressão digital
+        """
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self.policy = policy if policy is not None else settings.DECISION_CACHE_POLICY
+        self.relevant_tags = set(
+            relevant_tags if relevant_tags is not None else settings.DECISION_CACHE_TAGS
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def fingerprint(self, alert_data: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """
+        Calcula a impressão digital canônica do alerta.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Tupla com a chave do cache e os caminhos encontrados no problema,
+            na ordem em que aparecem
+        """
+        host = str(alert_data.get("host") or "")
+        problem = str(alert_data.get("problem") or "")
+
+        # Os caminhos mantêm a grafia original para preencher os templates
+        paths = [path.rstrip(".") for path in _PATH_PATTERN.findall(problem)]
+
+        problem = problem.lower()
+        if host:
+            problem = problem.replace(host.lower(), " <host> ")
+
+        problem = _IP_PATTERN.sub("<ip>", problem)
+        problem = _PATH_PATTERN.sub("<path>", problem)
+        problem = _HOSTNAME_PATTERN.sub("<hostname>", problem)
+        problem = _NUMBER_PATTERN.sub("<n>", problem)
+        problem = _SPACES_PATTERN.sub(" ", problem).strip()
+
+        tags = sorted(
+            f"{tag.get('tag')}={tag.get('value')}".lower()
+            for tag in alert_data.get("tags") or []
+            if isinstance(tag, dict) and tag.get("tag") in self.relevant_tags
+        )
+        severity = str(alert_data.get("severity") or "").lower()
+
+        raw_key = "\x1f".join([problem, severity, *tags])
+        key = hashlib.blake2b(raw_key.encode("utf-8"), digest_size=16).hexdigest()
+        return key, paths
+
+    def lookup(self, alert_data: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Procura uma decisão para o alerta e preenche o template de argumentos.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Tupla com o nome da função e os argumentos já preenchidos,
+            ou None se não houver decisão aplicável
+        """
+        key, paths = self.fingerprint(alert_data)
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        arguments = self._bind(entry["arguments"], alert_data, paths)
+        if arguments is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"Decisão {entry['function']} reaproveitada do cache ({key})")
+        return entry["function"], arguments
+
+    def store(self, alert_data: Dict[str, Any], analysis: Dict[str, Any]) -> bool:
+        """
+        Guarda a decisão do LLM para o alerta, se a política permitir.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            analysis: Resultado da análise do Ollama
+
+        Returns:
+            True se a decisão foi guardada
+        """
+        if analysis.get("decided_by") != "llm":
+            return False
+
+        function_called = analysis.get("function_called") or {}
+        function_name = function_called.get("name")
+        if not function_name or not self.policy.get(function_name, False):
+            return False
+
+        key, paths = self.fingerprint(alert_data)
+        template = self._make_template(
+            function_called.get("arguments") or {}, alert_data, paths
+        )
+        if template is None:
+            logger.debug(f"Decisão {function_name} depende de valores do alerta, não cacheada")
+            return False
+
+        self._cache.set(key, {"function": function_name, "arguments": template})
+        self.stores += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do cache de decisões.
+
+        Returns:
+            Acertos, faltas, decisões guardadas e ocupação
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            **self._cache.stats()
+        }
+
+    @staticmethod
+    def _make_template(
+        arguments: Dict[str, Any],
+        alert_data: Dict[str, Any],
+        paths: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Substitui nos argumentos os valores específicos do host por marcadores.
+
+        Caminhos citados no problema (ou subdiretórios deles) e o nome do
+        host viram marcadores. Se algum argumento depender de um valor que
+        foi mascarado na impressão digital e não puder ser convertido em
+        marcador (outro caminho, número, IP ou hostname do problema), a
+        decisão não é reaproveitável e nenhum template é gerado.
+
+        Args:
+            arguments: Argumentos escolhidos pelo modelo
+            alert_data: Dados do alerta que originou a decisão
+            paths: Caminhos encontrados no texto do problema
+
+        Returns:
+            Template de argumentos, ou None se a decisão não for reaproveitável
+        """
+        host = str(alert_data.get("host") or "")
+        problem = str(alert_data.get("problem") or "").lower()
+        masked_tokens = set(
+            _IP_PATTERN.findall(problem)
+            + _HOSTNAME_PATTERN.findall(problem)
+            + _NUMBER_PATTERN.findall(problem)
+        )
+        template = {}
+
+        for name, value in arguments.items():
+            if isinstance(value, str):
+                path_index = _match_path(value, paths)
+                if path_index is not None:
+                    index, suffix = path_index
+                    value = _PATH_PLACEHOLDER.format(index) + suffix
+                else:
+                    if host and host in value:
+                        value = value.replace(host, _HOST_PLACEHOLDER)
+                    if value.startswith("/") or _tokens(value) & masked_tokens:
+                        return None
+            template[name] = value
+
+        return copy.deepcopy(template)
+
+    @staticmethod
+    def _bind(
+        template: Dict[str, Any],
+        alert_data: Dict[str, Any],
+        paths: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Preenche o template de argumentos com os dados do novo alerta.
+
+        Args:
+            template: Template guardado no cache
+            alert_data: Dados do novo alerta
+            paths: Caminhos encontrados no problema do novo alerta
+
+        Returns:
+            Argumentos preenchidos, ou None se o template não puder ser
+            aplicado ao alerta
+        """
+        host = str(alert_data.get("host") or "")
+        arguments = {}
+
+        for name, value in template.items():
+            if isinstance(value, str):
+                placeholder = _PATH_PLACEHOLDER_PATTERN.match(value)
+                if placeholder:
+                    index = int(placeholder.group(1))
+                    if index >= len(paths):
+                        return None
+                    suffix = placeholder.group(2)
+                    base = _base_path(paths[index])
+                    # Subdiretório da raiz: "/" + "/log" vira "/log"
+                    value = base.rstrip("/") + suffix if suffix else base
+                    # Caminho vazio não vai ao Rundeck: a decisão fica com o LLM
+                    if not value.strip():
+                        return None
+                elif _HOST_PLACEHOLDER in value:
+                    value = value.replace(_HOST_PLACEHOLDER, host)
+            arguments[name] = copy.deepcopy(value)
+
+        return arguments
+
+
+def _match_path(value: str, paths: List[str]) -> Optional[Tuple[int, str]]:
+    """
+    Verifica se o valor é um dos caminhos do problema ou um subdiretório dele.
+
+    Args:
+        value: Valor do argumento
+        paths: Caminhos encontrados no problema
+
+    Returns:
+        Tupla com o índice do caminho e o sufixo restante, ou None
+    """
+    for index, path in enumerate(paths):
+        if value == path:
+            return index, ""
+        base = _base_path(path)
+        if value.startswith(base + "/"):
+            return index, value[len(base):]
+    return None
+
+
+def _base_path(path: str) -> str:
+    """
+    Remove a barra final de um caminho, preservando a raiz ("/").
+    """
+    return path.rstrip("/") if len(path) > 1 else path
+
+
+def _tokens(value: str) -> set:
+    """
+    Extrai de um valor os tokens que seriam mascarados na impressão digital.
+
+    Args:
+        value: Valor do argumento
+
+    Returns:
+        Conjunto de IPs, hostnames e números presentes no valor
+    """
+    value = value.lower()
+    return set(
+        _IP_PATTERN.findall(value)
+        + _HOSTNAME_PATTERN.findall(value)
+        + _NUMBER_PATTERN.findall(value)
+    )
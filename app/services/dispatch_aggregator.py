@@ -0,0 +1,270 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.rundeck_service import RundeckService
+
+
+# Parâmetros próprios de cada alerta, ignorados ao comparar disparos
+_PER_ALERT_PARAMETERS = frozenset({"alert_id", "timestamp", "idempotency_key", "nodes"})
+
+
+class _Group:
+    """
+    Disparos da mesma ação, com os mesmos parâmetros, aguardando a janela.
+    """
+
+    def __init__(self, key: Tuple, job_id: str, parameters: Dict[str, Any]):
+        self.key = key
+        self.job_id = job_id
+        self.parameters = parameters
+        self.opened_at = time.time()
+        self.alerts: List[Dict[str, Any]] = []
+        self.futures: List["asyncio.Future[Dict[str, Any]]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class DispatchAggregator:
+    """
+    Agrupa em uma única execução do Rundeck a mesma ação para vários hosts.
+
+    Em incidentes que atingem a frota (ex: partição de logs enchendo em
+    centenas de nós depois de um deploy), cada host dispararia o seu próprio
+    webhook. O primeiro disparo de uma ação abre uma janela curta; os
+    disparos da mesma ação com parâmetros compatíveis (iguais, exceto os
+    próprios de cada alerta) que chegam enquanto ela está aberta são
+    acumulados e, ao fechar, viram uma execução com a lista de nós no
+    parâmetro "nodes" (usado no nodefilter dos jobs). Cada alerta recebe o
+    resultado do disparo com o seu próprio nó; com mais de um nó, o status
+    do nó fica como "unknown" (a execução pode falhar em apenas parte dos
+    nós).
+    """
+
+    def __init__(
+        self,
+        rundeck_service: RundeckService,
+        window: float = settings.RUNDECK_FANIN_WINDOW,
+        max_nodes: int = settings.RUNDECK_FANIN_MAX_NODES,
+        jobs: Optional[List[str]] = None
+    ):
+        """
+        Inicializa o agregador.
+
+        Args:
+            rundeck_service: Serviço que executa os jobs
+            window: Tempo em segundos que a janela de uma ação fica aberta
+            max_nodes: Quantidade de disparos que fecha a janela antes do tempo
+            jobs: Jobs que podem ser agrupados (com _ ou -); os demais são
+                disparados na hora
+        """
+        self.rundeck_service = rundeck_service
+        self.window = window
+        self.max_nodes = max(1, max_nodes)
+        self.jobs = {
+            job.strip().replace("_", "-")
+            for job in (jobs if jobs is not None else settings.RUNDECK_FANIN_JOBS.split(","))
+            if job.strip()
+        }
+
+        self._groups: Dict[Tuple, _Group] = {}
+        self._running: set = set()
+
+        self.executions = 0
+        self.aggregated = 0
+
+    def accepts(self, job_id: str) -> bool:
+        """
+        Verifica se os disparos do job podem ser agrupados.
+        """
+        return job_id.replace("_", "-") in self.jobs
+
+    async def submit(
+        self,
+        alert_data: Dict[str, Any],
+        job_id: str,
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Adiciona o disparo à janela da ação e aguarda o resultado da execução.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            job_id: ID do job
+            parameters: Parâmetros do job
+
+        Returns:
+            Resultado da execução para o host deste alerta
+        """
+        parameters = {
+            name: value for name, value in parameters.items()
+            if name not in _PER_ALERT_PARAMETERS
+        }
+        key = (job_id.replace("_", "-"), parameters_signature(parameters))
+
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(key, job_id, parameters)
+            self._groups[key] = group
+            group.timer = asyncio.get_running_loop().call_later(
+                self.window, self._close, group
+            )
+
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        group.alerts.append(alert_data)
+        group.futures.append(future)
+
+        if len(group.alerts) >= self.max_nodes:
+            self._close(group)
+
+        return await future
+
+    async def stop(self) -> None:
+        """
+        Fecha as janelas abertas e aguarda os disparos pendentes.
+        """
+        for group in list(self._groups.values()):
+            self._close(group)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de agrupamento.
+
+        Returns:
+            Janelas abertas, disparos aguardando, execuções feitas e
+            disparos que foram agrupados com outros
+        """
+        return {
+            "open_windows": len(self._groups),
+            "buffered_dispatches": sum(len(g.alerts) for g in self._groups.values()),
+            "executions": self.executions,
+            "aggregated_dispatches": self.aggregated,
+            "window_seconds": self.window,
+            "max_nodes": self.max_nodes,
+            "jobs": sorted(self.jobs)
+        }
+
+    def _close(self, group: _Group) -> None:
+        """
+        Fecha a janela e inicia a execução dos disparos acumulados.
+
+        Args:
+            group: Janela a ser fechada
+        """
+        if self._groups.get(group.key) is not group:
+            return
+
+        del self._groups[group.key]
+        if group.timer is not None:
+            group.timer.cancel()
+
+        task = asyncio.ensure_future(self._run(group))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, group: _Group) -> None:
+        """
+        Executa o job para os hosts da janela e entrega o resultado a cada alerta.
+
+        Args:
+            group: Janela fechada
+        """
+        # Disparos cujo chamador desistiu (ex: problema resolvido) são descartados
+        pending = [
+            (alert_data, future)
+            for alert_data, future in zip(group.alerts, group.futures)
+            if not future.done()
+        ]
+        if not pending:
+            return
+
+        # Um host com vários alertas da mesma ação entra uma vez na lista de nós
+        nodes: List[str] = []
+        for alert_data, _ in pending:
+            host = str(alert_data.get("host") or "")
+            if host not in nodes:
+                nodes.append(host)
+        event_ids = sorted(str(alert_data.get("event_id")) for alert_data, _ in pending)
+
+        self.executions += 1
+        if len(pending) > 1:
+            self.aggregated += len(pending)
+            logger.info(
+                f"{len(pending)} disparos de {group.job_id} agrupados em uma execução para "
+                f"{len(nodes)} nós em {time.time() - group.opened_at:.2f} segundos"
+            )
+
+        parameters = {**group.parameters, "nodes": ",".join(nodes)}
+        if len(pending) == 1:
+            idempotency_key = self.rundeck_service.idempotency_key(event_ids[0], group.job_id, nodes)
+        else:
+            # A execução também leva os trace ids de todos os alertas agrupados
+            parameters["alert_ids"] = ",".join(
+                str(alert_data.get("trace_id") or alert_data.get("event_id")) for alert_data, _ in pending
+            )
+            idempotency_key = self.rundeck_service.idempotency_key("+".join(event_ids), group.job_id, nodes)
+
+        try:
+            result = await self.rundeck_service.execute_job(
+                job_id=group.job_id,
+                parameters=parameters,
+                idempotency_key=idempotency_key
+            )
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # O webhook só confirma que a execução foi aceita: o resultado de cada
+        # nó (os jobs seguem nos demais nós quando um falha) fica na execução
+        # do Rundeck e não é conhecido aqui
+        per_node = {}
+        if len(nodes) > 1 and result.get("status") != "error":
+            per_node = {
+                "node_status": "unknown",
+                "message": (
+                    f"Execução agrupada disparada para {len(nodes)} nós; "
+                    "o resultado deste nó deve ser consultado no Rundeck"
+                )
+            }
+
+        for alert_data, future in pending:
+            if not future.done():
+                future.set_result({
+                    **result,
+                    **per_node,
+                    "node": alert_data.get("host"),
+                    "nodes": nodes,
+                    "aggregated": len(pending)
+                })
+
+
+def parameters_signature(parameters: Dict[str, Any]) -> Tuple:
+    """
+    Converte os parâmetros de um job em um valor comparável e usável como
+    chave, ignorando os parâmetros próprios de cada alerta.
+
+    Args:
+        parameters: Parâmetros do job
+
+    Returns:
+        Parâmetros em forma de tupla ordenada
+    """
+    return _freeze({
+        name: value for name, value in parameters.items()
+        if name not in _PER_ALERT_PARAMETERS
+    })
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
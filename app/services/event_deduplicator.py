@@ -0,0 +1,153 @@
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import logger
+
+
+class EventDeduplicator:
+    """
+    Evita processar mais de uma vez o mesmo evento do Zabbix.
+
+    O Zabbix reenvia webhooks e frequentemente entrega o mesmo evento
+    várias vezes. Requisições concorrentes para o mesmo evento aguardam
+    uma única análise compartilhada (single-flight) e, depois de concluída,
+    a resposta fica guardada por um tempo para ser reaproveitada pelas
+    cópias que chegarem atrasadas, sem acionar Ollama ou Rundeck de novo.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.DEDUP_TTL,
+        max_size: int = settings.DEDUP_MAX_SIZE
+    ):
+        """
+        Inicializa o deduplicador.
+
+        Args:
+            ttl: Tempo em segundos que uma resposta concluída é reaproveitada
+            max_size: Quantidade máxima de respostas guardadas
+        """
+        self._completed = TTLCache(max_size=max_size, ttl=ttl)
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def event_key(alert_data: Dict[str, Any]) -> str:
+        """
+        Gera a chave que identifica um evento do Zabbix.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Chave composta por event_id, host, trigger_id e status
+        """
+        return "|".join((
+            str(alert_data.get("event_id") or ""),
+            str(alert_data.get("host") or ""),
+            str(alert_data.get("trigger_id") or ""),
+            str(alert_data.get("status") or "PROBLEM").upper()
+        ))
+
+    async def run(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Executa o processamento do evento uma única vez por chave.
+
+        Args:
+            key: Chave do evento (ver event_key)
+            factory: Função que inicia o processamento do evento
+
+        Returns:
+            Tupla com o resultado e a origem: "miss" (processado agora),
+            "coalesced" (aguardou um processamento em andamento) ou
+            "replay" (resposta guardada)
+        """
+        cached = self._completed.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Evento {key} já processado, reaproveitando resposta")
+            return cached, "replay"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            logger.info(f"Evento {key} já em processamento, aguardando resultado")
+            return await asyncio.shield(inflight), "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+
+        # O shield mantém o processamento vivo para as demais requisições
+        # mesmo que o cliente que o iniciou desconecte
+        return await asyncio.shield(task), "miss"
+
+    def seen(self, key: str) -> bool:
+        """
+        Indica se o evento já tem resposta guardada ou está em processamento.
+
+        Args:
+            key: Chave do evento (ver event_key)
+
+        Returns:
+            True se run() devolveria a resposta sem processar o evento
+        """
+        return key in self._inflight or key in self._completed
+
+    def remember(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Guarda uma resposta para os reenvios do evento, se ainda não houver uma.
+
+        Args:
+            key: Chave do evento (ver event_key)
+            result: Resposta a ser devolvida aos reenvios
+        """
+        if key not in self._completed:
+            self._completed.set(key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de deduplicação.
+
+        Returns:
+            Acertos, faltas, requisições agrupadas e ocupação
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "stored": len(self._completed)
+        }
+
+    def _on_done(self, key: str, task: "asyncio.Future[Dict[str, Any]]") -> None:
+        """
+        Remove o evento da lista em andamento e guarda a resposta concluída.
+
+        Respostas cujo disparo no Rundeck falhou não são guardadas, para que
+        um reenvio do Zabbix possa tentar a ação de novo.
+
+        Args:
+            key: Chave do evento
+            task: Tarefa de processamento finalizada
+        """
+        self._inflight.pop(key, None)
+
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        result = task.result()
+        if result.get("action_taken", {}).get("status") == "error":
+            return
+
+        self._completed.set(key, result)
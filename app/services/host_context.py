@@ -0,0 +1,221 @@
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+# Tamanho máximo do texto de um problema no resumo
+_PROBLEM_MAX_CHARS = 60
+
+
+class HostSummary:
+    """
+    Resumo acumulado dos incidentes de um host.
+
+    Atualizado a cada incidente concluído, sem reler o histórico: ações
+    recentes em uma janela de tamanho fixo, contagem dos problemas mais
+    frequentes (limitada) e a última remediação executada.
+    """
+
+    def __init__(self, recent_actions: int, max_problems: int):
+        self.incidents = 0
+        self.dispatch_failures = 0
+        self.first_seen = time.time()
+        self.recent_actions: "deque[Dict[str, Any]]" = deque(maxlen=recent_actions)
+        self.problems: Dict[str, int] = {}
+        self.max_problems = max_problems
+        self.last_remediation: Optional[Dict[str, Any]] = None
+
+    def update(self, alert_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Incorpora um incidente concluído ao resumo.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+            result: Resultado do processamento (análise e ação executada)
+        """
+        now = time.time()
+        analysis = result.get("analysis") or {}
+        action_taken = result.get("action_taken") or {}
+        function_name = (analysis.get("function_called") or {}).get("name") or analysis.get("action")
+        dispatch_status = action_taken.get("status")
+
+        self.incidents += 1
+        self.recent_actions.append({
+            "at": now,
+            "function": function_name,
+            "status": dispatch_status
+        })
+
+        if dispatch_status == "error":
+            self.dispatch_failures += 1
+        elif analysis.get("requires_action") and dispatch_status:
+            self.last_remediation = {
+                "at": now,
+                "function": function_name,
+                "status": dispatch_status
+            }
+
+        for symptom in alert_data.get("symptoms") or [alert_data]:
+            self._count_problem(str(symptom.get("problem") or ""))
+
+    def render(self, max_chars: int) -> str:
+        """
+        Gera o texto compacto do resumo, limitado a max_chars caracteres.
+
+        As linhas são incluídas por ordem de importância; as que não couberem
+        no limite são omitidas.
+
+        Args:
+            max_chars: Tamanho máximo do texto
+
+        Returns:
+            Resumo pronto para o prompt (vazio se nada couber)
+        """
+        now = time.time()
+        lines = [f"Histórico recente do host ({self.incidents} incidentes):"]
+
+        if self.last_remediation is not None:
+            lines.append(
+                f"- Última remediação: {self.last_remediation['function']} "
+                f"há {_age(now - self.last_remediation['at'])} "
+                f"({self.last_remediation['status']})"
+            )
+
+        if self.recent_actions:
+            actions = ", ".join(
+                f"{action['function']} ({action['status'] or 'sem disparo'}, "
+                f"{_age(now - action['at'])})"
+                for action in reversed(self.recent_actions)
+            )
+            lines.append(f"- Ações recentes: {actions}")
+
+        recurring = sorted(
+            ((count, problem) for problem, count in self.problems.items() if count > 1),
+            reverse=True
+        )[:3]
+        if recurring:
+            lines.append("- Problemas recorrentes: " + "; ".join(
+                f"\"{problem}\" x{count}" for count, problem in recurring
+            ))
+
+        if self.dispatch_failures:
+            lines.append(f"- Falhas de disparo no Rundeck: {self.dispatch_failures}")
+
+        text = ""
+        for line in lines:
+            candidate = f"{text}\n{line}" if text else line
+            if len(candidate) > max_chars:
+                continue
+            text = candidate
+
+        # Só o cabeçalho não ajuda o modelo
+        return text if "\n" in text else ""
+
+    def _count_problem(self, problem: str) -> None:
+        problem = problem.strip()[:_PROBLEM_MAX_CHARS]
+        if not problem:
+            return
+
+        if problem not in self.problems and len(self.problems) >= self.max_problems:
+            # Descarta o problema menos frequente para manter o resumo limitado
+            rarest = min(self.problems, key=self.problems.get)
+            del self.problems[rarest]
+        self.problems[problem] = self.problems.get(problem, 0) + 1
+
+
+class HostContextTracker:
+    """
+    Resumos de contexto por host, mantidos em memória.
+
+    Os resumos ficam em um cache LRU com expiração: hosts sem incidentes
+    por HOST_CONTEXT_TTL segundos, ou os menos recentes quando o limite de
+    hosts é atingido, são descartados.
+    """
+
+    def __init__(
+        self,
+        max_hosts: int = settings.HOST_CONTEXT_MAX_HOSTS,
+        ttl: float = settings.HOST_CONTEXT_TTL,
+        recent_actions: int = settings.HOST_CONTEXT_RECENT_ACTIONS,
+        token_budget: int = settings.HOST_CONTEXT_TOKEN_BUDGET
+    ):
+        """
+        Inicializa o rastreador.
+
+        Args:
+            max_hosts: Quantidade máxima de hosts com resumo em memória
+            ttl: Tempo em segundos sem incidentes até descartar o resumo
+            recent_actions: Quantidade de ações recentes mantidas por host
+            token_budget: Tokens disponíveis para o resumo no prompt
+        """
+        self._summaries = TTLCache(max_size=max_hosts, ttl=ttl)
+        self.recent_actions = recent_actions
+        self.token_budget = token_budget
+
+        self.updates = 0
+
+    def observe(self, alert_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Atualiza o resumo do host com um incidente concluído.
+
+        Args:
+            alert_data: Dados normalizados do alerta (ou do incidente correlacionado)
+            result: Resultado do processamento
+        """
+        if (result.get("analysis") or {}).get("decided_by") == "resolved":
+            return
+
+        host = str(alert_data.get("host") or "")
+        summary = self._summaries.get(host)
+        if summary is None:
+            summary = HostSummary(self.recent_actions, max_problems=20)
+
+        summary.update(alert_data, result)
+        # set() renova a expiração do host
+        self._summaries.set(host, summary)
+        self.updates += 1
+
+    def render(self, host: str) -> str:
+        """
+        Retorna o resumo do host dentro do orçamento de tokens.
+
+        Args:
+            host: Nome do host
+
+        Returns:
+            Resumo compacto, ou texto vazio se o host não tiver histórico
+        """
+        summary = self._summaries.get(str(host or ""))
+        if summary is None:
+            return ""
+        # Aproximação de ~4 caracteres por token
+        return summary.render(self.token_budget * 4)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna a ocupação dos resumos.
+
+        Returns:
+            Hosts em memória, atualizações e orçamento de tokens
+        """
+        return {
+            "updates": self.updates,
+            "token_budget": self.token_budget,
+            **self._summaries.stats()
+        }
+
+
+def _age(seconds: float) -> str:
+    """
+    Formata um intervalo de tempo de forma compacta (ex: 45s, 12min, 3h, 2d).
+    """
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}min"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
@@ -0,0 +1,228 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import HOST_LOCK_WAIT, HOST_LOCK_CONTENTION
+from app.services.dispatch_aggregator import parameters_signature
+
+
+# Resultados de disparo que mantêm a concessão e podem ser reaproveitados
+_DISPATCHED = ("triggered", "simulated")
+
+
+class HostLease:
+    """
+    Remediação em andamento (ou recém-disparada) em um host.
+    """
+
+    __slots__ = ("host", "action", "signature", "holder", "expires_at", "released", "result")
+
+    def __init__(self, host: str, action: str, signature: Tuple, holder: Any, expires_at: float):
+        self.host = host
+        self.action = action
+        self.signature = signature
+        self.holder = holder
+        self.expires_at = expires_at
+        self.released = asyncio.Event()
+        # Resultado do disparo, compartilhado com as remediações iguais
+        self.result: "asyncio.Future[Optional[Dict[str, Any]]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+
+
+class HostLeaseManager:
+    """
+    Serializa as remediações de um mesmo host.
+
+    Dois alertas do mesmo host poderiam disparar, ao mesmo tempo, o
+    reinício de uma aplicação e a limpeza de disco. Cada remediação toma
+    a concessão (lease) do host antes do disparo e a mantém por um período
+    de acomodação depois dele, enquanto o job roda no Rundeck:
+
+    - outra ação no mesmo host aguarda a concessão ser liberada ou expirar
+      (até max_wait segundos);
+    - a mesma ação com os mesmos parâmetros não é disparada de novo: recebe
+      o resultado do disparo em andamento ou recém-concluído;
+    - hosts diferentes não esperam uns pelos outros.
+
+    A tabela de concessões é limitada: concessões expiradas são descartadas
+    e, com a tabela cheia, a remediação segue sem concessão. Não é
+    thread-safe: deve ser usado apenas no event loop.
+    """
+
+    def __init__(
+        self,
+        hold_timeout: float = settings.HOST_LEASE_TIMEOUT,
+        settle_time: float = settings.HOST_LEASE_SETTLE,
+        max_wait: float = settings.HOST_LEASE_MAX_WAIT,
+        max_hosts: int = settings.HOST_LEASE_MAX_HOSTS
+    ):
+        """
+        Inicializa o gerenciador.
+
+        Args:
+            hold_timeout: Duração máxima da concessão durante o disparo (se
+                quem a tomou travar, ela expira)
+            settle_time: Tempo que a concessão é mantida após um disparo
+                bem sucedido
+            max_wait: Espera máxima de uma ação conflitante
+            max_hosts: Concessões simultâneas mantidas na tabela
+        """
+        self.hold_timeout = hold_timeout
+        self.settle_time = settle_time
+        self.max_wait = max_wait
+        self.max_hosts = max_hosts
+
+        self._leases: "OrderedDict[str, HostLease]" = OrderedDict()
+
+        self.counters: Dict[str, int] = {
+            "acquired": 0, "contended": 0, "merged": 0, "timeout": 0, "overflow": 0
+        }
+        self.total_wait = 0.0
+
+    async def acquire(
+        self,
+        host: str,
+        action: str,
+        parameters: Dict[str, Any],
+        holder: Any = None
+    ) -> Tuple[str, Optional[HostLease]]:
+        """
+        Toma a concessão do host para a remediação.
+
+        Args:
+            host: Host do alerta
+            action: Ação a ser disparada
+            parameters: Parâmetros da ação (comparados para juntar remediações iguais)
+            holder: Identificação de quem toma a concessão (ex: event_id)
+
+        Returns:
+            Tupla com o resultado e a concessão:
+            "acquired" (concessão tomada; liberar com release()),
+            "merged" (remediação igual em andamento; o resultado está em
+            lease.result), "timeout" (ação conflitante não liberou a tempo)
+            ou "overflow" (tabela cheia, segue sem concessão)
+        """
+        signature = (action.replace("_", "-"), parameters_signature(parameters))
+        start = time.monotonic()
+        deadline = start + self.max_wait
+        contended = False
+
+        while True:
+            now = time.monotonic()
+            lease = self._active(host, now)
+
+            if lease is None:
+                if len(self._leases) >= self.max_hosts:
+                    self._purge(now)
+                if len(self._leases) >= self.max_hosts:
+                    return self._finish("overflow", start, contended), None
+
+                lease = HostLease(host, signature[0], signature, holder, now + self.hold_timeout)
+                self._leases[host] = lease
+                return self._finish("acquired", start, contended), lease
+
+            if lease.signature == signature:
+                try:
+                    result = await asyncio.wait_for(
+                        asyncio.shield(lease.result), timeout=max(0.0, lease.expires_at - now)
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                if result is not None and result.get("status") in _DISPATCHED:
+                    logger.info(f"Remediação {lease.action} no host {host} já disparada, reaproveitando o resultado")
+                    return self._finish("merged", start, contended), lease
+                # O disparo falhou ou foi interrompido: tenta de novo
+                continue
+
+            if not contended:
+                contended = True
+                logger.info(
+                    f"Host {host} em remediação ({lease.action}); {signature[0]} aguarda a liberação"
+                )
+
+            if deadline <= now:
+                logger.warning(
+                    f"Remediação {signature[0]} no host {host} não iniciada: "
+                    f"{lease.action} não liberou o host em {self.max_wait:.0f}s"
+                )
+                return self._finish("timeout", start, contended), lease
+
+            # Aguarda o fim do disparo (que define o período de acomodação)
+            # e depois a liberação ou a expiração da concessão
+            remaining = max(0.0, min(deadline, lease.expires_at) - now)
+            waiter = asyncio.shield(lease.result) if not lease.result.done() else lease.released.wait()
+            try:
+                await asyncio.wait_for(waiter, timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, lease: HostLease, result: Optional[Dict[str, Any]]) -> None:
+        """
+        Libera a concessão ao fim do disparo.
+
+        Após um disparo bem sucedido, a concessão fica mantida pelo período
+        de acomodação; nos demais casos é liberada na hora.
+
+        Args:
+            lease: Concessão tomada com acquire()
+            result: Resultado do disparo (None se não houve disparo)
+        """
+        if not lease.result.done():
+            lease.result.set_result(result)
+
+        if result is not None and result.get("status") in _DISPATCHED and self.settle_time > 0:
+            lease.expires_at = time.monotonic() + self.settle_time
+            return
+
+        if self._leases.get(lease.host) is lease:
+            del self._leases[lease.host]
+        lease.released.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna a ocupação da tabela e os contadores de disputa.
+
+        Returns:
+            Concessões ativas, contadores por resultado e espera média
+        """
+        self._purge(time.monotonic())
+        waited = self.counters["contended"]
+        return {
+            **self.counters,
+            "active": len(self._leases),
+            "max_hosts": self.max_hosts,
+            "avg_wait_seconds": round(self.total_wait / waited, 3) if waited else 0.0
+        }
+
+    def _active(self, host: str, now: float) -> Optional[HostLease]:
+        lease = self._leases.get(host)
+        if lease is not None and lease.expires_at <= now:
+            self._expire(lease)
+            return None
+        return lease
+
+    def _purge(self, now: float) -> None:
+        for lease in [lease for lease in self._leases.values() if lease.expires_at <= now]:
+            self._expire(lease)
+
+    def _expire(self, lease: HostLease) -> None:
+        del self._leases[lease.host]
+        if not lease.result.done():
+            logger.warning(f"Concessão do host {lease.host} ({lease.action}) expirou durante o disparo")
+            lease.result.set_result(None)
+        lease.released.set()
+
+    def _finish(self, outcome: str, start: float, contended: bool) -> str:
+        waited = time.monotonic() - start
+        self.counters[outcome] += 1
+        HOST_LOCK_WAIT.observe(waited, outcome)
+        if contended:
+            self.counters["contended"] += 1
+            self.total_wait += waited
+            HOST_LOCK_CONTENTION.inc(outcome)
+        return outcome
+
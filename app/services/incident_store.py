@@ -0,0 +1,361 @@
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger, log_erro_integracao
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    event_id TEXT,
+    trigger_id TEXT,
+    host TEXT NOT NULL,
+    problem TEXT,
+    severity TEXT,
+    status TEXT,
+    decided_by TEXT,
+    function_name TEXT,
+    job_id TEXT,
+    requires_action INTEGER NOT NULL DEFAULT 0,
+    dispatch_status TEXT,
+    alert TEXT,
+    prompt TEXT,
+    analysis TEXT,
+    action_taken TEXT,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_incidents_host_time ON incidents (host, created_at);
+CREATE INDEX IF NOT EXISTS idx_incidents_trigger_time ON incidents (trigger_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_incidents_event ON incidents (event_id);
+CREATE INDEX IF NOT EXISTS idx_incidents_time ON incidents (created_at);
+"""
+
+_INSERT = """
+INSERT INTO incidents (
+    created_at, event_id, trigger_id, host, problem, severity, status,
+    decided_by, function_name, job_id, requires_action, dispatch_status,
+    alert, prompt, analysis, action_taken, timings
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SUMMARY_COLUMNS = (
+    "id, created_at, event_id, trigger_id, host, problem, severity, status, "
+    "decided_by, function_name, job_id, requires_action, dispatch_status, "
+    "analysis, action_taken, timings"
+)
+
+# Colunas JSON convertidas de volta para objetos nas consultas
+_JSON_COLUMNS = ("alert", "analysis", "action_taken", "timings")
+
+
+class IncidentStore:
+    """
+    Histórico persistente de incidentes em SQLite (modo WAL).
+
+    Guarda o alerta, o prompt, a decisão do modelo, o resultado do disparo
+    no Rundeck e os tempos de cada incidente. As gravações não bloqueiam o
+    processamento: os incidentes são enfileirados em memória e gravados em
+    lotes por uma tarefa em segundo plano, em uma única transação por lote.
+    Gravação e leitura usam conexões e threads separadas; com WAL, as
+    consultas não esperam pelas gravações.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.INCIDENT_STORE_PATH,
+        batch_size: int = settings.INCIDENT_STORE_BATCH_SIZE,
+        flush_interval: float = settings.INCIDENT_STORE_FLUSH_INTERVAL,
+        max_pending: int = settings.INCIDENT_STORE_MAX_PENDING
+    ):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            path: Caminho do arquivo SQLite
+            batch_size: Quantidade máxima de incidentes por transação
+            flush_interval: Tempo máximo em segundos até gravar um lote
+            max_pending: Incidentes aguardando gravação antes de descartar novos
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._pending: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._unflushed: List[Dict[str, Any]] = []
+
+        # Uma thread por conexão: o sqlite3 não compartilha conexões entre threads
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="incident-writer")
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="incident-reader")
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_batch_ms = 0.0
+
+    async def start(self) -> None:
+        """
+        Abre o banco e inicia a gravação em segundo plano.
+        """
+        if self._task is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self._open_writer)
+        await loop.run_in_executor(self._reader, self._open_reader)
+
+        self._task = asyncio.create_task(self._run(), name="incident-store")
+        logger.info(f"Histórico de incidentes em {self.path}")
+
+    async def stop(self) -> None:
+        """
+        Grava os incidentes pendentes e fecha o banco.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        loop = asyncio.get_running_loop()
+        remaining = self._unflushed + self._drain(self._pending.qsize())
+        self._unflushed = []
+        if remaining:
+            await loop.run_in_executor(self._writer, self._write_batch, remaining)
+
+        await loop.run_in_executor(self._writer, self._close, self._write_conn)
+        await loop.run_in_executor(self._reader, self._close, self._read_conn)
+        self._writer.shutdown(wait=False)
+        self._reader.shutdown(wait=False)
+
+    def record(
+        self,
+        alert_data: Dict[str, Any],
+        result: Dict[str, Any],
+        prompt: Optional[str] = None
+    ) -> None:
+        """
+        Enfileira um incidente concluído para gravação.
+
+        Nunca bloqueia: se a fila de gravação estiver cheia o incidente é
+        descartado e contabilizado.
+
+        Args:
+            alert_data: Dados normalizados do alerta (ou do incidente correlacionado)
+            result: Resultado do processamento (análise e ação executada)
+            prompt: Prompt enviado ao LLM, exatamente como o modelo o recebeu
+        """
+        try:
+            self._pending.put_nowait({
+                "created_at": time.time(),
+                "alert": alert_data,
+                "result": result,
+                "prompt": prompt
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(
+                    f"Fila do histórico de incidentes cheia, {self.dropped} incidentes descartados"
+                )
+
+    async def recent(
+        self,
+        host: str,
+        limit: int = settings.INCIDENT_HISTORY_LIMIT,
+        since: Optional[float] = None,
+        trigger_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna os incidentes mais recentes de um host.
+
+        A consulta percorre apenas o trecho do índice (host, created_at)
+        do host, do mais recente para o mais antigo, e para ao atingir o
+        limite; o custo não depende do tamanho total do histórico.
+
+        Args:
+            host: Nome do host
+            limit: Quantidade máxima de incidentes
+            since: Timestamp mínimo dos incidentes (opcional)
+            trigger_id: Restringe aos incidentes de um gatilho (opcional)
+
+        Returns:
+            Incidentes do mais recente para o mais antigo
+        """
+        if self._read_conn is None:
+            return []
+
+        query = f"SELECT {_SUMMARY_COLUMNS} FROM incidents WHERE host = ?"
+        params: List[Any] = [host]
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        if trigger_id is not None:
+            query += " AND trigger_id = ?"
+            params.append(trigger_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(max(1, limit))
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader, self._query, query, params)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de gravação.
+
+        Returns:
+            Incidentes gravados, descartados, pendentes e tempo do último lote
+        """
+        return {
+            "path": self.path,
+            "written": self.written,
+            "pending": self._pending.qsize(),
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_batch_ms": self.last_batch_ms
+        }
+
+    async def _run(self) -> None:
+        """
+        Laço de gravação: junta incidentes em lotes e grava cada lote de uma vez.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Dict[str, Any]] = []
+        try:
+            while True:
+                batch.append(await self._pending.get())
+
+                # Espera o lote encher até o intervalo máximo de gravação
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    batch.extend(self._drain(self.batch_size - len(batch)))
+                    remaining = deadline - loop.time()
+                    if len(batch) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                to_write, batch = batch, []
+                await loop.run_in_executor(self._writer, self._write_batch, to_write)
+        except asyncio.CancelledError:
+            # Lote ainda não entregue à thread de gravação é gravado em stop()
+            self._unflushed = batch
+            raise
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Retira da fila, sem esperar, até limit incidentes.
+        """
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._pending.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    def _open_writer(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._write_conn = sqlite3.connect(self.path)
+        self._write_conn.execute("PRAGMA journal_mode=WAL")
+        self._write_conn.execute("PRAGMA synchronous=NORMAL")
+        self._write_conn.executescript(_SCHEMA)
+
+    def _open_reader(self) -> None:
+        self._read_conn = sqlite3.connect(self.path)
+        self._read_conn.row_factory = sqlite3.Row
+        self._read_conn.execute("PRAGMA query_only=ON")
+
+    @staticmethod
+    def _close(conn: Optional[sqlite3.Connection]) -> None:
+        if conn is not None:
+            conn.close()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Grava um lote de incidentes em uma única transação (thread de gravação).
+
+        Args:
+            batch: Incidentes enfileirados por record()
+        """
+        start_time = time.perf_counter()
+        try:
+            rows = [self._to_row(item) for item in batch]
+            with self._write_conn:
+                self._write_conn.executemany(_INSERT, rows)
+        except Exception as e:
+            self.failures += 1
+            log_erro_integracao("SQLite", "gravar incidentes", e)
+            return
+
+        self.written += len(batch)
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - start_time) * 1000, 2)
+
+    def _to_row(self, item: Dict[str, Any]) -> tuple:
+        """
+        Converte um incidente enfileirado na linha da tabela.
+        """
+        alert_data = item["alert"]
+        result = item["result"]
+        analysis = result.get("analysis") or {}
+        action_taken = result.get("action_taken") or {}
+        function_called = analysis.get("function_called") or {}
+
+        return (
+            item["created_at"],
+            _text(alert_data.get("event_id")),
+            _text(alert_data.get("trigger_id")),
+            str(alert_data.get("host") or ""),
+            alert_data.get("problem"),
+            alert_data.get("severity"),
+            str(alert_data.get("status") or "PROBLEM").upper(),
+            analysis.get("decided_by"),
+            function_called.get("name"),
+            analysis.get("recommended_job_id"),
+            int(bool(analysis.get("requires_action"))),
+            action_taken.get("status"),
+            _dumps(alert_data),
+            item.get("prompt"),
+            _dumps(analysis),
+            _dumps(action_taken),
+            _dumps(analysis.get("timings"))
+        )
+
+    def _query(self, query: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Executa uma consulta na conexão de leitura (thread de leitura).
+        """
+        incidents = []
+        for row in self._read_conn.execute(query, params):
+            incident = dict(row)
+            for column in _JSON_COLUMNS:
+                if incident.get(column) is not None:
+                    incident[column] = json.loads(incident[column])
+            incident["requires_action"] = bool(incident["requires_action"])
+            incidents.append(incident)
+        return incidents
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _dumps(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, default=str)
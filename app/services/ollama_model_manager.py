@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.core.logging import logger, log_erro_integracao
+from app.services.ollama_service import OllamaService
+
+
+class OllamaModelManager:
+    """
+    Mantém o modelo do Ollama carregado e aquecido em segundo plano.
+
+    Aquece o modelo na inicialização, reaquece periodicamente quando não
+    há tráfego suficiente para renovar o keep_alive e reaquece logo que
+    uma análise indica que o modelo precisou ser carregado do zero
+    (load_duration acima do limite configurado).
+    """
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        interval: float = settings.OLLAMA_REWARM_INTERVAL,
+        cold_threshold_ms: float = settings.OLLAMA_COLD_LOAD_THRESHOLD_MS
+    ):
+        """
+        Inicializa o gerenciador e o registra no serviço Ollama.
+
+        Args:
+            ollama_service: Serviço usado para falar com o Ollama
+            interval: Intervalo em segundos entre reaquecimentos sem tráfego
+            cold_threshold_ms: load_duration a partir do qual a carga é
+                considerada fria
+        """
+        self.ollama_service = ollama_service
+        self.interval = interval
+        self.cold_threshold_ms = cold_threshold_ms
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+        self.last_activity = 0.0
+        self.last_warmup: Optional[float] = None
+        self.last_warmup_durations: Dict[str, float] = {}
+        self.warmups = 0
+        self.warmup_failures = 0
+        self.cold_loads = 0
+
+        ollama_service.model_manager = self
+
+    def start(self) -> None:
+        """
+        Inicia o laço de aquecimento. Deve ser chamado com o event loop ativo.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="ollama-model-manager")
+
+    async def stop(self) -> None:
+        """
+        Interrompe o laço de aquecimento.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def observe(self, timings: Dict[str, Any]) -> None:
+        """
+        Registra uma chamada ao Ollama feita por uma análise.
+
+        Cada análise já renova o keep_alive do modelo. Se a chamada pagou
+        uma carga fria, o laço é acordado para reaquecer imediatamente.
+
+        Args:
+            timings: Tempos medidos na chamada ao Ollama
+        """
+        self.last_activity = time.monotonic()
+
+        load_ms = timings.get("ollama_load_duration_ms") or 0.0
+        if load_ms >= self.cold_threshold_ms:
+            self.cold_loads += 1
+            logger.warning(
+                f"Carga fria do modelo {self.ollama_service.model} detectada "
+                f"({load_ms:.0f} ms), reaquecendo"
+            )
+            self._wake.set()
+
+    async def warm(self) -> bool:
+        """
+        Aquece o modelo uma vez.
+
+        Returns:
+            True se o aquecimento foi bem sucedido
+        """
+        start_time = time.monotonic()
+        try:
+            self.last_warmup_durations = await self.ollama_service.warm_up()
+        except Exception as e:
+            self.warmup_failures += 1
+            log_erro_integracao("Ollama", "warm_up", e)
+            return False
+
+        self.warmups += 1
+        self.last_warmup = time.time()
+        self.last_activity = time.monotonic()
+        logger.info(
+            f"Modelo {self.ollama_service.model} aquecido em "
+            f"{time.monotonic() - start_time:.2f} segundos"
+        )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do aquecimento do modelo.
+
+        Returns:
+            Contadores e horário do último aquecimento
+        """
+        return {
+            "model": self.ollama_service.model,
+            "keep_alive": self.ollama_service.keep_alive,
+            "warmups": self.warmups,
+            "warmup_failures": self.warmup_failures,
+            "cold_loads": self.cold_loads,
+            "last_warmup": self.last_warmup,
+            "last_warmup_durations": self.last_warmup_durations
+        }
+
+    async def _run(self) -> None:
+        """
+        Laço principal: aquece na inicialização e reaquece quando necessário.
+        """
+        # Na inicialização o Ollama pode ainda não estar pronto
+        retry_delays: List[float] = [1, 2, 5, 10, 30]
+        for delay in retry_delays:
+            if await self.warm():
+                break
+            await asyncio.sleep(delay)
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                cold_load = True
+            except asyncio.TimeoutError:
+                cold_load = False
+            self._wake.clear()
+
+            # Com tráfego recente, as próprias análises renovam o keep_alive
+            idle = time.monotonic() - self.last_activity
+            if cold_load or idle >= self.interval:
+                await self.warm()
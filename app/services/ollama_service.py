@@ -1,10 +1,15 @@
 import httpx
+import copy
 import json
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Iterator
 
 from app.core.config import settings
-from app.core.logging import logger, log_erro_integracao
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CallOutcome
+from app.core.logging import logger, log_erro_integracao, log_payload
+from app.core.metrics import OLLAMA_LATENCY, FALLBACKS
+from app.core.tracing import span
 
 
 class OllamaService:
@@ -15,15 +20,51 @@ class OllamaService:
     as respostas em chamadas de funções para automação de ações.
     """
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         """
         Inicializa o serviço com as configurações do Ollama.
+        
+        Args:
+            client: Cliente HTTP compartilhado (pool de conexões). Se não for
+                informado, um cliente temporário é criado a cada chamada.
         """
         self.base_url = settings.OLLAMA_BASE_URL
         self.model = settings.OLLAMA_MODEL
+        self.client = client
+        
+        # Gerenciador de aquecimento do modelo (registrado por OllamaModelManager)
+        self.model_manager = None
+        
+        # Disjuntor das chamadas ao /api/chat
+        self.breaker: Optional[CircuitBreaker] = None
+        if settings.OLLAMA_BREAKER_ENABLED:
+            self.breaker = CircuitBreaker(
+                "Ollama",
+                failure_threshold=settings.OLLAMA_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.OLLAMA_BREAKER_RESET_TIMEOUT,
+                slow_call_seconds=settings.OLLAMA_BREAKER_SLOW_CALL_SECONDS or None
+            )
         
         # Definimos as funções disponíveis e seus schemas
         self.tools = self._create_tools()
+        self.tool_names = {tool["function"]["name"] for tool in self.tools}
+        self.system_prompt = self._create_system_prompt()
+        self.options = {"temperature": settings.OLLAMA_TEMPERATURE}
+        self.keep_alive = self._parse_keep_alive(settings.OLLAMA_KEEP_ALIVE)
+        
+        # Partes estáticas do corpo de /api/chat, serializadas uma única vez
+        # (uma versão para respostas completas e outra para streaming)
+        self._chat_prefixes = {
+            stream: self._create_chat_prefix(stream) for stream in (False, True)
+        }
+        
+        # Versão para lotes: cada função recebe também o índice do alerta
+        self.batch_tools = self._create_batch_tools()
+        self.batch_system_prompt = self._create_batch_system_prompt()
+        self._batch_prefix = self._create_chat_prefix(
+            system_prompt=self.batch_system_prompt,
+            tools=self.batch_tools
+        )
         
         # Mapeamento entre funções e jobs do Rundeck (corrige o erro de "job não encontrado")
         self.function_job_mapping = {
@@ -37,7 +78,132 @@ class OllamaService:
         # Registramos os jobs disponíveis para debug
         logger.info(f"Jobs disponíveis: {list(self.function_job_mapping.values())}")
 
-    # [Os métodos existentes check_connection e _create_tools permanecem iguais]
+    async def check_connection(self) -> Dict[str, Any]:
+        """
+        Verifica a conexão com o Ollama e a disponibilidade do modelo.
+        
+        Returns:
+            Status do componente no formato usado pelo health check
+        """
+        response = await self._request("GET", f"{self.base_url}/api/tags")
+        response.raise_for_status()
+        
+        models = [m.get("name", "") for m in response.json().get("models", [])]
+        model_available = any(
+            name == self.model or name.split(":")[0] == self.model
+            for name in models
+        )
+        
+        return {
+            "name": "ollama",
+            "status": "operational" if model_available else "degraded",
+            "message": (
+                f"Modelo {self.model} disponível" if model_available
+                else f"Modelo {self.model} não encontrado no Ollama"
+            )
+        }
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        guarded: bool = True,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Envia uma requisição ao Ollama usando o pool de conexões compartilhado.
+        
+        Args:
+            method: Método HTTP
+            url: URL completa do endpoint
+            guarded: Se False, a chamada não passa pelo disjuntor
+            **kwargs: Argumentos repassados ao httpx
+            
+        Returns:
+            Resposta HTTP do Ollama
+        """
+        start_time = time.perf_counter()
+        with span(f"ollama.{_endpoint(url)}"), self._guard(url, guarded) as outcome:
+            try:
+                if self.client is not None:
+                    response = await self.client.request(method, url, **kwargs)
+                else:
+                    async with httpx.AsyncClient(
+                        timeout=httpx.Timeout(
+                            settings.OLLAMA_TIMEOUT,
+                            connect=settings.OLLAMA_CONNECT_TIMEOUT
+                        )
+                    ) as client:
+                        response = await client.request(method, url, **kwargs)
+            finally:
+                OLLAMA_LATENCY.observe(time.perf_counter() - start_time, _endpoint(url))
+            
+            if response.status_code >= 500 or response.status_code == 429:
+                outcome.fail(f"HTTP {response.status_code}")
+            return response
+
+    @contextmanager
+    def _guard(self, url: str, guarded: bool = True) -> Iterator[CallOutcome]:
+        """
+        Passa as chamadas de inferência (/api/chat) pelo disjuntor.
+        
+        As demais (ex: /api/tags do health check) e as chamadas com
+        guarded=False (aquecimento do modelo) não são bloqueadas nem
+        contabilizadas.
+        
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto
+        """
+        if self.breaker is None or not guarded or _endpoint(url) != "chat":
+            yield CallOutcome()
+            return
+        
+        with self.breaker.call() as outcome:
+            yield outcome
+
+    @asynccontextmanager
+    async def _stream(
+        self,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Abre uma requisição em streaming ao Ollama usando o pool compartilhado.
+        
+        Ao sair do contexto a resposta é fechada, o que interrompe a geração
+        no Ollama caso ela ainda não tenha terminado.
+        
+        Args:
+            method: Método HTTP
+            url: URL completa do endpoint
+            **kwargs: Argumentos repassados ao httpx
+            
+        Yields:
+            Resposta HTTP com o corpo ainda não consumido
+        """
+        start_time = time.perf_counter()
+        with span(f"ollama.{_endpoint(url)}", stream=True), self._guard(url) as outcome:
+            try:
+                if self.client is not None:
+                    async with self.client.stream(method, url, **kwargs) as response:
+                        if response.status_code >= 500 or response.status_code == 429:
+                            outcome.fail(f"HTTP {response.status_code}")
+                        yield response
+                    return
+                
+                async with httpx.AsyncClient(
+                    timeout=httpx.Timeout(
+                        settings.OLLAMA_TIMEOUT,
+                        connect=settings.OLLAMA_CONNECT_TIMEOUT
+                    )
+                ) as client:
+                    async with client.stream(method, url, **kwargs) as response:
+                        if response.status_code >= 500 or response.status_code == 429:
+                            outcome.fail(f"HTTP {response.status_code}")
+                        yield response
+            finally:
+                OLLAMA_LATENCY.observe(time.perf_counter() - start_time, _endpoint(url) + "_stream")
 
     async def analyze_alert(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -50,10 +216,11 @@ class OllamaService:
             Dicionário com a análise e ação recomendada
         """
         # Registra os dados recebidos em formato detalhado para debug
-        logger.debug(f"Dados brutos recebidos para análise: {json.dumps(alert_data)}")
+        log_payload("Dados brutos recebidos para análise", alert_data, host=alert_data.get("host"))
         
         # Enriquece os dados de alerta com informação contextual quando valores são genéricos
-        enriched_alert = self._enrich_alert_data(alert_data)
+        with span("enrich"):
+            enriched_alert = self._enrich_alert_data(alert_data)
         
         # Log do início da análise
         logger.info(
@@ -62,65 +229,477 @@ class OllamaService:
         )
         logger.debug(f"Modelo utilizado: {self.model}")
         
-        # Criamos um prompt que explica claramente a tarefa para o modelo
-        system_prompt = self._create_system_prompt()
-        user_prompt = self._create_user_prompt(enriched_alert)
+        # O prompt de sistema é fixo; apenas o prompt do usuário varia por alerta
+        with span("prompt"):
+            user_prompt = self._create_user_prompt(enriched_alert)
+        
+        # Log do prompt para debug
+        logger.debug("User prompt: %.200s...", user_prompt)
         
-        # Log dos prompts para debug
-        logger.debug(f"System prompt: {system_prompt[:200]}...")
-        logger.debug(f"User prompt: {user_prompt[:200]}...")
+        analysis = await self._analyze_prompt(user_prompt, enriched_alert, alert_data)
+        # Prompt efetivamente enviado ao modelo, para o histórico de incidentes
+        analysis["prompt"] = user_prompt
+        return analysis
+    
+    async def _analyze_prompt(
+        self,
+        user_prompt: str,
+        enriched_alert: Dict[str, Any],
+        alert_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Envia o prompt do alerta ao modelo e interpreta a resposta.
         
+        Args:
+            user_prompt: Prompt do usuário específico do alerta
+            enriched_alert: Dados do alerta enriquecidos
+            alert_data: Dados do alerta recebidos
+            
+        Returns:
+            Dicionário com a análise e ação recomendada (ou o fallback)
+        """
         try:
+            if settings.OLLAMA_STREAMING:
+                return await self._analyze_streaming(user_prompt, enriched_alert)
+            
             logger.info("Enviando requisição para Ollama...")
             start_time = time.time()
             
-            async with httpx.AsyncClient() as client:
-                # Configuramos a chamada para usar function calling
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "tools": self.tools,
-                        "stream": False,
-                        "temperature": 0.1
-                    },
-                    timeout=60.0
-                )
+            # Configuramos a chamada para usar function calling
+            response = await self._request(
+                "POST",
+                f"{self.base_url}/api/chat",
+                content=self._create_chat_body(user_prompt),
+                headers={"Content-Type": "application/json"}
+            )
+            
+            # Log do tempo de resposta do modelo
+            processing_time = time.time() - start_time
+            logger.info(f"Ollama respondeu em {processing_time:.2f} segundos")
+            
+            if response.status_code == 200:
+                result = response.json()
                 
-                # Log do tempo de resposta do modelo
-                processing_time = time.time() - start_time
-                logger.info(f"Ollama respondeu em {processing_time:.2f} segundos")
+                # Log da resposta bruta do modelo para debug
+                log_payload("Resposta bruta do modelo", result, host=alert_data.get("host"))
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Log da resposta bruta do modelo para debug
-                    logger.debug(f"Resposta bruta do modelo: {json.dumps(result)}")
-                    
-                    # Processamos a resposta buscando tool_calls
-                    logger.info("Processando resposta do modelo...")
-                    return self._process_ollama_response(result, enriched_alert)
-                else:
-                    # Em caso de falha, retornamos uma resposta padrão
-                    error_msg = f"Falha ao consultar Ollama: {response.text}"
-                    logger.error(error_msg)
-                    return self._create_fallback_action(
-                        error_msg, 
-                        enriched_alert
-                    )
+                # Processamos a resposta buscando tool_calls
+                logger.info("Processando resposta do modelo...")
+                with span("process_response"):
+                    analysis = self._process_ollama_response(result, enriched_alert)
+                self._record_timings(analysis, {
+                    "total_ms": round(processing_time * 1000, 2),
+                    **self._ollama_durations(result)
+                })
+                return analysis
+            else:
+                # Em caso de falha, retornamos uma resposta padrão
+                error_msg = f"Falha ao consultar Ollama: {response.text}"
+                logger.error(error_msg)
+                return self._create_fallback_action(
+                    error_msg, 
+                    enriched_alert,
+                    reason_code="ollama_http_error"
+                )
+        
+        except CircuitOpenError as e:
+            # Sem esperar pelo timeout: o Ollama está fora ou sobrecarregado
+            logger.warning(f"{e}, usando fallback")
+            return self._create_fallback_action(
+                str(e),
+                enriched_alert,
+                reason_code="circuit_open"
+            )
         
         except Exception as e:
             error_msg = f"Erro ao processar com Ollama: {str(e)}"
             logger.exception(error_msg)
             return self._create_fallback_action(
                 error_msg, 
-                enriched_alert
+                enriched_alert,
+                reason_code="ollama_error"
             )
     
+    async def analyze_batch(
+        self,
+        alerts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Analisa vários alertas em uma única chamada ao modelo.
+        
+        O prompt de sistema e o schema das ferramentas são enviados uma vez
+        para todo o lote. O modelo deve chamar uma função por alerta,
+        informando o índice do alerta em alert_index; as chamadas são
+        associadas de volta aos alertas por esse índice.
+        
+        Args:
+            alerts: Dados dos alertas do Zabbix
+            
+        Returns:
+            Lista de análises, na mesma ordem dos alertas recebidos
+        """
+        enriched_alerts = [self._enrich_alert_data(alert) for alert in alerts]
+        user_prompt = self._create_batch_user_prompt(enriched_alerts)
+        
+        analyses = await self._analyze_batch_prompt(user_prompt, enriched_alerts)
+        # O mesmo prompt de lote, efetivamente enviado, em cada análise
+        for analysis in analyses:
+            analysis["prompt"] = user_prompt
+        return analyses
+    
+    async def _analyze_batch_prompt(
+        self,
+        user_prompt: str,
+        enriched_alerts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Envia o prompt do lote ao modelo e associa as chamadas aos alertas.
+        
+        Args:
+            user_prompt: Prompt do usuário com todos os alertas do lote
+            enriched_alerts: Dados dos alertas enriquecidos
+            
+        Returns:
+            Lista de análises, na mesma ordem dos alertas
+        """
+        logger.info(f"Enviando lote de {len(enriched_alerts)} alertas para Ollama...")
+        start_time = time.time()
+        
+        try:
+            response = await self._request(
+                "POST",
+                f"{self.base_url}/api/chat",
+                content=self._create_chat_body(user_prompt, prefix=self._batch_prefix),
+                headers={"Content-Type": "application/json"},
+                timeout=settings.OLLAMA_BATCH_TIMEOUT
+            )
+            processing_time = time.time() - start_time
+            logger.info(f"Ollama respondeu ao lote em {processing_time:.2f} segundos")
+            
+            if response.status_code != 200:
+                error_msg = f"Falha ao consultar Ollama: {response.text}"
+                logger.error(error_msg)
+                return [
+                    self._create_fallback_action(error_msg, alert, reason_code="ollama_http_error")
+                    for alert in enriched_alerts
+                ]
+            
+            result = response.json()
+        except CircuitOpenError as e:
+            logger.warning(f"{e}, usando fallback para {len(enriched_alerts)} alertas")
+            return [
+                self._create_fallback_action(str(e), alert, reason_code="circuit_open")
+                for alert in enriched_alerts
+            ]
+        except Exception as e:
+            error_msg = f"Erro ao processar lote com Ollama: {str(e)}"
+            logger.exception(error_msg)
+            return [
+                self._create_fallback_action(error_msg, alert, reason_code="ollama_error")
+                for alert in enriched_alerts
+            ]
+        
+        calls = self._assign_batch_calls(
+            (result.get("message") or {}).get("tool_calls") or [],
+            len(enriched_alerts)
+        )
+        
+        timings = {
+            "total_ms": round(processing_time * 1000, 2),
+            "batch_size": len(enriched_alerts),
+            **self._ollama_durations(result)
+        }
+        
+        analyses = []
+        for index, alert in enumerate(enriched_alerts):
+            call = calls.get(index)
+            if call is None:
+                analysis = self._create_fallback_action(
+                    "O modelo não recomendou ação para este alerta no lote",
+                    alert,
+                    reason_code="no_tool_call"
+                )
+            else:
+                analysis = self.build_action(call[0], call[1], alert)
+            
+            analysis["batch_index"] = index
+            analysis["timings"] = dict(timings)
+            analyses.append(analysis)
+        
+        if self.model_manager is not None:
+            self.model_manager.observe(timings)
+        
+        return analyses
+
+    def _assign_batch_calls(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        batch_size: int
+    ) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+        """
+        Associa as chamadas de função de um lote aos índices dos alertas.
+        
+        Chamadas sem alert_index válido (ausente, fora do intervalo ou
+        repetido) são atribuídas, na ordem em que aparecem, aos alertas que
+        ainda não receberam uma chamada.
+        
+        Args:
+            tool_calls: Chamadas de função retornadas pelo modelo
+            batch_size: Quantidade de alertas no lote
+            
+        Returns:
+            Mapeamento índice do alerta -> (função, argumentos)
+        """
+        assigned: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        unindexed: List[Tuple[str, Dict[str, Any]]] = []
+        
+        for call in tool_calls:
+            function = call.get("function") or {}
+            function_name = function.get("name")
+            arguments = function.get("arguments", {})
+            
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments)
+                except json.JSONDecodeError:
+                    logger.warning("Argumentos de chamada em lote não são JSON válido")
+                    continue
+            if not isinstance(arguments, dict) or function_name not in self.tool_names:
+                continue
+            
+            arguments = dict(arguments)
+            index = arguments.pop("alert_index", None)
+            try:
+                index = int(index)
+            except (TypeError, ValueError):
+                index = None
+            
+            if index is None or not 0 <= index < batch_size or index in assigned:
+                unindexed.append((function_name, arguments))
+            else:
+                assigned[index] = (function_name, arguments)
+        
+        free_indexes = (i for i in range(batch_size) if i not in assigned)
+        for call, index in zip(unindexed, free_indexes):
+            assigned[index] = call
+        
+        return assigned
+
+    async def _analyze_streaming(
+        self,
+        user_prompt: str,
+        alert_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Consulta o Ollama em streaming e encerra assim que houver uma
+        chamada de função válida.
+        
+        Os chunks NDJSON são consumidos à medida que chegam. Quando o
+        primeiro tool_call completo e válido aparece, a conexão é fechada,
+        cancelando os tokens restantes da geração.
+        
+        Args:
+            user_prompt: Prompt do usuário específico do alerta
+            alert_data: Dados do alerta (já enriquecidos)
+            
+        Returns:
+            Dicionário com a análise, a ação recomendada e os tempos medidos
+        """
+        logger.info("Enviando requisição para Ollama (streaming)...")
+        start_time = time.perf_counter()
+        first_token_at: Optional[float] = None
+        decision_at: Optional[float] = None
+        content_parts: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        last_chunk: Dict[str, Any] = {}
+        
+        async with self._stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            content=self._create_chat_body(user_prompt, stream=True),
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                error_msg = f"Falha ao consultar Ollama: {response.text}"
+                logger.error(error_msg)
+                return self._create_fallback_action(
+                    error_msg, alert_data, reason_code="ollama_http_error"
+                )
+            
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                
+                last_chunk = json.loads(line)
+                message = last_chunk.get("message") or {}
+                
+                if first_token_at is None and (
+                    message.get("content") or message.get("tool_calls")
+                ):
+                    first_token_at = time.perf_counter()
+                
+                if message.get("content"):
+                    content_parts.append(message["content"])
+                
+                complete_calls = [
+                    call for call in message.get("tool_calls") or []
+                    if self._is_complete_tool_call(call)
+                ]
+                if complete_calls:
+                    tool_calls.extend(complete_calls)
+                    decision_at = time.perf_counter()
+                    break
+                
+                if last_chunk.get("done"):
+                    break
+        
+        end_time = time.perf_counter()
+        early_stop = decision_at is not None and not last_chunk.get("done")
+        logger.info(
+            f"Ollama respondeu em {end_time - start_time:.2f} segundos "
+            f"(streaming, interrompido antecipadamente: {early_stop})"
+        )
+        
+        result = {
+            "message": {
+                "role": "assistant",
+                "content": "".join(content_parts),
+                "tool_calls": tool_calls
+            }
+        }
+        analysis = self._process_ollama_response(result, alert_data)
+        self._record_timings(analysis, {
+            "total_ms": round((end_time - start_time) * 1000, 2),
+            "time_to_first_token_ms": (
+                round((first_token_at - start_time) * 1000, 2)
+                if first_token_at is not None else None
+            ),
+            "time_to_decision_ms": (
+                round((decision_at - start_time) * 1000, 2)
+                if decision_at is not None else None
+            ),
+            "early_stop": early_stop,
+            **self._ollama_durations(last_chunk)
+        })
+        return analysis
+
+    def _is_complete_tool_call(self, call: Dict[str, Any]) -> bool:
+        """
+        Verifica se um tool_call recebido no stream já pode ser executado.
+        
+        Args:
+            call: Chamada de função recebida do modelo
+            
+        Returns:
+            True se a função existe e os argumentos são válidos
+        """
+        function = call.get("function") or {}
+        function_name = function.get("name")
+        if function_name not in self.tool_names:
+            return False
+        
+        _, is_valid = self._parse_and_validate_arguments(
+            function_name, copy.deepcopy(function.get("arguments", "{}"))
+        )
+        return is_valid
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Carrega o modelo no Ollama e pré-processa o prefixo fixo do prompt.
+        
+        Envia uma conversa mínima com o mesmo prompt de sistema e as mesmas
+        ferramentas das análises, gerando um único token. Assim o modelo
+        fica em memória e o prefixo já está no cache de prompt do Ollama
+        quando o próximo alerta chegar.
+        
+        O aquecimento não passa pelo disjuntor: a carga a frio do modelo é
+        lenta por natureza e não deve contar como falha, ocupar a sondagem
+        do estado meio aberto nem ser recusada com o circuito aberto.
+        
+        Returns:
+            Durações reportadas pelo Ollama, em milissegundos
+        """
+        body = json.dumps(
+            {
+                "model": self.model,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {**self.options, "num_predict": 1},
+                "tools": self.tools,
+                "messages": [
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": "ping"}
+                ]
+            },
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        
+        response = await self._request(
+            "POST",
+            f"{self.base_url}/api/chat",
+            guarded=False,
+            content=body,
+            headers={"Content-Type": "application/json"},
+            timeout=settings.OLLAMA_WARMUP_TIMEOUT
+        )
+        response.raise_for_status()
+        return self._ollama_durations(response.json())
+
+    def _record_timings(self, analysis: Dict[str, Any], timings: Dict[str, Any]) -> None:
+        """
+        Anexa os tempos medidos à análise e informa o gerenciador do modelo.
+        
+        Args:
+            analysis: Resultado da análise
+            timings: Tempos medidos na chamada ao Ollama
+        """
+        analysis["timings"] = timings
+        if self.model_manager is not None:
+            self.model_manager.observe(timings)
+
+    @staticmethod
+    def _parse_keep_alive(value: str) -> Any:
+        """
+        Converte o keep_alive configurado para o formato aceito pelo Ollama.
+        
+        Valores numéricos (segundos, ou -1 para manter indefinidamente) são
+        enviados como número; durações como "30m" são enviadas como texto.
+        
+        Args:
+            value: Valor configurado
+            
+        Returns:
+            Valor de keep_alive para o corpo da requisição
+        """
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+    @staticmethod
+    def _ollama_durations(result: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Extrai as durações reportadas pelo Ollama (em nanossegundos) como ms.
+        
+        Args:
+            result: Resposta (ou último chunk) do Ollama
+            
+        Returns:
+            Durações presentes na resposta, em milissegundos
+        """
+        return {
+            f"ollama_{name}_ms": round(result[name] / 1_000_000, 2)
+            for name in (
+                "total_duration",
+                "load_duration",
+                "prompt_eval_duration",
+                "eval_duration"
+            )
+            if isinstance(result.get(name), (int, float))
+        }
+
     def _enrich_alert_data(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enriquece os dados de alerta com informações contextuais quando os valores são genéricos.
@@ -220,7 +799,8 @@ class OllamaService:
                 logger.warning("O modelo não chamou nenhuma função")
                 return self._create_fallback_action(
                     "O modelo não recomendou nenhuma ação específica",
-                    alert_data
+                    alert_data,
+                    reason_code="no_tool_call"
                 )
             
             # Log das funções chamadas
@@ -234,48 +814,75 @@ class OllamaService:
             function_name = first_call.get("function", {}).get("name")
             arguments = first_call.get("function", {}).get("arguments", "{}")
             
-            # Validação e parsing dos argumentos
-            parsed_arguments, is_valid = self._parse_and_validate_arguments(
-                function_name, arguments
-            )
-            
-            if not is_valid:
-                logger.warning(f"Argumentos inválidos para função {function_name}")
-                return self._create_fallback_action(
-                    f"O modelo forneceu argumentos inválidos para a função {function_name}",
-                    alert_data
-                )
-            
-            # Log da decisão final
-            logger.info(f"Ação escolhida: {function_name}")
-            logger.info(f"Parâmetros validados: {parsed_arguments}")
-            
-            # Mapeia a função para o job correspondente no Rundeck
-            job_id = self._map_function_to_job(function_name)
-            requires_action = function_name != "notify"
-            
-            # Log do mapeamento para job
-            logger.info(f"Função {function_name} mapeada para job {job_id}")
-            
-            return {
-                "action": function_name.replace("_", "-"),
-                "requires_action": requires_action,
-                "recommended_job_id": job_id,
-                "job_parameters": parsed_arguments,
-                "reason": self._generate_reason(function_name, alert_data, parsed_arguments),
-                "confidence": 0.9,  # Valor fixo de confiança
-                "function_called": {
-                    "name": function_name,
-                    "arguments": parsed_arguments
-                }
-            }
+            return self.build_action(function_name, arguments, alert_data)
         
         except Exception as e:
             logger.exception(f"Erro ao processar resposta: {str(e)}")
             return self._create_fallback_action(
                 f"Erro ao processar resposta do modelo: {str(e)}",
-                alert_data
+                alert_data,
+                reason_code="invalid_response"
+            )
+    
+    def build_action(
+        self,
+        function_name: str,
+        arguments: Any,
+        alert_data: Dict[str, Any],
+        decided_by: str = "llm"
+    ) -> Dict[str, Any]:
+        """
+        Valida uma chamada de função e a converte na ação a ser executada.
+        
+        Usado tanto para as chamadas feitas pelo modelo quanto para decisões
+        obtidas por outros caminhos (por exemplo, o cache de decisões).
+        
+        Args:
+            function_name: Nome da função escolhida
+            arguments: Argumentos da função (string JSON ou dicionário)
+            alert_data: Dados do alerta
+            decided_by: Origem da decisão (llm, cache, ...)
+            
+        Returns:
+            Ação a ser executada no Rundeck
+        """
+        # Validação e parsing dos argumentos
+        parsed_arguments, is_valid = self._parse_and_validate_arguments(
+            function_name, arguments
+        )
+        
+        if not is_valid:
+            logger.warning(f"Argumentos inválidos para função {function_name}")
+            return self._create_fallback_action(
+                f"O modelo forneceu argumentos inválidos para a função {function_name}",
+                alert_data,
+                reason_code="invalid_arguments"
             )
+        
+        # Log da decisão final
+        logger.info(f"Ação escolhida: {function_name} (origem: {decided_by})")
+        logger.info(f"Parâmetros validados: {parsed_arguments}")
+        
+        # Mapeia a função para o job correspondente no Rundeck
+        job_id = self._map_function_to_job(function_name)
+        requires_action = function_name != "notify"
+        
+        # Log do mapeamento para job
+        logger.info(f"Função {function_name} mapeada para job {job_id}")
+        
+        return {
+            "action": function_name.replace("_", "-"),
+            "requires_action": requires_action,
+            "recommended_job_id": job_id,
+            "job_parameters": parsed_arguments,
+            "reason": self._generate_reason(function_name, alert_data, parsed_arguments),
+            "confidence": 0.9,  # Valor fixo de confiança
+            "decided_by": decided_by,
+            "function_called": {
+                "name": function_name,
+                "arguments": dict(parsed_arguments)
+            }
+        }
     
     def _parse_and_validate_arguments(
         self, 
@@ -424,6 +1031,76 @@ class OllamaService:
             
         return f"O modelo recomendou {function_name} com base na análise do alerta."
 
+    def _create_chat_prefix(
+        self,
+        stream: bool = False,
+        system_prompt: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> bytes:
+        """
+        Serializa as partes estáticas do corpo da requisição /api/chat.
+        
+        Modelo, opções, ferramentas e prompt de sistema não mudam entre
+        alertas, então são convertidos para JSON uma única vez e reutilizados
+        em todas as chamadas.
+        
+        Args:
+            stream: Se a resposta deve ser enviada em streaming
+            system_prompt: Prompt de sistema (padrão: o de análise individual)
+            tools: Ferramentas disponíveis (padrão: as de análise individual)
+        
+        Returns:
+            Prefixo JSON do corpo, terminando na lista de mensagens aberta
+        """
+        static_fields = json.dumps(
+            {
+                "model": self.model,
+                "stream": stream,
+                "keep_alive": self.keep_alive,
+                "options": self.options,
+                "tools": self.tools if tools is None else tools,
+            },
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        system_message = json.dumps(
+            {
+                "role": "system",
+                "content": self.system_prompt if system_prompt is None else system_prompt
+            },
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        
+        # Remove o "}" final para continuar o objeto com as mensagens
+        return f'{static_fields[:-1]},"messages":[{system_message},'.encode("utf-8")
+
+    def _create_chat_body(
+        self,
+        user_prompt: str,
+        stream: bool = False,
+        prefix: Optional[bytes] = None
+    ) -> bytes:
+        """
+        Monta o corpo completo de /api/chat a partir do prefixo pré-serializado.
+        
+        Args:
+            user_prompt: Prompt do usuário específico do alerta
+            stream: Se a resposta deve ser enviada em streaming
+            prefix: Prefixo pré-serializado (padrão: o de análise individual)
+            
+        Returns:
+            Corpo JSON da requisição em bytes
+        """
+        user_message = json.dumps(
+            {"role": "user", "content": user_prompt},
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        if prefix is None:
+            prefix = self._chat_prefixes[stream]
+        return prefix + user_message.encode("utf-8") + b"]}"
+
     def _create_system_prompt(self) -> str:
         """
         Cria um prompt de sistema para o modelo.
@@ -590,6 +1267,94 @@ class OllamaService:
             }
         ]
 
+    def _create_batch_tools(self) -> List[Dict[str, Any]]:
+        """
+        Cria as ferramentas usadas na análise em lote.
+        
+        São as mesmas ferramentas da análise individual, com o parâmetro
+        obrigatório alert_index para identificar a qual alerta a chamada se
+        refere.
+        
+        Returns:
+            Lista de definições de funções no formato esperado pelo Ollama
+        """
+        batch_tools = copy.deepcopy(self.tools)
+        for tool in batch_tools:
+            parameters = tool["function"]["parameters"]
+            parameters["properties"]["alert_index"] = {
+                "type": "integer",
+                "description": "Índice do alerta (ex: 0 para o alerta [0])"
+            }
+            parameters["required"] = ["alert_index", *parameters.get("required", [])]
+        return batch_tools
+
+    def _create_batch_system_prompt(self) -> str:
+        """
+        Cria o prompt de sistema para a análise em lote.
+        
+        Returns:
+            Prompt de sistema formatado
+        """
+        return self.system_prompt.replace(
+            "Não adicione explicações adicionais, apenas chame a função adequada.",
+            "Você receberá vários alertas numerados como [0], [1], [2]...\n"
+            "        Chame exatamente uma função para cada alerta, informando o\n"
+            "        número do alerta no parâmetro alert_index.\n"
+            "        \n"
+            "        Não adicione explicações adicionais, apenas chame as funções adequadas."
+        )
+
+    def _create_batch_user_prompt(self, alerts: List[Dict[str, Any]]) -> str:
+        """
+        Cria o prompt com todos os alertas de um lote.
+        
+        Args:
+            alerts: Dados dos alertas (já enriquecidos)
+            
+        Returns:
+            Prompt formatado para o usuário
+        """
+        blocks = []
+        for index, alert in enumerate(alerts):
+            details = alert.get('details') or {}
+            tags = alert.get('tags') or []
+            details_str = "; ".join(f"{key}: {value}" for key, value in details.items())
+            tags_str = "; ".join(
+                f"{tag.get('tag')}: {tag.get('value')}"
+                for tag in tags if isinstance(tag, dict)
+            )
+            block = (
+                f"[{index}] Host: {alert.get('host', 'desconhecido')} | "
+                f"Problema: {alert.get('problem', 'Problema não especificado')} | "
+                f"Severidade: {alert.get('severity', 'não especificada')} | "
+                f"Status: {alert.get('status', 'PROBLEM')}\n"
+                f"    Detalhes: {details_str or '-'}\n"
+                f"    Tags: {tags_str or '-'}"
+            )
+            # Resumo do histórico do host (mantido pelo pipeline)
+            if alert.get('host_context'):
+                block += "\n" + "\n".join(
+                    f"    {line}" for line in alert['host_context'].splitlines()
+                )
+            blocks.append(block)
+        
+        alerts_str = "\n".join(blocks)
+        return f"""
+        Analise os {len(alerts)} alertas do Zabbix abaixo e, para cada um,
+        chame a função mais apropriada informando o alert_index:
+        
+{alerts_str}
+        
+        Considere:
+        
+        1. Para problemas de disco cheio ('disk', '/var', 'filesystem', 'storage'), use cleanup_disk
+        2. Para serviços parados ('service', 'stopped', 'parado'), use restart_service
+        3. Para alta utilização de CPU/memória ('cpu', 'memory', 'load', 'utilization'), use analyze_processes
+        4. Para aplicações com problemas ('application', 'app', 'memory leak'), use restart_application
+        5. Se nenhuma ação automática for apropriada, use notify
+        6. Evite repetir, em um host, uma remediação recente que não resolveu o problema
+        """
+
     def _create_user_prompt(self, alert_data: Dict[str, Any]) -> str:
         """
         Cria um prompt específico para o alerta recebido.
@@ -628,6 +1393,33 @@ class OllamaService:
             Tente identificar o tipo de problema com base em quaisquer outros dados disponíveis.
             """
         
+        # Resumo do que já aconteceu neste host (mantido pelo pipeline)
+        host_context_note = ""
+        if alert_data.get('host_context'):
+            host_context_note = "\n".join(
+                f"        {line}" for line in alert_data['host_context'].splitlines()
+            )
+            host_context_note = f"""
+{host_context_note}
+        Evite repetir uma remediação recente que não resolveu o problema.
+        """
+        
+        # Alertas correlacionados do mesmo host formam um único incidente
+        symptoms_note = ""
+        symptoms = alert_data.get('symptoms') or []
+        if len(symptoms) > 1:
+            symptoms_str = "\n".join([
+                f"        - [{symptom.get('severity')}] {symptom.get('problem')}"
+                for symptom in symptoms
+            ])
+            symptoms_note = f"""
+        SINTOMAS CORRELACIONADOS: {len(symptoms)} alertas deste host chegaram juntos
+        e fazem parte do mesmo incidente:
+{symptoms_str}
+        
+        Escolha uma única ação que trate a causa provável de todos os sintomas.
+        """
+        
         # Construção do prompt final
         return f"""
         Analise o seguinte alerta do Zabbix e determine a melhor ação a ser 
@@ -644,6 +1436,8 @@ class OllamaService:
         Tags:
         {tags_str}
         {generic_note}
+        {symptoms_note}
+        {host_context_note}
         
         Com base nas informações acima, chame a função mais apropriada para 
         resolver este problema, considerando:
@@ -658,7 +1452,8 @@ class OllamaService:
     def _create_fallback_action(
         self, 
         reason: str, 
-        alert_data: Dict[str, Any]
+        alert_data: Dict[str, Any],
+        reason_code: str = "other"
     ) -> Dict[str, Any]:
         """
         Cria uma ação de fallback para casos onde não é possível
@@ -667,10 +1462,13 @@ class OllamaService:
         Args:
             reason: Motivo pelo qual a ação de fallback está sendo criada
             alert_data: Dados do alerta original
+            reason_code: Categoria do motivo (para métricas)
             
         Returns:
             Ação de notificação formatada
         """
+        FALLBACKS.inc(reason_code)
+        
         # Extraímos informações básicas para a mensagem
         host = alert_data.get('host', 'desconhecido')
         problem = alert_data.get('problem', 'Problema não especificado')
@@ -703,10 +1501,18 @@ class OllamaService:
             },
             "reason": reason,
             "confidence": 0.0,
+            "decided_by": "fallback",
+            "fallback_reason": reason_code,
             "original_alert": {
                 "host": host,
                 "problem": problem,
                 "severity": alert_data.get('severity', 'desconhecida')
             }
-        }    
-    
\ No newline at end of file
+        }
+
+
+def _endpoint(url: str) -> str:
+    """
+    Extrai o nome do endpoint do Ollama (ex: chat, tags) para as métricas.
+    """
+    return url.rstrip("/").rsplit("/", 1)[-1]
@@ -0,0 +1,305 @@
+import re
+from collections import deque
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+
+
+# Extratores de argumentos a partir do texto do problema
+_PATH_PATTERN = re.compile(r"(?<![\w.:/])/[\w.\-/]*")
+# Dispositivos e pseudo-sistemas de arquivos: não são diretórios a limpar
+_NON_CLEANUP_PATH = re.compile(r"^/(?:dev|proc|sys)(?:/|$)")
+# Último componente com extensão (ex: data.ibd, app.log): arquivo, não diretório
+_FILE_PATH = re.compile(r"/[^/]*[^/.]\.[A-Za-z0-9]{1,8}$")
+# Nome do serviço só na forma estrita "service <nome> is stopped/down/..."
+_SERVICE_PATTERNS = [
+    re.compile(
+        r"\bservi(?:ce|ço)\s+[\"']?([A-Za-z0-9_@.\-]+)[\"']?\s+"
+        r"(?:is\s+|está\s+)?(?:stopped|down|not running|parado|inactive|failed)\b",
+        re.IGNORECASE
+    ),
+]
+_APPLICATION_PATTERN = re.compile(
+    r"\b(?:application|aplicação|app)\s+[\"']?([A-Za-z0-9_@.\-]+)",
+    re.IGNORECASE
+)
+_MEMORY_PATTERN = re.compile(r"\b(?:memory|memória|ram|swap)\b", re.IGNORECASE)
+_IO_PATTERN = re.compile(r"\b(?:i/o|iowait|disk io)\b", re.IGNORECASE)
+
+# Palavras que não são nomes de serviço/aplicação válidos
+_STOPWORDS = {"is", "the", "on", "has", "was", "status", "service", "serviço", "a", "o"}
+
+
+class KeywordAutomaton:
+    """
+    Autômato Aho-Corasick para busca simultânea de várias palavras-chave.
+
+    Compilado uma única vez, encontra todas as ocorrências de todas as
+    palavras-chave em uma única passada pelo texto.
+    """
+
+    def __init__(self, keywords: Dict[str, str]):
+        """
+        Compila o autômato.
+
+        Args:
+            keywords: Mapeamento palavra-chave -> rótulo associado
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+
+        for keyword, label in keywords.items():
+            self._add(keyword.lower(), label)
+        self._build_failure_links()
+
+    def search(self, text: str) -> Iterator[Tuple[int, int, str, str]]:
+        """
+        Busca todas as palavras-chave no texto, respeitando limites de palavra.
+
+        Args:
+            text: Texto onde buscar (deve estar em minúsculas)
+
+        Yields:
+            Tuplas (início, fim, palavra-chave, rótulo)
+        """
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for keyword, label in self._output[state]:
+                start = index - len(keyword) + 1
+                if _is_word_bounded(text, start, index + 1, keyword):
+                    yield start, index + 1, keyword, label
+
+    def _add(self, keyword: str, label: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((keyword, label))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+
+class RuleMatcher:
+    """
+    Classificador determinístico de alertas baseado em palavras-chave.
+
+    Aplica as mesmas regras descritas no prompt do modelo ('disk', '/var',
+    'filesystem' -> cleanup_disk; 'service', 'stopped' -> restart_service;
+    ...) em microssegundos. Quando o alerta é ambíguo (palavras-chave de
+    mais de uma função ou argumentos obrigatórios não encontrados), a
+    decisão fica com o LLM.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, List[str]]] = None):
+        """
+        Compila as regras de classificação.
+
+        Args:
+            rules: Mapeamento função -> palavras-chave (padrão da configuração)
+        """
+        rules = rules if rules is not None else settings.RULE_KEYWORDS
+        self._automaton = KeywordAutomaton({
+            keyword: function_name
+            for function_name, keywords in rules.items()
+            for keyword in keywords
+        })
+
+        self.matched = 0
+        self.ambiguous = 0
+        self.unmatched = 0
+
+    def classify(self, alert_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Classifica o alerta em uma das funções disponíveis.
+
+        Args:
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Dicionário com a função, os argumentos extraídos e as
+            palavras-chave encontradas, ou None se o alerta for ambíguo
+        """
+        problem = str(alert_data.get("problem") or "")
+        matches = self._longest_matches(problem.lower())
+
+        candidates = {label for _, _, _, label in matches}
+        if not candidates:
+            self.unmatched += 1
+            return None
+        if len(candidates) > 1:
+            self.ambiguous += 1
+            logger.debug(f"Regras ambíguas para o alerta: {sorted(candidates)}")
+            return None
+
+        function_name = candidates.pop()
+        arguments = self._extract_arguments(function_name, problem, alert_data)
+        if arguments is None:
+            self.ambiguous += 1
+            logger.debug(f"Regra {function_name} sem argumentos obrigatórios no alerta")
+            return None
+
+        self.matched += 1
+        return {
+            "function": function_name,
+            "arguments": arguments,
+            "keywords": sorted({keyword for _, _, keyword, _ in matches})
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de classificação.
+
+        Returns:
+            Alertas decididos pelas regras, ambíguos e sem correspondência
+        """
+        return {
+            "matched": self.matched,
+            "ambiguous": self.ambiguous,
+            "unmatched": self.unmatched
+        }
+
+    def _longest_matches(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Busca as palavras-chave descartando as contidas em ocorrências maiores.
+
+        Assim 'memory leak' (restart_application) prevalece sobre 'memory'
+        (analyze_processes) no mesmo trecho do texto.
+
+        Args:
+            text: Texto em minúsculas
+
+        Returns:
+            Ocorrências que não estão contidas em outra maior
+        """
+        matches = sorted(
+            self._automaton.search(text),
+            key=lambda match: (match[0], -(match[1] - match[0]))
+        )
+
+        result = []
+        covered_until = -1
+        for match in matches:
+            if match[1] <= covered_until:
+                continue
+            result.append(match)
+            covered_until = max(covered_until, match[1])
+        return result
+
+    @staticmethod
+    def _extract_arguments(
+        function_name: str,
+        problem: str,
+        alert_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Extrai os argumentos da função a partir do texto e das tags do alerta.
+
+        Args:
+            function_name: Função escolhida pelas regras
+            problem: Texto original do problema
+            alert_data: Dados normalizados do alerta
+
+        Returns:
+            Argumentos da função, ou None se algum obrigatório não for encontrado
+        """
+        tags = {
+            tag.get("tag"): tag.get("value")
+            for tag in alert_data.get("tags") or []
+            if isinstance(tag, dict)
+        }
+
+        if function_name == "cleanup_disk":
+            paths = [path.rstrip(".") for path in _PATH_PATTERN.findall(problem)]
+            # Dispositivos (ex: "Storage pool /dev/sda1 degraded"), a raiz e
+            # arquivos não são limpos pelas regras: a decisão fica com o LLM
+            if not paths or any(_NON_CLEANUP_PATH.match(path) for path in paths):
+                return None
+            path = paths[0]
+            if path.rstrip("/") == "" or _FILE_PATH.search(path):
+                return None
+            return {"path": path}
+
+        if function_name == "restart_service":
+            service = tags.get("service") or _first_name(_SERVICE_PATTERNS, problem)
+            return {"service_name": service} if service else None
+
+        if function_name == "analyze_processes":
+            if _MEMORY_PATTERN.search(problem):
+                return {"resource_type": "memory"}
+            if _IO_PATTERN.search(problem):
+                return {"resource_type": "io"}
+            return {"resource_type": "cpu"}
+
+        if function_name == "restart_application":
+            app = (
+                tags.get("application")
+                or tags.get("app")
+                or _first_name([_APPLICATION_PATTERN], problem)
+            )
+            return {"app_name": app} if app else None
+
+        return None
+
+
+def _first_name(patterns: List["re.Pattern[str]"], text: str) -> Optional[str]:
+    """
+    Retorna o primeiro nome capturado pelos padrões que não seja uma stopword.
+
+    Args:
+        patterns: Padrões com um grupo de captura
+        text: Texto onde buscar
+
+    Returns:
+        Nome encontrado ou None
+    """
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            name = match.group(1).strip(".")
+            if name and name.lower() not in _STOPWORDS:
+                return name
+    return None
+
+
+def _is_word_bounded(text: str, start: int, end: int, keyword: str) -> bool:
+    """
+    Verifica se a ocorrência não está no meio de outra palavra.
+
+    Args:
+        text: Texto pesquisado
+        start: Início da ocorrência
+        end: Fim da ocorrência
+        keyword: Palavra-chave encontrada
+
+    Returns:
+        True se a ocorrência respeita os limites de palavra
+    """
+    if keyword[0].isalnum() and start > 0 and text[start - 1].isalnum():
+        return False
+    if keyword[-1].isalnum() and end < len(text) and text[end].isalnum():
+        return False
+    return True
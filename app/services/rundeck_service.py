@@ -1,11 +1,16 @@
+import asyncio
 import httpx
-import json
+import logging
 import uuid
 import time
 from typing import Dict, Any, Optional
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.logging import logger, log_erro_integracao
+from app.core.logging import logger, log_erro_integracao, log_payload, LazyJson
+from app.core.metrics import RUNDECK_LATENCY, RUNDECK_DISPATCHES, RUNDECK_RETRIES
+from app.core.retry import RetryBudget, backoff_delay
+from app.core.tracing import current_trace_id, span
 
 
 class RundeckService:
@@ -15,12 +20,18 @@ class RundeckService:
     Fornece métodos para executar jobs através de webhooks pré-configurados.
     """
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         """
         Inicializa o serviço com as URLs de webhooks fixas.
+        
+        Args:
+            client: Cliente HTTP compartilhado (pool de conexões). Se não for
+                informado, um cliente temporário é criado a cada chamada.
         """
+        self.client = client
+        
         # Define a URL base para os webhooks
-        self.base_url = "http://rundeck:4440"  # URL direta para o contêiner do Rundeck
+        self.base_url = settings.RUNDECK_WEBHOOK_BASE_URL.rstrip("/")
         
         # Mapeamento simples e direto dos jobs para webhooks completos
         self.webhook_urls = {
@@ -41,17 +52,112 @@ class RundeckService:
         # Padrão: False (executa chamadas reais)
         self.simulation_mode = False
         
+        # Disparos concluídos e em andamento, por chave de idempotência
+        self._dispatched = TTLCache(
+            max_size=settings.RUNDECK_IDEMPOTENCY_MAX_SIZE,
+            ttl=settings.RUNDECK_IDEMPOTENCY_TTL
+        )
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self.duplicates = 0
+        
+        # Orçamento compartilhado por todos os jobs: numa queda do Rundeck
+        # as novas tentativas não podem multiplicar a carga
+        self.retry_budget = RetryBudget(
+            ratio=settings.RUNDECK_RETRY_BUDGET_RATIO,
+            min_per_second=settings.RUNDECK_RETRY_BUDGET_MIN_PER_SECOND
+        )
+        
         # Loga os webhooks disponíveis
         logger.info(f"RundeckService inicializado com {len(self.webhook_urls)} webhooks configurados")
         logger.info(f"Modo de simulação: {'ATIVADO' if self.simulation_mode else 'DESATIVADO'}")
 
-    async def execute_job(self, job_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    async def check_connection(self) -> Dict[str, Any]:
+        """
+        Verifica se o Rundeck está acessível.
+        
+        Returns:
+            Status do componente no formato usado pelo health check
+        """
+        response = await self._request("GET", self.base_url)
+        
+        if response.status_code >= 500:
+            return {
+                "name": "rundeck",
+                "status": "error",
+                "message": f"Rundeck respondeu com status {response.status_code}"
+            }
+        
+        return {
+            "name": "rundeck",
+            "status": "operational",
+            "message": f"Rundeck acessível em {self.base_url}"
+        }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Envia uma requisição ao Rundeck usando o pool de conexões compartilhado.
+        
+        Args:
+            method: Método HTTP
+            url: URL completa do endpoint
+            **kwargs: Argumentos repassados ao httpx
+            
+        Returns:
+            Resposta HTTP do Rundeck
+        """
+        if self.client is not None:
+            return await self.client.request(method, url, **kwargs)
+        
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.RUNDECK_TIMEOUT,
+                connect=settings.RUNDECK_CONNECT_TIMEOUT
+            )
+        ) as client:
+            return await client.request(method, url, **kwargs)
+
+    @staticmethod
+    def idempotency_key(event_id: Any, job_id: str, nodes: Any) -> str:
+        """
+        Gera a chave de idempotência do disparo de uma ação para um evento.
+
+        O mesmo evento do Zabbix, a mesma ação e os mesmos nós sempre geram
+        a mesma chave, independente de reenvios do Zabbix ou de novas
+        tentativas. Os nós entram na chave para que eventos de hosts
+        diferentes com o mesmo ID não sejam tratados como o mesmo disparo.
+
+        Args:
+            event_id: ID do evento no Zabbix
+            job_id: ID do job (com _ ou -)
+            nodes: Host ou lista de hosts do disparo
+
+        Returns:
+            Chave no formato UUID
+        """
+        if isinstance(nodes, (list, tuple, set)):
+            nodes = ",".join(sorted(str(node) for node in nodes))
+        return str(uuid.uuid5(
+            _IDEMPOTENCY_NAMESPACE, f"{event_id}:{job_id.replace('_', '-')}:{nodes}"
+        ))
+
+    async def execute_job(
+        self,
+        job_id: str,
+        parameters: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Executa um job no Rundeck usando webhook direto.
         
+        Falhas transitórias (timeouts, erros de conexão, HTTP 429 e 5xx) são
+        repetidas com backoff exponencial, dentro do orçamento de novas
+        tentativas. Com idempotency_key, um disparo concluído ou em
+        andamento para a mesma chave não é repetido.
+        
         Args:
             job_id: ID do job para executar
             parameters: Parâmetros para o job
+            idempotency_key: Chave do disparo (ver idempotency_key())
             
         Returns:
             Resultado da chamada
@@ -59,9 +165,14 @@ class RundeckService:
         # Normaliza o job_id (pode vir com _ ou -)
         job_id_normalized = job_id.replace('_', '-')
         
-        # Adiciona informações para rastreabilidade
-        parameters["alert_id"] = str(uuid.uuid4())
+        # Adiciona informações para rastreabilidade: o alert_id é o trace id
+        # do alerta (derivado do event_id do Zabbix), o mesmo dos logs
+        parameters["alert_id"] = current_trace_id() or str(uuid.uuid4())
         parameters["timestamp"] = int(time.time())
+        if idempotency_key:
+            # Permite ao job descartar uma execução repetida (ex: nova
+            # tentativa após um timeout em que o Rundeck já tinha aceitado)
+            parameters["idempotency_key"] = idempotency_key
         
         # Log inicial
         logger.info(f"Iniciando execução do job: {job_id} com parâmetros: {parameters}")
@@ -89,9 +200,10 @@ class RundeckService:
             # Verifica se estamos no modo simulação
             if self.simulation_mode:
                 logger.info(
-                    f"SIMULAÇÃO: Job {job_id} executaria com URL {webhook_url} e "
-                    f"parâmetros: {json.dumps(parameters, indent=2)}"
+                    "SIMULAÇÃO: Job %s executaria com URL %s e parâmetros: %s",
+                    job_id, webhook_url, LazyJson(parameters, indent=2)
                 )
+                RUNDECK_DISPATCHES.inc(job_id, "simulated")
                 
                 return {
                     "job_id": job_id,
@@ -101,49 +213,237 @@ class RundeckService:
                     "message": "Job simulado com sucesso"
                 }
             
-            # Modo de execução real - faz a chamada HTTP ao webhook
-            logger.info(f"Executando webhook: {webhook_url}")
-            
-            async with httpx.AsyncClient() as client:
-                # Configurar headers - webhooks não precisam de token
-                headers = {
-                    "Content-Type": "application/json",
-                    "Accept": "application/json"
-                }
-                
-                # Fazer a chamada HTTP
-                response = await client.post(
-                    webhook_url,
-                    json=parameters,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                # Log da resposta para debug
-                logger.debug(f"Resposta do webhook - Status: {response.status_code}")
-                if response.text:
-                    try:
-                        logger.debug(f"Conteúdo da resposta: {json.dumps(response.json(), indent=2)}")
-                    except:
-                        logger.debug(f"Conteúdo da resposta (texto): {response.text[:500]}")
-                
-                # Verificar se a chamada foi bem sucedida
-                response.raise_for_status()
-                
-                logger.info(f"Job {job_id} executado com sucesso através do webhook")
-                return {
-                    "status": "triggered",
-                    "job_id": job_id,
-                    "webhook_url": webhook_url,
-                    "response_status": response.status_code,
-                    "message": f"Job executado com sucesso (Status: {response.status_code})"
-                }
+            if idempotency_key is None:
+                return await self._dispatch(job_id, webhook_url, parameters, None)
+            return await self._dispatch_once(job_id, webhook_url, parameters, idempotency_key)
                 
         except Exception as e:
             log_erro_integracao("Rundeck", "execute_job", e)
             logger.error(f"Erro ao executar job {job_id}: {str(e)}")
+            RUNDECK_DISPATCHES.inc(job_id, "error")
             return {
                 "error": f"Falha ao executar job: {str(e)}",
                 "job_id": job_id,
                 "status": "error"
-            }
\ No newline at end of file
+            }
+
+    def dispatch_stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de disparo, idempotência e novas tentativas.
+        
+        Returns:
+            Disparos repetidos evitados, ocupação e orçamento de novas tentativas
+        """
+        return {
+            "duplicates": self.duplicates,
+            "inflight": len(self._inflight),
+            "remembered": len(self._dispatched),
+            "retry_budget": self.retry_budget.stats()
+        }
+
+    async def _dispatch_once(
+        self,
+        job_id: str,
+        webhook_url: str,
+        parameters: Dict[str, Any],
+        idempotency_key: str
+    ) -> Dict[str, Any]:
+        """
+        Dispara o job uma única vez por chave de idempotência.
+        
+        Disparos concorrentes com a mesma chave aguardam o disparo em
+        andamento; depois de concluído com sucesso, o resultado é devolvido
+        aos disparos repetidos sem chamar o Rundeck de novo. Disparos que
+        falharam não são lembrados, para que possam ser tentados de novo.
+        
+        Args:
+            job_id: ID do job
+            webhook_url: URL do webhook
+            parameters: Parâmetros do job
+            idempotency_key: Chave do disparo
+            
+        Returns:
+            Resultado do disparo (com "duplicate": True se foi reaproveitado)
+        """
+        dispatched = self._dispatched.get(idempotency_key)
+        if dispatched is None and idempotency_key in self._inflight:
+            logger.info(f"Job {job_id} já em disparo para a chave {idempotency_key}, aguardando resultado")
+            dispatched = await asyncio.shield(self._inflight[idempotency_key])
+        elif dispatched is not None:
+            logger.info(f"Job {job_id} já disparado para a chave {idempotency_key}, disparo ignorado")
+        
+        if dispatched is not None:
+            self.duplicates += 1
+            RUNDECK_DISPATCHES.inc(job_id, "duplicate")
+            return {**dispatched, "duplicate": True}
+        
+        task = asyncio.ensure_future(self._dispatch(job_id, webhook_url, parameters, idempotency_key))
+        self._inflight[idempotency_key] = task
+        task.add_done_callback(lambda t: self._on_dispatched(idempotency_key, t))
+        
+        # O shield mantém o disparo vivo para os demais aguardando a mesma chave
+        return await asyncio.shield(task)
+
+    def _on_dispatched(self, idempotency_key: str, task: "asyncio.Future[Dict[str, Any]]") -> None:
+        self._inflight.pop(idempotency_key, None)
+        
+        if task.cancelled() or task.exception() is not None:
+            return
+        
+        result = task.result()
+        if result.get("status") == "triggered":
+            self._dispatched.set(idempotency_key, result)
+
+    async def _dispatch(
+        self,
+        job_id: str,
+        webhook_url: str,
+        parameters: Dict[str, Any],
+        idempotency_key: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Chama o webhook, repetindo as falhas transitórias.
+        
+        Args:
+            job_id: ID do job
+            webhook_url: URL do webhook
+            parameters: Parâmetros do job (o mesmo corpo em todas as tentativas)
+            idempotency_key: Chave do disparo, enviada no cabeçalho Idempotency-Key
+            
+        Returns:
+            Resultado do disparo com a quantidade de tentativas
+        """
+        logger.info(f"Executando webhook: {webhook_url}")
+        
+        # Configurar headers - webhooks não precisam de token
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        
+        # Timeout de cada tentativa; o total é limitado pelo número de tentativas
+        timeout = httpx.Timeout(settings.RUNDECK_ATTEMPT_TIMEOUT, connect=settings.RUNDECK_CONNECT_TIMEOUT)
+        self.retry_budget.record_request()
+        
+        attempt = 0
+        while True:
+            attempt += 1
+            error: Optional[Exception] = None
+            retry_after = None
+            
+            # Fazer a chamada HTTP
+            start_time = time.perf_counter()
+            try:
+                with span("rundeck.execute_job", job_id=job_id, attempt=attempt):
+                    response = await self._request(
+                        "POST",
+                        webhook_url,
+                        json=parameters,
+                        headers=headers,
+                        timeout=timeout
+                    )
+            except httpx.TransportError as e:
+                # Timeouts e falhas de conexão
+                error = e
+            finally:
+                RUNDECK_LATENCY.observe(time.perf_counter() - start_time, job_id)
+            
+            if error is None:
+                # Log da resposta para debug (só decodifica o corpo se DEBUG estiver ativo)
+                logger.debug("Resposta do webhook - Status: %s (tentativa %s)", response.status_code, attempt)
+                if logger.isEnabledFor(logging.DEBUG) and response.content:
+                    try:
+                        log_payload("Conteúdo da resposta", response.json(), host=job_id, indent=2)
+                    except ValueError:
+                        log_payload("Conteúdo da resposta (texto)", response.text, host=job_id, limite=500)
+                
+                if response.is_success:
+                    logger.info(f"Job {job_id} executado com sucesso através do webhook")
+                    RUNDECK_DISPATCHES.inc(job_id, "triggered")
+                    return {
+                        "status": "triggered",
+                        "job_id": job_id,
+                        "webhook_url": webhook_url,
+                        "response_status": response.status_code,
+                        "attempts": attempt,
+                        "idempotency_key": idempotency_key,
+                        "message": f"Job executado com sucesso (Status: {response.status_code})"
+                    }
+                
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPStatusError as e:
+                    error = e
+                
+                # Erros do cliente (ex: webhook inexistente) não melhoram com novas tentativas
+                if response.status_code not in _RETRYABLE_STATUS:
+                    return self._dispatch_error(job_id, error, attempt, idempotency_key)
+                retry_after = _retry_after(response)
+            
+            if attempt >= settings.RUNDECK_RETRY_ATTEMPTS:
+                return self._dispatch_error(job_id, error, attempt, idempotency_key)
+            
+            if not self.retry_budget.try_acquire():
+                RUNDECK_RETRIES.inc(job_id, "budget_exhausted")
+                logger.warning(f"Orçamento de novas tentativas do Rundeck esgotado, job {job_id} não será repetido")
+                return self._dispatch_error(job_id, error, attempt, idempotency_key, budget_exhausted=True)
+            
+            delay = backoff_delay(attempt, settings.RUNDECK_RETRY_BASE_DELAY, settings.RUNDECK_RETRY_MAX_DELAY)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, settings.RUNDECK_RETRY_MAX_DELAY))
+            
+            RUNDECK_RETRIES.inc(job_id, "retried")
+            logger.warning(
+                f"Falha ao executar job {job_id} (tentativa {attempt}/{settings.RUNDECK_RETRY_ATTEMPTS}): "
+                f"{_describe(error)}; nova tentativa em {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    def _dispatch_error(
+        self,
+        job_id: str,
+        error: Exception,
+        attempts: int,
+        idempotency_key: Optional[str],
+        budget_exhausted: bool = False
+    ) -> Dict[str, Any]:
+        log_erro_integracao("Rundeck", "execute_job", error)
+        logger.error(f"Erro ao executar job {job_id} após {attempts} tentativa(s): {_describe(error)}")
+        RUNDECK_DISPATCHES.inc(job_id, "error")
+        return {
+            "error": f"Falha ao executar job: {_describe(error)}",
+            "job_id": job_id,
+            "status": "error",
+            "attempts": attempts,
+            "idempotency_key": idempotency_key,
+            "retry_budget_exhausted": budget_exhausted
+        }
+
+
+# Respostas que indicam falha transitória do Rundeck ou de um proxy na frente dele
+_RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Namespace das chaves de idempotência dos disparos
+_IDEMPOTENCY_NAMESPACE = uuid.UUID("0d6f3b52-4e1a-4c8b-9a57-2f3e6c1d8b94")
+
+
+def _describe(error: Exception) -> str:
+    """
+    Descreve a falha de uma tentativa em uma linha.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return f"{type(error).__name__}: {error}"
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Lê o cabeçalho Retry-After (em segundos) de respostas 429/503.
+    """
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
@@ -12,9 +12,17 @@ from fastapi.responses import JSONResponse
 import uvicorn
 
 # Importações internas
-from app.api.routes import health, zabbix
+from app.api.routes import health, metrics, zabbix
 from app.core.config import settings
+from app.core.http import criar_cliente_http
 from app.core.logging import logger, log_requisicao
+from app.core import tracing
+from app.services.ollama_service import OllamaService
+from app.services.rundeck_service import RundeckService
+from app.services.alert_pipeline import AlertPipeline
+from app.services.incident_store import IncidentStore
+from app.services.alert_queue import AlertQueue
+from app.services.ollama_model_manager import OllamaModelManager
 
 # Configuração da aplicação FastAPI
 app = FastAPI(
@@ -95,6 +103,44 @@ async def startup_event():
     logger.info(
         f"Iniciando API Dorothy v{settings.API_VERSION}"
     )
+    
+    # Exportação dos spans de cada alerta (formato Chrome Trace Event)
+    if settings.TRACE_EXPORT_ENABLED:
+        tracing.start_exporter(settings.TRACE_EXPORT_PATH, settings.TRACE_EXPORT_MAX_BYTES)
+    
+    # Clientes HTTP compartilhados, com pool de conexões persistentes
+    app.state.ollama_client = criar_cliente_http(
+        timeout=settings.OLLAMA_TIMEOUT,
+        connect_timeout=settings.OLLAMA_CONNECT_TIMEOUT
+    )
+    app.state.rundeck_client = criar_cliente_http(
+        timeout=settings.RUNDECK_TIMEOUT,
+        connect_timeout=settings.RUNDECK_CONNECT_TIMEOUT
+    )
+    
+    # Instâncias únicas dos serviços, compartilhadas por todas as requisições
+    app.state.ollama_service = OllamaService(client=app.state.ollama_client)
+    app.state.rundeck_service = RundeckService(client=app.state.rundeck_client)
+    
+    # Histórico de incidentes, gravado em segundo plano
+    app.state.incident_store = None
+    if settings.INCIDENT_STORE_ENABLED:
+        app.state.incident_store = IncidentStore()
+        await app.state.incident_store.start()
+    
+    # Pipeline de processamento e fila para ingestão assíncrona
+    app.state.alert_pipeline = AlertPipeline(
+        app.state.ollama_service,
+        app.state.rundeck_service,
+        incident_store=app.state.incident_store
+    )
+    app.state.alert_queue = AlertQueue(app.state.alert_pipeline)
+    app.state.alert_queue.start()
+    
+    # Aquecimento do modelo em segundo plano (não bloqueia a inicialização)
+    app.state.model_manager = OllamaModelManager(app.state.ollama_service)
+    if settings.OLLAMA_WARMUP_ENABLED:
+        app.state.model_manager.start()
 
 
 @app.on_event("shutdown")
@@ -104,6 +150,15 @@ async def shutdown_event():
     
     Realiza tarefas de limpeza como fechamento de conexões.
     """
+    await app.state.model_manager.stop()
+    await app.state.alert_queue.stop()
+    await app.state.alert_pipeline.stop()
+    if app.state.incident_store is not None:
+        await app.state.incident_store.stop()
+    await app.state.ollama_client.aclose()
+    await app.state.rundeck_client.aclose()
+    tracing.stop_exporter()
+    
     logger.info("API Dorothy finalizada")
 
 
@@ -123,6 +178,7 @@ async def root():
 # Inclusão dos routers
 app.include_router(health.router, prefix="/api/v1", tags=["saúde"])
 app.include_router(zabbix.router, prefix="/api/v1/zabbix", tags=["zabbix"])
+app.include_router(metrics.router, tags=["métricas"])
 
 
 # Execução direta
@@ -0,0 +1,55 @@
+"""
+Testes das regras determinísticas (caminho rápido sem LLM).
+
+As regras disparam remediações destrutivas direto no Rundeck; na dúvida,
+devem devolver None para que o LLM decida.
+"""
+import pytest
+
+from app.services.rule_matcher import RuleMatcher
+
+
+@pytest.fixture
+def matcher():
+    return RuleMatcher()
+
+
+def _classify(matcher, problem, tags=None):
+    return matcher.classify({"host": "web01", "problem": problem, "tags": tags or []})
+
+
+@pytest.mark.parametrize("problem", [
+    # Nome do serviço capturado de palavras soltas
+    "The service on host is stopped",
+    "Zabbix agent service is not running on web01",
+    # "disk"/"filesystem" sem falta de espaço
+    "Disk quota exceeded for user on /srv/backup",
+    "Filesystem / is read-only",
+    "MySQL disk write latency high on /var/lib/mysql/data.ibd",
+    # Raiz, arquivos e dispositivos não são limpos pelas regras
+    "Disk space is low on /",
+    "Free disk space is less than 10% on /var/lib/mysql/ibdata1.ibd",
+    "Storage pool /dev/sda1 degraded",
+    "Disk space is low on /dev/sda1",
+])
+def test_ambiguous_alerts_go_to_the_llm(matcher, problem):
+    assert _classify(matcher, problem) is None
+
+
+@pytest.mark.parametrize("problem, function, arguments", [
+    ("Disk space is low on /var", "cleanup_disk", {"path": "/var"}),
+    ("Free disk space is less than 10% on /var/log", "cleanup_disk", {"path": "/var/log"}),
+    ("No space left on device /srv/data", "cleanup_disk", {"path": "/srv/data"}),
+    ("Service nginx is not running", "restart_service", {"service_name": "nginx"}),
+    ("Serviço nginx está parado", "restart_service", {"service_name": "nginx"}),
+])
+def test_unambiguous_alerts_are_decided_by_rules(matcher, problem, function, arguments):
+    match = _classify(matcher, problem)
+    assert match is not None
+    assert match["function"] == function
+    assert match["arguments"] == arguments
+
+
+def test_service_name_from_tag(matcher):
+    match = _classify(matcher, "The service is stopped", tags=[{"tag": "service", "value": "nginx"}])
+    assert match["arguments"] == {"service_name": "nginx"}
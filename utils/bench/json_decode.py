@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark da decodificação dos payloads do Zabbix por backend JSON.
+
+Para cada formato de payload (utils/bench/payloads.py) mede, por backend
+instalado (orjson, msgspec, json), o tempo de decodificar o corpo da
+requisição e o JSON aninhado em "Message", como fazem as rotas, e compara
+com o caminho anterior do /alert/direct (bytes -> str -> json.loads). A
+coluna "validação" mostra o tempo do ZabbixAlert sobre o payload já
+decodificado, para dimensionar o ganho no total.
+
+Exemplo:
+    python utils/bench/json_decode.py --number 20000
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import payloads  # noqa: E402
+from app.core import json_codec  # noqa: E402
+from app.models.zabbix import ZabbixAlert  # noqa: E402
+
+
+def _legacy(body: bytes) -> Any:
+    # Caminho anterior: cópia para str e json.loads, duas vezes com Message
+    data = json.loads(body.decode("utf-8"))
+    if isinstance(data, dict) and isinstance(data.get("Message"), str):
+        try:
+            data = json.loads(data["Message"])
+        except json.JSONDecodeError:
+            pass
+    return data
+
+
+def _decoder(loads: Callable[[Any], Any]) -> Callable[[bytes], Any]:
+    def decode(body: bytes) -> Any:
+        data = loads(body)
+        if isinstance(data, dict) and isinstance(data.get("Message"), str):
+            try:
+                data = loads(data["Message"])
+            except json_codec.JSONDecodeError:
+                pass
+        return data
+    return decode
+
+
+def _best_us(func: Callable[[], Any], number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def run(shapes: List[str], backends: List[str], number: int, repeat: int) -> Dict[str, Any]:
+    """
+    Mede a decodificação de cada formato de payload em cada backend.
+
+    Args:
+        shapes: Formatos de payload (ver payloads.SHAPES)
+        backends: Backends JSON a comparar
+        number: Decodificações por medida
+        repeat: Medidas por caso (vale a melhor)
+
+    Returns:
+        Tempos em microssegundos por formato, backend e validação
+    """
+    decoders = {backend: _decoder(json_codec.loader(backend)) for backend in backends}
+    results: Dict[str, Any] = {}
+
+    for shape in shapes:
+        payload = payloads.build_payload(shape, "web-00042", payloads.PROBLEMS[0], event_id="123456789")
+        body = json.dumps(payload).encode()
+
+        row: Dict[str, Any] = {"bytes": len(body)}
+        row["legacy"] = _best_us(lambda: _legacy(body), number, repeat)
+        for backend, decode in decoders.items():
+            assert decode(body) == _legacy(body)
+            row[backend] = _best_us(lambda: decode(body), number, repeat)
+
+        raw = json_codec.loads(body)
+        row["validation"] = _best_us(lambda: ZabbixAlert.model_validate(dict(raw)), max(1, number // 10), repeat)
+        results[shape] = row
+
+    return results
+
+
+def print_report(results: Dict[str, Any], backends: List[str]) -> None:
+    print(f"\nDecodificação por payload (µs, melhor de várias medidas) - backend padrão: {json_codec.BACKEND}")
+    header = f"{'formato':<14}{'bytes':>7}{'legado':>10}" + "".join(f"{b:>10}{'ganho':>8}" for b in backends)
+    print(header + f"{'validação':>12}")
+    for shape, row in results.items():
+        line = f"{shape:<14}{row['bytes']:>7}{row['legacy']:>10.2f}"
+        for backend in backends:
+            line += f"{row[backend]:>10.2f}{row['legacy'] / row[backend]:>7.1f}x"
+        print(line + f"{row['validation']:>12.2f}")
+
+
+def main(argv=None):
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Benchmark da decodificação dos payloads do Zabbix")
+    parser.add_argument("--shapes", default=",".join(payloads.SHAPES),
+                        help=f"Formatos de payload (padrão: {','.join(payloads.SHAPES)})")
+    parser.add_argument("--backends", default=",".join(json_codec.available_backends()),
+                        help="Backends comparados (padrão: todos os instalados)")
+    parser.add_argument("--number", type=int, default=20000, help="Decodificações por medida (padrão: 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Medidas por caso (padrão: 5)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    shapes = [shape for shape in args.shapes.split(",") if shape]
+    backends = [backend for backend in args.backends.split(",") if backend]
+    results = run(shapes, backends, args.number, args.repeat)
+    print_report(results, backends)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API Dorothy com Ollama e Rundeck simulados.
+
+Sobe os servidores simulados (utils/bench/stubs.py) e a API (main:app) em
+processos separados, envia alertas do Zabbix em todos os formatos aceitos
+pelo ZabbixAlert, com concorrência e taxa configuráveis, e gera um
+relatório com vazão, latências (p50/p95/p99) de ponta a ponta e por
+estágio, origem das decisões e taxa de fallback.
+
+As latências por estágio vêm dos spans exportados pela própria API
+(TRACE_EXPORT_ENABLED); com --target (API já em execução) apenas as
+medidas do lado do cliente são reportadas.
+
+Exemplos:
+    # 2000 alertas, 64 simultâneos, Ollama com mediana de 800 ms
+    python utils/bench/load_test.py --alerts 2000 --concurrency 64 \\
+        --ollama-latency lognormal:0.8,0.4
+
+    # Tempestade em 5000 hosts a 200 alertas/s, com correlação ligada
+    python utils/bench/load_test.py --mode storm --hosts 5000 --rate 200 \\
+        --alerts 10000 --env CORRELATION_ENABLED=true
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import payloads  # noqa: E402
+
+
+ROOT = Path(__file__).resolve().parents[2]
+STUBS = Path(__file__).resolve().parent / "stubs.py"
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Percentil pelo método do posto mais próximo.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """
+    Resumo de uma série de latências, em milissegundos.
+    """
+    return {
+        "count": len(values),
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(max(values) if values else None),
+    }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 2)
+
+
+class Environment:
+    """
+    Processos da API e dos serviços simulados durante o teste.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.workdir = Path(tempfile.mkdtemp(prefix="dorothy-bench-"))
+        self.trace_path = self.workdir / "trace.json"
+        self.processes: List[subprocess.Popen] = []
+
+    def start(self) -> str:
+        args = self.args
+        print(f"Diretório de trabalho (logs, spans, incidentes): {self.workdir}")
+        self._spawn("ollama", [
+            sys.executable, str(STUBS), "ollama",
+            "--port", str(args.ollama_port),
+            "--latency", args.ollama_latency,
+            "--error-rate", str(args.ollama_error_rate),
+            "--no-tool-call-rate", str(args.no_tool_call_rate),
+        ])
+        self._spawn("rundeck", [
+            sys.executable, str(STUBS), "rundeck",
+            "--port", str(args.rundeck_port),
+            "--latency", args.rundeck_latency,
+            "--error-rate", str(args.rundeck_error_rate),
+        ])
+
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(ROOT),
+            "OLLAMA_BASE_URL": f"http://127.0.0.1:{args.ollama_port}",
+            "RUNDECK_WEBHOOK_BASE_URL": f"http://127.0.0.1:{args.rundeck_port}",
+            "OLLAMA_WARMUP_ENABLED": "false",
+            "ALERT_INGESTION_MODE": "sync",
+            "LOG_LEVEL": "warning",
+            "INCIDENT_STORE_PATH": str(self.workdir / "incidents.db"),
+            "TRACE_EXPORT_ENABLED": "true",
+            "TRACE_EXPORT_PATH": str(self.trace_path),
+        }
+        for item in args.env:
+            key, _, value = item.partition("=")
+            env[key] = value
+
+        # Diretório de trabalho temporário: logs e banco não tocam o repositório
+        self._spawn(
+            "api",
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(args.port),
+                "--log-level", "warning", "--no-access-log",
+            ],
+            env=env,
+            cwd=self.workdir
+        )
+
+        _wait_ready(f"http://127.0.0.1:{args.ollama_port}/api/tags")
+        _wait_ready(f"http://127.0.0.1:{args.rundeck_port}/")
+        _wait_ready(f"http://127.0.0.1:{args.port}/api/v1/health")
+        return f"http://127.0.0.1:{args.port}"
+
+    def stop(self) -> None:
+        # SIGINT permite o shutdown da API (spans e incidentes pendentes são gravados)
+        for process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for process in reversed(self.processes):
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _spawn(
+        self,
+        name: str,
+        command: List[str],
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[Path] = None
+    ) -> None:
+        # A saída dos processos vai para o diretório de trabalho, não para o relatório
+        output = open(self.workdir / f"{name}.log", "w")
+        self.processes.append(subprocess.Popen(
+            command, env=env, cwd=cwd or ROOT, stdout=output, stderr=subprocess.STDOUT
+        ))
+        output.close()
+
+
+def _wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Serviço não respondeu a tempo: {url}")
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Envia os alertas e coleta o resultado de cada requisição.
+
+    Com --rate, as requisições são agendadas em instantes fixos (carga
+    aberta) e a latência é medida a partir do instante agendado, incluindo
+    a espera por uma vaga de concorrência. Sem --rate, cada vaga envia o
+    próximo alerta assim que a anterior termina (carga fechada).
+    """
+    shapes = args.shapes.split(",")
+    if args.mode == "storm":
+        source = payloads.storm(shapes, args.hosts, seed=args.seed)
+    else:
+        source = payloads.replay(shapes, args.hosts, seed=args.seed)
+
+    url = f"{base_url}/api/v1/zabbix/{args.endpoint}"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: List[Dict[str, Any]] = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        async def send(payload: Dict[str, Any], scheduled: float) -> None:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, content=json.dumps(payload),
+                                             headers={"Content-Type": "application/json"})
+                status_code = response.status_code
+                body = response.json() if status_code == 200 else {}
+            except httpx.HTTPError as e:
+                status_code, body = type(e).__name__, {}
+            finally:
+                semaphore.release()
+            finished = time.perf_counter()
+
+            analysis = body.get("analysis") or {}
+            samples.append({
+                "status": status_code,
+                "latency": finished - (scheduled if args.rate else started),
+                "decided_by": analysis.get("decided_by"),
+                "fallback_reason": analysis.get("fallback_reason"),
+                "dispatch": (body.get("action_taken") or {}).get("status"),
+                "deduplicated": body.get("deduplicated"),
+            })
+
+        start = time.perf_counter()
+        tasks = []
+        for index in range(args.alerts):
+            payload = next(source)
+            scheduled = start + index / args.rate if args.rate else 0.0
+            if args.rate:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            # A vaga é liberada por send() ao receber a resposta
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(send(payload, scheduled)))
+            # Evita acumular tasks concluídas em execuções longas
+            if len(tasks) >= args.concurrency * 4:
+                tasks = [task for task in tasks if not task.done()]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return {"elapsed": elapsed, "samples": samples}
+
+
+def stage_latencies(trace_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Agrupa os spans exportados pela API por estágio.
+    """
+    if not trace_path.exists():
+        return {}
+    text = trace_path.read_text(encoding="utf-8").rstrip().rstrip(",")
+    events = json.loads(text + "]") if text.startswith("[") else []
+
+    durations: Dict[str, List[float]] = defaultdict(list)
+    for event in events:
+        if event.get("ph") == "X":
+            durations[event["name"]].append(event["dur"] / 1_000_000)
+    return {name: summarize(values) for name, values in sorted(durations.items())}
+
+
+def build_report(result: Dict[str, Any], stages: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    samples = result["samples"]
+    ok = [sample for sample in samples if sample["status"] == 200]
+    decided = Counter(sample["decided_by"] for sample in ok)
+    fallbacks = Counter(sample["fallback_reason"] for sample in ok if sample["decided_by"] == "fallback")
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "alerts": args.alerts,
+            "hosts": args.hosts,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "shapes": args.shapes,
+            "ollama_latency": args.ollama_latency,
+            "rundeck_latency": args.rundeck_latency,
+            "env": args.env,
+        },
+        "elapsed_s": round(result["elapsed"], 2),
+        "throughput_per_s": round(len(samples) / result["elapsed"], 2) if result["elapsed"] else None,
+        "status": dict(Counter(str(sample["status"]) for sample in samples)),
+        "latency": summarize([sample["latency"] for sample in ok]),
+        "decided_by": dict(decided),
+        "fallback_rate": round(decided.get("fallback", 0) / len(ok), 4) if ok else None,
+        "fallback_reasons": dict(fallbacks),
+        "dispatch": dict(Counter(sample["dispatch"] for sample in ok)),
+        "deduplicated": dict(Counter(sample["deduplicated"] for sample in ok if sample["deduplicated"])),
+        "stages": stages,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n=== Dorothy - teste de carga ===")
+    print(f"Configuração: {json.dumps(report['config'], ensure_ascii=False)}")
+    print(f"Duração: {report['elapsed_s']} s | Vazão: {report['throughput_per_s']} alertas/s")
+    print(f"Status HTTP: {report['status']}")
+    latency = report["latency"]
+    print(
+        f"Latência (ms): p50={latency['p50_ms']} p95={latency['p95_ms']} "
+        f"p99={latency['p99_ms']} max={latency['max_ms']}"
+    )
+    print(f"Decisões: {report['decided_by']}")
+    print(f"Fallback: {report['fallback_rate']} {report['fallback_reasons']}")
+    print(f"Disparos: {report['dispatch']}")
+    if report["deduplicated"]:
+        print(f"Deduplicados: {report['deduplicated']}")
+    if report["stages"]:
+        print(f"\n{'estágio':<24}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, stats in report["stages"].items():
+            print(
+                f"{name:<24}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                f"{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+            )
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Teste de carga da API Dorothy")
+    parser.add_argument("--target", help="URL de uma API já em execução (não sobe os serviços simulados)")
+    parser.add_argument("--mode", choices=["replay", "storm"], default="replay",
+                        help="replay: alertas variados; storm: vários gatilhos por host degradado")
+    parser.add_argument("--alerts", type=int, default=1000, help="Total de alertas enviados (padrão: 1000)")
+    parser.add_argument("--hosts", type=int, default=1000, help="Hosts simulados (padrão: 1000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requisições simultâneas (padrão: 32)")
+    parser.add_argument("--rate", type=float, default=0, help="Alertas por segundo (padrão: 0, sem limite)")
+    parser.add_argument("--shapes", default=",".join(payloads.SHAPES),
+                        help=f"Formatos de payload (padrão: {','.join(payloads.SHAPES)})")
+    parser.add_argument("--endpoint", default="alert", choices=["alert", "alert/direct"],
+                        help="Endpoint de ingestão (padrão: alert)")
+    parser.add_argument("--timeout", type=float, default=300, help="Timeout por requisição em segundos")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos alertas gerados")
+    parser.add_argument("--port", type=int, default=18080, help="Porta da API")
+    parser.add_argument("--ollama-port", type=int, default=11435, help="Porta do Ollama simulado")
+    parser.add_argument("--ollama-latency", default="lognormal:0.8,0.4", help="Latência do Ollama simulado")
+    parser.add_argument("--ollama-error-rate", type=float, default=0.0, help="Fração de erros do Ollama")
+    parser.add_argument("--no-tool-call-rate", type=float, default=0.0,
+                        help="Fração de respostas do Ollama sem tool_call")
+    parser.add_argument("--rundeck-port", type=int, default=4441, help="Porta do Rundeck simulado")
+    parser.add_argument("--rundeck-latency", default="uniform:0.02,0.1", help="Latência do Rundeck simulado")
+    parser.add_argument("--rundeck-error-rate", type=float, default=0.0, help="Fração de erros do Rundeck")
+    parser.add_argument("--env", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="Configuração extra da API (pode repetir)")
+    parser.add_argument("--json", dest="json_path", help="Grava o relatório em JSON neste arquivo")
+
+    args = parser.parse_args()
+
+    environment = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        environment = Environment(args)
+        base_url = environment.start()
+
+    try:
+        result = asyncio.run(run_load(base_url, args))
+    finally:
+        if environment is not None:
+            environment.stop()
+
+    stages = stage_latencies(environment.trace_path) if environment is not None else {}
+    report = build_report(result, stages, args)
+    print_report(report)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
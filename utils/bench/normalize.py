@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da normalização e validação dos alertas do Zabbix.
+
+Para cada formato de payload (utils/bench/payloads.py) compara o caminho
+anterior do ZabbixAlert (root_validator no estilo pydantic v1, com o
+trace id via uuid.uuid5) com o atual (normalize_alert em uma passada,
+dentro do model_validator). A coluna "normalize_alert" é o custo do
+/alert/direct, que usa só a normalização; "model_construct" é a
+alternativa de montar o modelo sem validação sobre os campos normalizados.
+
+Exemplo:
+    python utils/bench/normalize.py --number 20000
+"""
+import argparse
+import json
+import sys
+import time
+import timeit
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, model_validator, root_validator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+import payloads  # noqa: E402
+from app.core.metrics import VALIDATION_LATENCY  # noqa: E402
+from app.core.tracing import record_span  # noqa: E402
+from app.models.zabbix import ZabbixAlert, normalize_alert  # noqa: E402
+
+
+_TRACE_NAMESPACE = uuid.UUID("5b0f6c1e-8a3d-4f6e-9c2b-7d4e1a9f3c60")
+
+
+class LegacyAlert(BaseModel):
+    """
+    ZabbixAlert antes da normalização unificada (referência do benchmark).
+    """
+    event_id: str
+    host: str
+    problem: str
+    severity: str
+    timestamp: Optional[int] = None
+    item_id: Optional[str] = None
+    trigger_id: Optional[str] = None
+    status: Optional[str] = None
+    trace_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = {}
+    tags: Optional[List[Dict[str, str]]] = []
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def measure_validation(cls, values, handler):
+        started_at = time.time()
+        start_time = time.perf_counter()
+        alert = handler(values)
+        duration = time.perf_counter() - start_time
+        VALIDATION_LATENCY.observe(duration)
+        record_span("validate", alert.trace_id, started_at, duration)
+        return alert
+
+    @root_validator(pre=True)
+    def extract_nested_fields(cls, values):
+        if 'Message' in values and values['Message']:
+            try:
+                message_data = json.loads(values['Message'])
+                if isinstance(message_data, dict):
+                    values.update(message_data)
+            except (json.JSONDecodeError, TypeError):
+                if 'problem' not in values:
+                    values['problem'] = values['Message']
+        if 'problem' not in values and 'Subject' in values and values['Subject']:
+            values['problem'] = values['Subject']
+        if 'details' in values and isinstance(values['details'], dict):
+            details = values['details']
+            for field in ['item_id', 'trigger_id']:
+                if field in details and field not in values:
+                    values[field] = details[field]
+            if 'problem' not in values and 'description' in details:
+                values['problem'] = details['description']
+            if 'severity' not in values and 'priority' in details:
+                values['severity'] = details['priority']
+        if 'event_id' not in values:
+            values['event_id'] = values.get('eventid') or values.get('id') or str(int(time.time()))
+        if 'host' not in values:
+            values['host'] = values.get('hostname') or values.get('host_name') or 'unknown-host'
+        if 'problem' not in values:
+            values['problem'] = values.get('name') or values.get('description') or 'Unknown problem'
+        if 'severity' not in values:
+            values['severity'] = values.get('priority') or 'not classified'
+        if not values.get('trace_id'):
+            values['trace_id'] = str(uuid.uuid5(_TRACE_NAMESPACE, f"zabbix:{values['event_id']}"))
+        values.pop('endpoint', None)
+        values.pop('URL', None)
+        return values
+
+
+def _best_us(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def run(shapes: List[str], number: int, repeat: int) -> Dict[str, Any]:
+    """
+    Mede a normalização de cada formato de payload nos dois caminhos.
+
+    Args:
+        shapes: Formatos de payload (ver payloads.SHAPES)
+        number: Alertas por medida
+        repeat: Medidas por caso (vale a melhor)
+
+    Returns:
+        Tempos em microssegundos por formato e caminho
+    """
+    results: Dict[str, Any] = {}
+    for shape in shapes:
+        payload = payloads.build_payload(shape, "web-00042", payloads.PROBLEMS[0], event_id="123456789")
+
+        # Os dois caminhos produzem o mesmo alerta
+        assert ZabbixAlert.model_validate(dict(payload)).model_dump() == \
+            LegacyAlert.model_validate(dict(payload)).model_dump()
+
+        # As cópias do payload entram na medida dos dois lados (o
+        # root_validator alterava o dicionário recebido)
+        results[shape] = {
+            "legacy": _best_us(lambda: LegacyAlert.model_validate(dict(payload)), number, repeat),
+            "normalize_alert": _best_us(lambda: normalize_alert(dict(payload)), number, repeat),
+            "model_construct": _best_us(
+                lambda: ZabbixAlert.model_construct(**normalize_alert(dict(payload))), number, repeat
+            ),
+            "zabbix_alert": _best_us(lambda: ZabbixAlert.model_validate(dict(payload)), number, repeat),
+        }
+    return results
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print("\nNormalização por alerta (µs, melhor de várias medidas)")
+    print(f"{'formato':<14}{'legado':>10}{'normalize_alert':>17}{'model_construct':>17}{'ZabbixAlert':>13}{'ganho':>8}")
+    for shape, row in results.items():
+        print(
+            f"{shape:<14}{row['legacy']:>10.2f}{row['normalize_alert']:>17.2f}{row['model_construct']:>17.2f}"
+            f"{row['zabbix_alert']:>13.2f}{row['legacy'] / row['zabbix_alert']:>7.1f}x"
+        )
+
+
+def main(argv=None):
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Microbenchmark da normalização dos alertas do Zabbix")
+    parser.add_argument("--shapes", default=",".join(payloads.SHAPES),
+                        help=f"Formatos de payload (padrão: {','.join(payloads.SHAPES)})")
+    parser.add_argument("--number", type=int, default=20000, help="Alertas por medida (padrão: 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Medidas por caso (padrão: 5)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    results = run([shape for shape in args.shapes.split(",") if shape], args.number, args.repeat)
+    print_report(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Geração de payloads do Zabbix para os testes de carga.
+
+Cobre todos os formatos tratados por normalize_alert (app/models/zabbix.py):
+campos diretos, JSON dentro de "Message", texto em "Subject", dados em
+"details" e os nomes alternativos (eventid, hostname, priority).
+"""
+import itertools
+import json
+import random
+import time
+import zlib
+from typing import Dict, Any, Iterator, List, Optional
+
+
+# Formatos de payload suportados pelo ZabbixAlert
+SHAPES = ("plain", "message", "message_text", "subject", "details", "aliases")
+
+# Problemas típicos (texto do gatilho, severidade, detalhes); os primeiros
+# são decididos pelas regras, os demais exigem o LLM
+PROBLEMS: List[Dict[str, Any]] = [
+    {"problem": "Disk space is low on /var", "severity": "High",
+     "details": {"item_value": "93%", "description": "Free disk space is less than 10%"}},
+    {"problem": "Service nginx is not running", "severity": "High",
+     "details": {"item_value": "0", "description": "Service nginx stopped"}},
+    {"problem": "High CPU utilization (over 90% for 5m)", "severity": "Average",
+     "details": {"item_value": "97%", "description": "CPU load too high"}},
+    {"problem": "Application payments-api memory leak detected", "severity": "High",
+     "details": {"item_value": "7.8 GB", "description": "Heap growing without release"}},
+    {"problem": "Zabbix agent is not available (for 3m)", "severity": "Average",
+     "details": {"description": "Agent unreachable"}},
+    {"problem": "Too many processes in uninterruptible sleep", "severity": "Warning",
+     "details": {"item_value": "42", "description": "Processes in D state"}},
+    {"problem": "Replication lag on db-primary is above 300s", "severity": "Disaster",
+     "details": {"item_value": "412s", "description": "Replica falling behind"}},
+    {"problem": "Certificate for api.internal expires in 5 days", "severity": "Warning",
+     "details": {"description": "TLS certificate close to expiration"}},
+]
+
+_event_ids = itertools.count(int(time.time()) * 1000)
+
+
+def build_payload(
+    shape: str,
+    host: str,
+    problem: Dict[str, Any],
+    event_id: Optional[str] = None,
+    status: str = "PROBLEM"
+) -> Dict[str, Any]:
+    """
+    Monta um payload do Zabbix no formato informado.
+
+    Args:
+        shape: Formato do payload (ver SHAPES)
+        host: Nome do host
+        problem: Entrada de PROBLEMS
+        event_id: ID do evento (gerado se não informado)
+        status: PROBLEM ou RESOLVED
+
+    Returns:
+        Payload pronto para o POST em /api/v1/zabbix/alert
+    """
+    event_id = event_id or str(next(_event_ids))
+    host_hash = zlib.crc32(host.encode())
+    trigger_id = str(zlib.crc32(f"{host}|{problem['problem']}".encode()) % 1_000_000)
+    details = {**problem["details"], "ip": f"10.{host_hash % 250}.{host_hash // 250 % 250}.{host_hash % 200 + 1}"}
+    tags = [{"tag": "environment", "value": "production"}]
+
+    base = {
+        "event_id": event_id,
+        "host": host,
+        "problem": problem["problem"],
+        "severity": problem["severity"],
+        "status": status,
+        "timestamp": int(time.time()),
+        "trigger_id": trigger_id,
+        "details": details,
+        "tags": tags,
+    }
+
+    if shape == "plain":
+        return base
+    if shape == "message":
+        return {"Message": json.dumps(base), "endpoint": "dorothy", "URL": "http://zabbix"}
+    if shape == "message_text":
+        # Message que não é JSON vira o texto do problema
+        return {"Message": problem["problem"], "event_id": event_id, "host": host,
+                "severity": problem["severity"], "status": status}
+    if shape == "subject":
+        return {"Subject": problem["problem"], "event_id": event_id, "host": host,
+                "severity": problem["severity"], "status": status, "details": details}
+    if shape == "details":
+        return {"event_id": event_id, "host": host, "status": status, "tags": tags,
+                "details": {**details, "description": problem["problem"],
+                            "priority": problem["severity"], "trigger_id": trigger_id,
+                            "item_id": str(host_hash % 90000 + 10000)}}
+    if shape == "aliases":
+        return {"eventid": event_id, "hostname": host, "name": problem["problem"],
+                "priority": problem["severity"], "status": status, "details": details}
+    raise ValueError(f"Formato de payload desconhecido: {shape}")
+
+
+def replay(shapes: List[str], hosts: int, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Gera, indefinidamente, alertas variados distribuídos entre os hosts.
+
+    Args:
+        shapes: Formatos de payload usados (sorteados a cada alerta)
+        hosts: Quantidade de hosts simulados
+        seed: Semente do gerador (para execuções reproduzíveis)
+
+    Yields:
+        Payloads do Zabbix
+    """
+    rng = random.Random(seed)
+    while True:
+        host = f"host-{rng.randrange(hosts):05d}"
+        yield build_payload(rng.choice(shapes), host, rng.choice(PROBLEMS))
+
+
+def storm(
+    shapes: List[str],
+    hosts: int,
+    symptoms: int = 4,
+    resolve_ratio: float = 0.2,
+    seed: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Simula tempestades de alertas: cada host degradado dispara vários
+    gatilhos em sequência, e parte deles é resolvida logo em seguida.
+
+    Args:
+        shapes: Formatos de payload usados
+        hosts: Quantidade de hosts simulados
+        symptoms: Gatilhos disparados por host degradado
+        resolve_ratio: Fração dos problemas que recebe o RESOLVED
+        seed: Semente do gerador
+
+    Yields:
+        Payloads do Zabbix (PROBLEM e RESOLVED)
+    """
+    rng = random.Random(seed)
+    while True:
+        host = f"host-{rng.randrange(hosts):05d}"
+        resolved = []
+        for problem in rng.sample(PROBLEMS, min(symptoms, len(PROBLEMS))):
+            event_id = str(next(_event_ids))
+            shape = rng.choice(shapes)
+            yield build_payload(shape, host, problem, event_id=event_id)
+            if rng.random() < resolve_ratio:
+                resolved.append((shape, problem, event_id))
+        for shape, problem, event_id in resolved:
+            yield build_payload(shape, host, problem, event_id=event_id, status="RESOLVED")
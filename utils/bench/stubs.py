@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Servidores locais que substituem o Ollama e o Rundeck nos testes de carga.
+
+Ollama: responde /api/tags e /api/chat (com e sem streaming), escolhendo a
+ferramenta pelo conteúdo do prompt, com latência, taxa de erro e taxa de
+respostas sem tool_call configuráveis.
+
+Rundeck: aceita POST em qualquer URL de webhook e responde como o Rundeck,
+também com latência e taxa de erro configuráveis.
+
+Uso:
+    python utils/bench/stubs.py ollama --port 11435 --latency lognormal:0.8,0.4
+    python utils/bench/stubs.py rundeck --port 4441 --latency uniform:0.02,0.1 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+# Ferramenta escolhida por palavras-chave do prompt (a primeira que casar)
+_TOOL_RULES: List[Tuple[Tuple[str, ...], str, Dict[str, Any]]] = [
+    (("disk", "disco", "space"), "cleanup_disk", {"path": "/var", "min_size": "100M", "file_age": "7d"}),
+    (("service", "serviço", "not running"), "restart_service", {"service_name": "nginx"}),
+    (("cpu", "processes", "processos"), "analyze_processes", {"resource_type": "cpu"}),
+    (("memory", "memória", "leak"), "restart_application", {"app_name": "payments-api"}),
+]
+_NOTIFY = ("notify", {"message": "Verificar o alerta manualmente", "team": "operations", "urgency": "medium"})
+
+
+class Latency:
+    """
+    Distribuição de latência no formato "tipo:parâmetros" (segundos).
+
+    fixed:0.5 | uniform:0.2,1.5 | exp:0.8 (média) | lognormal:0.8,0.5 (mediana, sigma)
+    """
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(value) for value in params.split(",") if value]
+        if kind not in ("fixed", "uniform", "exp", "lognormal"):
+            raise ValueError(f"Distribuição de latência desconhecida: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return random.uniform(self.params[0], self.params[1])
+        if self.kind == "exp":
+            return random.expovariate(1 / self.params[0])
+        return random.lognormvariate(math.log(self.params[0]), self.params[1])
+
+
+def create_ollama_app(
+    latency: Latency,
+    error_rate: float = 0.0,
+    no_tool_call_rate: float = 0.0,
+    model: str = "llama3.2"
+) -> FastAPI:
+    """
+    Cria o servidor que simula o Ollama.
+
+    Args:
+        latency: Latência de cada /api/chat
+        error_rate: Fração das chamadas respondidas com HTTP 500
+        no_tool_call_rate: Fração das respostas sem tool_call (gera fallback)
+        model: Nome do modelo anunciado em /api/tags
+    """
+    app = FastAPI()
+    stats = {"requests": 0, "errors": 0, "no_tool_call": 0}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": f"{model}:latest"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        delay = latency.sample()
+
+        if random.random() < error_rate:
+            await asyncio.sleep(delay)
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": "stub: erro simulado"})
+
+        prompt = (body.get("messages") or [{}])[-1].get("content", "")
+        tool_calls = _tool_calls(prompt, body.get("tools") or [])
+        if random.random() < no_tool_call_rate:
+            stats["no_tool_call"] += 1
+            tool_calls = []
+
+        message = {"role": "assistant", "content": "" if tool_calls else "Sem ação.", "tool_calls": tool_calls}
+        durations = {
+            "total_duration": int(delay * 1e9),
+            "load_duration": 1_000_000,
+            "prompt_eval_count": len(prompt) // 4,
+            "prompt_eval_duration": int(delay * 0.3 * 1e9),
+            "eval_count": 40,
+            "eval_duration": int(delay * 0.7 * 1e9),
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return {"model": model, "message": message, "done": True, **durations}
+
+        async def chunks():
+            # Primeiro token após o processamento do prompt, decisão no fim
+            await asyncio.sleep(delay * 0.3)
+            yield json.dumps({"model": model, "message": {"role": "assistant", "content": ""}, "done": False}) + "\n"
+            await asyncio.sleep(delay * 0.7)
+            yield json.dumps({"model": model, "message": message, "done": False}) + "\n"
+            yield json.dumps({"model": model, "message": {"role": "assistant", "content": ""},
+                              "done": True, **durations}) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def _tool_calls(prompt: str, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Monta a chamada de ferramenta para o prompt (uma por alerta em lotes).
+    """
+    batched = any(
+        "alert_index" in ((tool.get("function") or {}).get("parameters") or {}).get("properties", {})
+        for tool in tools
+    )
+    if not batched:
+        return [_tool_call(prompt)]
+
+    # Prompt de lote: um bloco "[i] Host: ..." por alerta
+    parts = re.split(r"\[(\d+)\] Host:", prompt)
+    calls = []
+    for index, section in zip(parts[1::2], parts[2::2]):
+        call = _tool_call(section)
+        call["function"]["arguments"]["alert_index"] = int(index)
+        calls.append(call)
+    return calls
+
+
+def _tool_call(text: str) -> Dict[str, Any]:
+    lowered = text.lower()
+    name, arguments = _NOTIFY
+    for keywords, tool, tool_arguments in _TOOL_RULES:
+        if any(keyword in lowered for keyword in keywords):
+            name, arguments = tool, tool_arguments
+            break
+    return {"function": {"name": name, "arguments": dict(arguments)}}
+
+
+def create_rundeck_app(latency: Latency, error_rate: float = 0.0) -> FastAPI:
+    """
+    Cria o servidor que simula os webhooks do Rundeck.
+
+    Args:
+        latency: Latência de cada disparo
+        error_rate: Fração dos disparos respondidos com HTTP 500
+    """
+    app = FastAPI()
+    stats = {"requests": 0, "errors": 0, "by_webhook": {}}
+
+    @app.get("/")
+    async def root():
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/api/{version}/webhook/{token}")
+    async def webhook(version: str, token: str, request: Request):
+        await request.body()
+        stats["requests"] += 1
+        stats["by_webhook"][token] = stats["by_webhook"].get(token, 0) + 1
+        await asyncio.sleep(latency.sample())
+
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": "stub: erro simulado"})
+        return {"jobId": token, "executionId": stats["requests"], "at": time.time()}
+
+    return app
+
+
+def serve(app: FastAPI, port: int, host: str = "127.0.0.1") -> None:
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Servidores simulados do Ollama e do Rundeck")
+    parser.add_argument("service", choices=["ollama", "rundeck"], help="Serviço a simular")
+    parser.add_argument("--port", type=int, required=True, help="Porta do servidor")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço (padrão: 127.0.0.1)")
+    parser.add_argument(
+        "--latency",
+        default="fixed:0",
+        help="Latência: fixed:S | uniform:MIN,MAX | exp:MEDIA | lognormal:MEDIANA,SIGMA (padrão: fixed:0)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas HTTP 500")
+    parser.add_argument(
+        "--no-tool-call-rate",
+        type=float,
+        default=0.0,
+        help="Ollama: fração de respostas sem tool_call"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Semente do gerador aleatório")
+
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    latency = Latency(args.latency)
+
+    if args.service == "ollama":
+        app = create_ollama_app(latency, args.error_rate, args.no_tool_call_rate)
+    else:
+        app = create_rundeck_app(latency, args.error_rate)
+    serve(app, args.port, args.host)
+
+
+if __name__ == "__main__":
+    main()